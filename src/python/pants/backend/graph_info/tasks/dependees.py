@@ -7,7 +7,8 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import json
 from collections import defaultdict
 
-from pants.base.specs import DescendantAddresses
+from pants.base.specs import DescendantAddresses, Specs
+from pants.engine.legacy.graph import DependentGraph
 from pants.task.console_task import ConsoleTask
 
 
@@ -32,24 +33,19 @@ class ReverseDepmap(ConsoleTask):
     self._closed = self.get_options().closed
 
   def console_output(self, _):
-    dependees_by_target = defaultdict(set)
-    for address in self.context.build_graph.inject_specs_closure([DescendantAddresses('')]):
-      target = self.context.build_graph.get_target(address)
-      # TODO(John Sirois): tighten up the notion of targets written down in a BUILD by a
-      # user vs. targets created by pants at runtime.
-      concrete_target = self.get_concrete_target(target)
-      for dependency in concrete_target.dependencies:
-        dependency = self.get_concrete_target(dependency)
-        dependees_by_target[dependency].add(concrete_target)
+    # The reverse dependencies of the repo are an engine product: under pantsd, they are only
+    # recomputed for the directories whose BUILD files changed since the previous run.
+    dependent_graph = self.context._scheduler.product_request(
+      DependentGraph, [Specs((DescendantAddresses(''),))])[0]
 
-    roots = set(self.context.target_roots)
+    roots = set(root.address for root in self.context.target_roots)
     if self.get_options().output_format == 'json':
       deps = defaultdict(list)
       for root in roots:
         if self._closed:
-          deps[root.address.spec].append(root.address.spec)
-        for dependent in self.get_dependents(dependees_by_target, [root]):
-          deps[root.address.spec].append(dependent.address.spec)
+          deps[root.spec].append(root.spec)
+        for dependent in self.get_dependents(dependent_graph, [root]):
+          deps[root.spec].append(dependent.spec)
       for address in deps.keys():
         deps[address].sort()
       yield json.dumps(deps, indent=4, separators=(',', ': '), sort_keys=True)
@@ -59,23 +55,15 @@ class ReverseDepmap(ConsoleTask):
         # are no longer consistently sorted (even though dictionaries are in 3.6+).
         # Without this sort, the output of `./pants dependees` will vary every run.
         for root in sorted(roots):
-          yield root.address.spec
+          yield root.spec
 
       # N.B. Sorting is necessary here for consistent output in Python 3. See above N.B.
-      for dependent in sorted(self.get_dependents(dependees_by_target, roots)):
-        yield dependent.address.spec
+      for dependent in sorted(self.get_dependents(dependent_graph, roots)):
+        yield dependent.spec
 
-  def get_dependents(self, dependees_by_target, roots):
-    check = set(roots)
-    known_dependents = set()
-    while True:
-      dependents = set(known_dependents)
-      for target in check:
-        dependents.update(dependees_by_target[target])
-      check = dependents - known_dependents
-      if not check or not self._transitive:
-        return dependents - set(roots)
-      known_dependents = dependents
-
-  def get_concrete_target(self, target):
-    return target.concrete_derived_from
+  def get_dependents(self, dependent_graph, roots):
+    if self._transitive:
+      dependents = dependent_graph.transitive_dependents_of_addresses(roots)
+    else:
+      dependents = dependent_graph.dependents_of_addresses(roots)
+    return set(dependents) - set(roots)
@@ -14,6 +14,8 @@ class ClasspathEntry(object):
   def __init__(self, path, directory_digest=None):
     self._path = path
     self._directory_digest = directory_digest
+    # Entries are immutable, and are hashed each time they are deduped on a classpath.
+    self._hash = None
 
   @property
   def path(self):
@@ -47,7 +49,9 @@ class ClasspathEntry(object):
     return False
 
   def __hash__(self):
-    return hash((self.path, self.directory_digest))
+    if self._hash is None:
+      self._hash = hash((self.path, self.directory_digest))
+    return self._hash
 
   def __eq__(self, other):
     return (
@@ -119,7 +123,9 @@ class ArtifactClasspathEntry(ClasspathEntry):
     return any(_matches_exclude(self.coordinate, exclude) for exclude in excludes)
 
   def __hash__(self):
-    return hash((self.path, self.coordinate, self.cache_path))
+    if self._hash is None:
+      self._hash = hash((self.path, self.coordinate, self.cache_path))
+    return self._hash
 
   def __eq__(self, other):
     return (isinstance(other, ArtifactClasspathEntry) and
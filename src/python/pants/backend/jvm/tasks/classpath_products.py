@@ -8,15 +8,13 @@ import os
 import re
 from builtins import object
 
-from twitter.common.collections import OrderedSet
-
 from pants.backend.jvm.targets.exportable_jvm_library import ExportableJvmLibrary
 from pants.backend.jvm.targets.jvm_target import JvmTarget
 from pants.backend.jvm.tasks.classpath_entry import ArtifactClasspathEntry, ClasspathEntry
 from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
 from pants.base.exceptions import TaskError
 from pants.build_graph.build_graph import BuildGraph
-from pants.goal.products import UnionProducts
+from pants.goal.products import InternedUnionProducts, UnionProducts
 from pants.java.jar.exclude import Exclude
 from pants.util.dirutil import safe_delete, safe_open
 
@@ -45,7 +43,8 @@ class ClasspathProducts(object):
   """
 
   def __init__(self, pants_workdir, classpaths=None, excludes=None):
-    self._classpaths = classpaths or UnionProducts()
+    # Classpath entries are shared by the classpaths of many targets, so they are interned.
+    self._classpaths = classpaths or InternedUnionProducts()
     self._excludes = excludes or UnionProducts()
     self._pants_workdir = pants_workdir
 
@@ -262,8 +261,15 @@ class ClasspathProducts(object):
     """
 
     # remove the duplicate, preserve the ordering.
-    return list(OrderedSet([cp for cp, target in self.get_product_target_mappings_for_targets(
-                            targets, respect_excludes)]))
+    classpath_tuples = self._classpaths.union_for_targets(targets)
+    if respect_excludes:
+      # NB: When `targets` is an iterator, the union has consumed it, and so no excludes apply:
+      # see the TODO in `Zinc.compile_classpath_entries`.
+      excludes = self._closure_excludes(targets)
+      if excludes:
+        classpath_tuples = [(conf, cp_entry) for conf, cp_entry in classpath_tuples
+                            if not cp_entry.is_excluded_by(excludes)]
+    return classpath_tuples
 
   def get_product_target_mappings_for_targets(self, targets, respect_excludes=True):
     """Gets the classpath products-target associations for the given targets.
@@ -316,16 +322,19 @@ class ClasspathProducts(object):
     """Adds the contents of other to this ClasspathProducts."""
     if self._pants_workdir != other._pants_workdir:
       raise ValueError('Other ClasspathProducts from a different pants workdir {}'.format(other._pants_workdir))
-    for target, products in other._classpaths._products_by_target.items():
-      self._classpaths.add_for_target(target, products)
+    for target in other._classpaths.targets():
+      self._classpaths.add_for_target(target, other._classpaths.get_for_target(target))
     for target, products in other._excludes._products_by_target.items():
       self._excludes.add_for_target(target, products)
 
-  def _filter_by_excludes(self, classpath_target_tuples, root_targets):
+  def _closure_excludes(self, root_targets):
     # Excludes are always applied transitively, so regardless of whether a transitive
     # set of targets was included here, their closure must be included.
     closure = BuildGraph.closure(root_targets, bfs=True)
-    excludes = self._excludes.get_for_targets(closure)
+    return self._excludes.get_for_targets(closure)
+
+  def _filter_by_excludes(self, classpath_target_tuples, root_targets):
+    excludes = self._closure_excludes(root_targets)
     return [target_tuple for target_tuple in classpath_target_tuples
             if _not_excluded_filter(excludes)(target_tuple)]
 
@@ -7,8 +7,6 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import os
 from builtins import filter, object
 
-from twitter.common.collections import OrderedSet
-
 from pants.backend.jvm.tasks.classpath_entry import ClasspathEntry
 from pants.util.collections_abc_backport import OrderedDict
 from pants.util.contextutil import open_zip
@@ -36,14 +34,17 @@ class ClasspathUtil(object):
       classpath_products.get_classpath_entries_for_targets(targets),
       confs=confs,
     )
-    total_classpath = OrderedSet(classpath_iter)
+    # NB: An OrderedDict dedupes in C where an OrderedSet would in python, which matters for the
+    # classpaths of wide graphs.
+    total_classpath = OrderedDict.fromkeys(classpath_iter)
 
     filtered_extra_classpath_iter = cls._filtered_classpath_by_confs_iter(
       extra_classpath_tuples,
       confs,
     )
     extra_classpath_iter = cls._entries_iter(filtered_extra_classpath_iter)
-    total_classpath.update(extra_classpath_iter)
+    for entry in extra_classpath_iter:
+      total_classpath.setdefault(entry)
     return list(total_classpath)
 
   @classmethod
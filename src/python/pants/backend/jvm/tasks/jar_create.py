@@ -11,6 +11,7 @@ from pants.backend.jvm.targets.jvm_binary import JvmBinary
 from pants.backend.jvm.tasks.jar_task import JarBuilderTask
 from pants.base.exceptions import TaskError
 from pants.base.workunit import WorkUnitLabel
+from pants.util.dirutil import safe_delete
 
 
 def is_jvm_binary(target):
@@ -39,7 +40,11 @@ class JarCreate(JarBuilderTask):
     super(JarCreate, cls).register_options(register)
     register('--compressed', default=True, type=bool,
              fingerprint=True,
-             help='Create compressed jars.')
+             help='Create compressed jars. Uncompressed jars take more disk, but less time to '
+                  'create, which may suit jars that are only used as inputs to other jars.')
+    register('--incremental', advanced=True, type=bool,
+             help='Rewrite the jar of a changed target from its previous jar, reusing the '
+                  'compressed entries of its unchanged files rather than compressing them again.')
 
   @classmethod
   def product_types(cls):
@@ -60,6 +65,15 @@ class JarCreate(JarBuilderTask):
   def cache_target_dirs(self):
     return True
 
+  @property
+  def incremental(self):
+    return self.get_options().incremental
+
+  @property
+  def cache_incremental(self):
+    # An incrementally written jar holds the same entries as one written from scratch.
+    return True
+
   def execute(self):
     # NB: Invalidating dependents transitively is more than is strictly necessary, but
     # we know that JarBuilderTask touches (at least) the direct dependencies of targets (in
@@ -83,18 +97,25 @@ class JarCreate(JarBuilderTask):
             if os.path.exists(jar_path):
               add_jar_to_products()
           else:
-            with self.create_jar(vt.target, jar_path) as jarfile:
+            previous_jar = None
+            if vt.is_incremental:
+              previous_jar = os.path.join(vt.previous_results_dir, jar_name)
+            with self.create_jar(vt.target, jar_path, previous_jar=previous_jar) as jarfile:
               with self.create_jar_builder(jarfile) as jar_builder:
                 if jar_builder.add_target(vt.target):
                   add_jar_to_products()
+                elif previous_jar:
+                  # Nothing is written for a target without products: drop the copy of its jar.
+                  safe_delete(jar_path)
 
   @contextmanager
-  def create_jar(self, target, path):
+  def create_jar(self, target, path, previous_jar=None):
     existing = self._jars.setdefault(path, target)
     if target != existing:
       raise TaskError(
           'Duplicate name: target {} tried to write {} already mapped to target {}'
           .format(target, path, existing))
     self._jars[path] = target
-    with self.open_jar(path, overwrite=True, compressed=self.compressed) as jar:
+    with self.open_jar(path, overwrite=True, compressed=self.compressed,
+                       previous_jar=previous_jar) as jar:
       yield jar
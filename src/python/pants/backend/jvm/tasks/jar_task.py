@@ -9,6 +9,7 @@ import shutil
 import tempfile
 from abc import abstractmethod
 from builtins import bytes, object, open
+from collections import OrderedDict
 from contextlib import contextmanager
 
 from future.utils import iteritems, string_types
@@ -21,10 +22,11 @@ from pants.backend.jvm.targets.jvm_binary import Duplicate, JarRules, JvmBinary,
 from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
 from pants.backend.jvm.tasks.nailgun_task import NailgunTask
 from pants.base.exceptions import TaskError
+from pants.java.jar.incremental_jar import IncrementalJar
 from pants.java.jar.manifest import Manifest
 from pants.java.util import relativize_classpath
 from pants.util.contextutil import temporary_dir
-from pants.util.dirutil import safe_mkdtemp
+from pants.util.dirutil import safe_file_dump, safe_mkdtemp
 from pants.util.meta import AbstractClass
 
 
@@ -121,6 +123,10 @@ class Jar(object):
         os.close(fd)
       return path
 
+  # The manifest that jar-tool writes to jars that have none of their own.
+  _DEFAULT_MANIFEST = (b'Manifest-Version: 1.0\r\n'
+                       b'Created-By: org.pantsbuild.tools.jar.JarBuilder\r\n\r\n')
+
   def __init__(self, path):
     self._path = path
     self._entries = []
@@ -211,6 +217,60 @@ class Jar(object):
 
     self._jars.append(jar)
 
+  def _write_incrementally(self, previous_jar, compressed, jar_rules):
+    """Writes this jar from scratch, reusing the compressed entries of unchanged files.
+
+    :param string previous_jar: The path to the previous version of this jar.
+    :returns: The number of entries reused from `previous_jar`, or None if there was nothing to write.
+    :raises: `IncrementalJar.Unsupported` for jars that only jar-tool writes: those that graft in
+             other jars, that set a Main-Class or Class-Path, or that have duplicate entries to
+             concatenate or to fail on.
+    """
+    if self._jars or self._main or self._classpath:
+      raise IncrementalJar.Unsupported(
+        '{} grafts in other jars or sets a Main-Class or Class-Path'.format(self._path))
+
+    with temporary_dir() as scratch_dir:
+      files = OrderedDict()
+      for entry in self._entries:
+        src = entry.materialize(scratch_dir)
+        if not os.path.isdir(src):
+          self._add_file(files, entry.dest, src, jar_rules)
+          continue
+        for root, dirs, names in os.walk(src):
+          dirs.sort()
+          for name in sorted(names):
+            path = os.path.join(root, name)
+            relpath = os.path.relpath(path, src).replace(os.sep, '/')
+            dest = '{}/{}'.format(entry.dest.rstrip('/'), relpath) if entry.dest else relpath
+            self._add_file(files, dest, path, jar_rules)
+
+      if self._manifest_entry:
+        manifest = self._manifest_entry.materialize(scratch_dir)
+      elif files:
+        manifest = os.path.join(scratch_dir, 'MANIFEST.MF')
+        safe_file_dump(manifest, self._DEFAULT_MANIFEST, mode='wb')
+      else:
+        return None
+
+      incremental_jar = IncrementalJar(self._path, previous_path=previous_jar, compressed=compressed)
+      return incremental_jar.write([(Manifest.PATH, manifest)] + list(files.items()))
+
+  @staticmethod
+  def _add_file(files, dest, src, jar_rules):
+    if any(isinstance(rule, Skip) and rule.apply_pattern.match(dest) for rule in jar_rules.rules):
+      return
+    if dest in files:
+      action = next((rule.action for rule in jar_rules.rules
+                     if isinstance(rule, Duplicate) and rule.apply_pattern.match(dest)),
+                    jar_rules.default_dup_action)
+      if action == Duplicate.SKIP:
+        return
+      elif action != Duplicate.REPLACE:
+        raise IncrementalJar.Unsupported('Duplicate entry {} must be handled by jar-tool, per {}'
+                                         .format(dest, action))
+    files[dest] = src
+
   @contextmanager
   def _render_jar_tool_args(self, options):
     """Format the arguments to jar-tool.
@@ -312,7 +372,7 @@ class JarTask(NailgunTask):
     # control.
 
   @contextmanager
-  def open_jar(self, path, overwrite=False, compressed=True, jar_rules=None):
+  def open_jar(self, path, overwrite=False, compressed=True, jar_rules=None, previous_jar=None):
     """Yields a Jar that will be written when the context exits.
 
     :API: public
@@ -322,6 +382,9 @@ class JarTask(NailgunTask):
       update the pre-existing jar at ``path``
     :param bool compressed: entries added to the jar should be compressed; ``True`` by default
     :param jar_rules: an optional set of rules for handling jar exclusions and duplicates
+    :param string previous_jar: an optional path to a previous version of the jar being overwritten
+      (which may be ``path`` itself): the jar is then written without jar-tool where possible,
+      reusing the compressed bytes of its unchanged entries rather than compressing them again
     """
     jar = Jar(path)
     try:
@@ -329,12 +392,22 @@ class JarTask(NailgunTask):
     except jar.Error as e:
       raise TaskError('Failed to write to jar at {}: {}'.format(path, e))
 
+    jar_rules = jar_rules or JarRules.default()
+    if overwrite and previous_jar:
+      try:
+        reused = jar._write_incrementally(previous_jar, compressed, jar_rules)
+        if reused is not None:
+          self.context.log.debug('Reused {} entries of {} to write {}'.format(reused, previous_jar,
+                                                                              path))
+        return
+      except IncrementalJar.Unsupported as e:
+        self.context.log.debug('Writing {} with jar-tool: {}'.format(path, e))
+
     with jar._render_jar_tool_args(self.get_options()) as args:
       if args:  # Don't build an empty jar
         args.append('-update={}'.format(self._flag(not overwrite)))
         args.append('-compress={}'.format(self._flag(compressed)))
 
-        jar_rules = jar_rules or JarRules.default()
         args.append('-default_action={}'.format(self._action_name(jar_rules.default_dup_action)))
 
         skip_patterns = []
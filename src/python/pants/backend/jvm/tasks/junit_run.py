@@ -25,6 +25,7 @@ from pants.backend.jvm.tasks.jvm_tool_task_mixin import JvmToolTaskMixin
 from pants.backend.jvm.tasks.reports.junit_html_report import JUnitHtmlReport, NoJunitHtmlReport
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TargetDefinitionException, TaskError
+from pants.base.hash_utils import Sharder
 from pants.base.workunit import WorkUnitLabel
 from pants.build_graph.target import Target
 from pants.build_graph.target_scopes import Scopes
@@ -186,7 +187,7 @@ class JUnitRun(PartitionedTestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
     args.append('-parallel-threads')
     args.append(str(options.parallel_threads))
 
-    if options.test_shard:
+    if options.test_shard and not self._shard_by_duration:
       args.append('-test-shard')
       args.append(options.test_shard)
 
@@ -259,8 +260,30 @@ class JUnitRun(PartitionedTestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
   def _batched(self):
     return self._batch_size != self._BATCH_ALL
 
+  @property
+  def _shard_by_duration(self):
+    return bool(self.get_options().test_shard and self.duration_history)
+
+  def _select_shard(self, test_registry):
+    """Returns the tests of the `--test-shard` shard, balanced by their recorded durations.
+
+    The junit runner assigns tests to shards by their position: instead, all shards assign the
+    tests of the registry to shards the same way here, and the runner is passed just those of its
+    own shard.
+    """
+    try:
+      sharder = Sharder(self.get_options().test_shard)
+    except Sharder.InvalidShardSpec as e:
+      raise self.OptionError(e)
+    shards = self.balance_by_duration(sorted(test_registry.tests), sharder.nshards,
+                                      key=lambda test: test.classname)
+    return RegistryOfTests({test: test_registry.get_owning_target(test)
+                            for test in shards[sharder.shard]})
+
   def run_tests(self, fail_fast, test_targets, output_dir, coverage):
     test_registry = self._collect_test_targets(test_targets)
+    if self._shard_by_duration:
+      test_registry = self._select_shard(test_registry)
     if test_registry.empty:
       return TestResult.successful
 
@@ -341,6 +364,7 @@ class JUnitRun(PartitionedTestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
                                    .format(subprocess_result))
             result += abs(subprocess_result)
 
+        self.record_test_durations(batch_output_dir, key=lambda attrib: attrib.get('classname'))
         tests_info = self.parse_test_info(batch_output_dir, parse_error_handler, ['classname'])
         for test_name, test_info in tests_info.items():
           test_item = Test(test_info['classname'], test_name)
@@ -407,8 +431,15 @@ class JUnitRun(PartitionedTestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
     for properties, tests in sorted(tests_by_properties.items(), key=_sort_properties):
       sorted_tests = sorted(tests)
       stride = min(self._batch_size, len(sorted_tests))
-      for i in range(0, len(sorted_tests), stride):
-        yield properties, sorted_tests[i:i + stride]
+      if self.duration_history and self._batched:
+        # As many batches as slicing would produce, but of about the same duration.
+        nbatches = (len(sorted_tests) + stride - 1) // stride
+        for batch in self.balance_by_duration(sorted_tests, nbatches,
+                                              key=lambda test: test.classname, capacity=stride):
+          yield properties, batch
+      else:
+        for i in range(0, len(sorted_tests), stride):
+          yield properties, sorted_tests[i:i + stride]
 
   def _parse(self, test_spec_str):
     """Parses a test specification string into an object that can yield corresponding tests.
@@ -452,6 +483,16 @@ class JUnitRun(PartitionedTestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
       return isinstance(target, JUnitTests)
     return target_filter
 
+  @property
+  def partition_parallelism(self):
+    options = self.get_options()
+    # Coverage instruments and reports on the classes of all partitions at once, and the extra env
+    # vars of a target are set in the environment of pants itself while its tests run.
+    if (options.coverage or options.coverage_processor or options.is_flagged('coverage_open') or
+        any(target.payload.extra_env_vars for target in self._get_test_targets())):
+      return 1
+    return super(JUnitRun, self).partition_parallelism
+
   def _validate_target(self, target):
     # TODO: move this check to an optional phase in goal_runner, so
     # that missing sources can be detected early.
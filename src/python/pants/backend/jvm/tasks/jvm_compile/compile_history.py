@@ -0,0 +1,47 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from builtins import object
+
+from pants.util.json_store import MovingAverages
+
+
+class CompileHistory(object):
+  """The measured compile durations of targets, persisted across runs to estimate job sizes.
+
+  Each entry is keyed by the kind of compile and the target, and holds a moving average of its
+  measured durations along with the estimated size of its sources when last measured. Jobs for
+  unmeasured targets are estimated from the size of their sources, scaled by the average duration
+  per unit of size of the measured ones, so that all estimates are in seconds.
+  """
+
+  def __init__(self, path):
+    """
+    :param str path: The file the history is stored in.
+    """
+    self._durations = MovingAverages(path)
+
+  @staticmethod
+  def key(kind, target):
+    return '{}({})'.format(kind, target.address.spec)
+
+  def record(self, key, secs, size):
+    """Record a measured duration of the given compile, whose sources have the given size."""
+    self._durations.record(key, secs, weight=size)
+
+  def estimate(self, key, size):
+    """Returns the estimated duration of the given compile, whose sources have the given size.
+
+    If there is no history at all, returns the size itself, so that all the estimates of a run are
+    in the same unit.
+    """
+    secs = self._durations.get(key)
+    if secs is not None:
+      return secs
+    return size * self._durations.ratio(default=1)
+
+  def save(self):
+    self._durations.save()
@@ -7,6 +7,7 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import queue
 import sys
 import threading
+import time
 import traceback
 from builtins import map, object, str
 from collections import defaultdict, deque
@@ -167,6 +168,8 @@ class ExecutionGraph(object):
     self._jobs = {}
     self._job_keys_as_scheduled = []
     self._job_keys_with_no_dependencies = []
+    # The wall time in seconds of each job that ran, filled in by `execute`.
+    self.job_durations = {}
 
     for job in job_list:
       self._schedule(job)
@@ -178,7 +181,7 @@ class ExecutionGraph(object):
     if len(self._job_keys_with_no_dependencies) == 0:
       raise NoRootJobError()
 
-    self._job_priority = self._compute_job_priorities(job_list)
+    self._job_priority = self._compute_job_priorities({job.key: job.size for job in job_list})
 
   def format_dependee_graph(self):
     def entry(key):
@@ -207,18 +210,19 @@ class ExecutionGraph(object):
     for dependency_key in dependency_keys:
       self._dependees[dependency_key].append(key)
 
-  def _compute_job_priorities(self, job_list):
+  def _compute_job_priorities(self, job_size):
     """Walks the dependency graph breadth-first, starting from the most dependent tasks,
-     and computes the job priority as the sum of the jobs sizes along the critical path."""
+     and computes the job priority as the sum of the jobs sizes along the critical path.
 
-    job_size = {job.key: job.size for job in job_list}
+    :param dict job_size: The size of each job, by key.
+    """
     job_priority = defaultdict(int)
 
     bfs_queue = deque()
-    for job in job_list:
-      if len(self._dependees[job.key]) == 0:
-        job_priority[job.key] = job_size[job.key]
-        bfs_queue.append(job.key)
+    for job_key in self._job_keys_as_scheduled:
+      if len(self._dependees[job_key]) == 0:
+        job_priority[job_key] = job_size[job_key]
+        bfs_queue.append(job_key)
 
     satisfied_dependees_count = defaultdict(int)
     while len(bfs_queue) > 0:
@@ -233,6 +237,25 @@ class ExecutionGraph(object):
 
     return job_priority
 
+  def critical_path(self, job_size=None):
+    """Returns the longest path through the graph, weighted by the given job sizes.
+
+    :param dict job_size: The size of each job, by key: by default, the sizes the jobs were
+                          scheduled with. Jobs without a size weigh nothing.
+    :returns: A pair of the total size of the path, and the keys of its jobs in execution order.
+    """
+    if job_size is None:
+      job_priority = self._job_priority
+    else:
+      job_priority = self._compute_job_priorities(
+        {key: job_size.get(key, 0) for key in self._job_keys_as_scheduled})
+    key = max(self._job_keys_with_no_dependencies, key=lambda k: job_priority[k])
+    path = [key]
+    while self._dependees[key]:
+      key = max(self._dependees[key], key=lambda k: job_priority[k])
+      path.append(key)
+    return job_priority[path[0]], path
+
   def execute(self, pool, log):
     """Runs scheduled work, ensuring all dependencies for each element are done before execution.
 
@@ -272,8 +295,10 @@ class ExecutionGraph(object):
     def try_to_submit_jobs_from_heap():
       def worker(worker_key, work):
         status_table.mark_as(RUNNING, worker_key)
+        start = time.time()
         try:
           work()
+          self.job_durations[worker_key] = time.time() - start
           result = (worker_key, SUCCESSFUL, None)
         except BaseException:
           _, exc_value, exc_traceback = sys.exc_info()
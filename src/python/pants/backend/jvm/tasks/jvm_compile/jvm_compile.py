@@ -23,6 +23,7 @@ from pants.backend.jvm.tasks.classpath_products import ClasspathEntry
 from pants.backend.jvm.tasks.jvm_compile.class_not_found_error_patterns import \
   CLASS_NOT_FOUND_ERROR_PATTERNS
 from pants.backend.jvm.tasks.jvm_compile.compile_context import CompileContext
+from pants.backend.jvm.tasks.jvm_compile.compile_history import CompileHistory
 from pants.backend.jvm.tasks.jvm_compile.execution_graph import (ExecutionFailure, ExecutionGraph,
                                                                  Job)
 from pants.backend.jvm.tasks.jvm_compile.missing_dependency_finder import (CompileErrorExtractor,
@@ -53,6 +54,10 @@ class JvmCompile(CompilerOptionSetsMixin, NailgunTaskBase):
 
   size_estimators = create_size_estimators()
 
+  # A size estimator that estimates the sizes of targets by their measured compile durations in
+  # previous runs: see `CompileHistory`.
+  HISTORY_SIZE_ESTIMATOR = 'history'
+
   @classmethod
   def size_estimator_by_name(cls, estimation_strategy_name):
     return cls.size_estimators[estimation_strategy_name]
@@ -97,11 +102,15 @@ class JvmCompile(CompilerOptionSetsMixin, NailgunTaskBase):
                   'current machine\'s CPU count.'.format(task=cls._name))
 
     register('--size-estimator', advanced=True,
-             choices=list(cls.size_estimators.keys()), default='filesize',
+             choices=list(cls.size_estimators.keys()) + [cls.HISTORY_SIZE_ESTIMATOR],
+             default='filesize',
              help='The method of target size estimation. The size estimator estimates the size '
                   'of targets in order to build the largest targets first (subject to dependency '
                   'constraints). Choose \'random\' to choose random sizes for each target, which '
-                  'may be useful for distributed builds.')
+                  'may be useful for distributed builds. Choose \'{}\' to use the compile '
+                  'durations of targets measured in previous runs, falling back to \'filesize\' '
+                  'for targets that have not been compiled before.'
+                  .format(cls.HISTORY_SIZE_ESTIMATOR))
 
     register('--capture-classpath', advanced=True, type=bool, default=True,
              fingerprint=True,
@@ -317,7 +326,15 @@ class JvmCompile(CompilerOptionSetsMixin, NailgunTaskBase):
       worker_count = 1
     self._worker_count = worker_count
 
-    self._size_estimator = self.size_estimator_by_name(self.get_options().size_estimator)
+    size_estimator = self.get_options().size_estimator
+    if size_estimator == self.HISTORY_SIZE_ESTIMATOR:
+      self._compile_history = CompileHistory(os.path.join(self.workdir, 'compile_history.json'))
+      size_estimator = 'filesize'
+    else:
+      self._compile_history = None
+    self._size_estimator = self.size_estimator_by_name(size_estimator)
+    # The source sizes of the targets of each kind of compile job, by CompileHistory key.
+    self._source_sizes = {}
 
   @memoized_property
   def _missing_deps_finder(self):
@@ -443,6 +460,10 @@ class JvmCompile(CompilerOptionSetsMixin, NailgunTaskBase):
       exec_graph.execute(worker_pool, self.context.log)
     except ExecutionFailure as e:
       raise TaskError("Compilation failure: {}".format(e))
+    finally:
+      if self._compile_history is not None:
+        self._compile_history.save()
+    self._report_critical_path(exec_graph)
 
   def _record_compile_classpath(self, classpath, target, outdir):
     relative_classpaths = [fast_relpath(path, self.get_options().pants_workdir) for path in classpath]
@@ -452,11 +473,26 @@ class JvmCompile(CompilerOptionSetsMixin, NailgunTaskBase):
     with open(path, 'w') as f:
       f.write(text)
 
+  def _capture_snapshots(self, path_globs_and_roots):
+    """Captures Snapshots of the given PathGlobsAndRoots in a single call into the engine.
+
+    The engine captures the Snapshots concurrently, so callers should batch all of the directories
+    they need rather than capture them one target at a time.
+
+    :param path_globs_and_roots: An iterable of PathGlobsAndRoot.
+    :returns: A tuple of Snapshots, in the same order.
+    """
+    path_globs_and_roots = tuple(path_globs_and_roots)
+    if not path_globs_and_roots:
+      return ()
+    with self.context.new_workunit('capture-snapshots'):
+      return self.context._scheduler.capture_snapshots(path_globs_and_roots)
+
   def _set_directory_digests_for_valid_target_classpath_directories(self, valid_targets, compile_contexts):
-    snapshots = self.context._scheduler.capture_snapshots(
-      tuple(PathGlobsAndRoot(PathGlobs(
+    snapshots = self._capture_snapshots(
+      PathGlobsAndRoot(PathGlobs(
         [self._get_relative_classes_dir_from_target(target, compile_contexts)]
-      ), get_buildroot()) for target in valid_targets))
+      ), get_buildroot()) for target in valid_targets)
     [self._set_directory_digest_for_compile_context(
       snapshot.directory_digest, target, compile_contexts)
       for target, snapshot in list(zip(valid_targets, snapshots))]
@@ -700,7 +736,7 @@ class JvmCompile(CompilerOptionSetsMixin, NailgunTaskBase):
                 all_compile_contexts,
                 classpath_product),
               [self.exec_graph_key_for_target(target) for target in invalid_dependencies],
-              self._size_estimator(compile_context.sources),
+              self._estimate_job_size('compile', compile_target, compile_context.sources),
               # If compilation and analysis work succeeds, validate the vts.
               # Otherwise, fail it.
               on_success=ivts.update,
@@ -737,6 +773,18 @@ class JvmCompile(CompilerOptionSetsMixin, NailgunTaskBase):
       return True
     return os.path.exists(ctx.analysis_file)
 
+  def _estimate_job_size(self, stats_key, target, sources):
+    """Estimates the size of the job that compiles the given sources of the given target.
+
+    :param str stats_key: The kind of compile, as later passed to `_record_target_stats`.
+    """
+    size = self._size_estimator(sources)
+    if self._compile_history is None:
+      return size
+    history_key = CompileHistory.key(stats_key, target)
+    self._source_sizes[history_key] = size
+    return self._compile_history.estimate(history_key, size)
+
   def _record_target_stats(self, target, classpath_len, sources_len, compiletime, is_incremental,
     stats_key):
     def record(k, v):
@@ -746,6 +794,25 @@ class JvmCompile(CompilerOptionSetsMixin, NailgunTaskBase):
     record('sources_len', sources_len)
     record('incremental', is_incremental)
 
+    if self._compile_history is not None:
+      history_key = CompileHistory.key(stats_key, target)
+      if history_key in self._source_sizes:
+        self._compile_history.record(history_key, compiletime, self._source_sizes[history_key])
+
+  def _report_critical_path(self, exec_graph):
+    """Logs the critical path that jobs were prioritized by, against the one that was measured."""
+    predicted_size, predicted_path = exec_graph.critical_path()
+    actual_secs, actual_path = exec_graph.critical_path(exec_graph.job_durations)
+    predicted_path_secs = sum(exec_graph.job_durations.get(key, 0) for key in predicted_path)
+    self.context.log.info(
+      'Critical path: predicted {} jobs estimated at {:.1f} {}, which took {:.1f}s; '
+      'actual {} jobs which took {:.1f}s.'
+      .format(len(predicted_path), predicted_size,
+              'secs' if self._compile_history is not None else 'size units',
+              predicted_path_secs, len(actual_path), actual_secs))
+    self.context.log.debug('Predicted critical path:\n  {}\nActual critical path:\n  {}'
+                           .format('\n  '.join(predicted_path), '\n  '.join(actual_path)))
+
   def _collect_invalid_compile_dependencies(self, compile_target, invalid_target_set,
     compile_contexts):
     # Collects all invalid dependencies that are not dependencies of other invalid dependencies
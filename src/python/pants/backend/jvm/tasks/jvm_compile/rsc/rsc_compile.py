@@ -209,34 +209,41 @@ class RscCompile(ZincCompile, MirroredTargetOptionMixin):
           (fast_relpath_optional(filename, get_buildroot()),)),
         text_type(get_buildroot()))
 
-    def to_classpath_entries(paths, scheduler):
+    def to_classpath_entries(paths):
       # list of path ->
       # list of (path, optional<digest>) ->
       path_and_digests = [(p, Digest.load(os.path.dirname(p))) for p in paths]
-      # partition: list of path, list of tuples
+      # partition: list of path
       paths_without_digests = [p for (p, d) in path_and_digests if not d]
       if paths_without_digests:
         self.context.log.debug('Expected to find digests for {}, capturing them.'
           .format(paths_without_digests))
-      paths_with_digests = [(p, d) for (p, d) in path_and_digests if d]
-      # list of path -> list path, captured snapshot -> list of path with digest
-      snapshots = scheduler.capture_snapshots(tuple(pathglob_for(p) for p in paths_without_digests))
-      captured_paths_and_digests = [(p, s.directory_digest)
-        for (p, s) in zip(paths_without_digests, snapshots)]
-      # merge and classpath ify
-      return [ClasspathEntry(p, d) for (p, d) in paths_with_digests + captured_paths_and_digests]
+      # list of path -> captured snapshot of each path without a digest
+      snapshots = iter(self._capture_snapshots(pathglob_for(p) for p in paths_without_digests))
+      # fill in the captured digests and classpath ify, preserving order
+      return [ClasspathEntry(p, d or next(snapshots).directory_digest) for (p, d) in path_and_digests]
 
     def confify(entries):
       return [(conf, e) for e in entries for conf in self._confs]
 
+    def runs_rsc(rsc_cc):
+      return rsc_cc.workflow is not None and rsc_cc.workflow.resolve_for_enum_variant({
+        'zinc-only': False,
+        'rsc-then-zinc': True,
+      })
+
+    # Capture any missing digests of the rsc jars of all targets in a single call into the engine.
+    rsc_targets = [target for target in targets if runs_rsc(compile_contexts[target][0])]
+    rsc_jar_entries = dict(zip(rsc_targets, to_classpath_entries(
+      [compile_contexts[target][0].rsc_jar_file for target in rsc_targets])))
+
     # Ensure that the jar/rsc jar is on the rsc_classpath.
     for target in targets:
       rsc_cc, compile_cc = compile_contexts[target]
       if rsc_cc.workflow is not None:
         cp_entries = rsc_cc.workflow.resolve_for_enum_variant({
           'zinc-only': lambda : confify([compile_cc.jar_file]),
-          'rsc-then-zinc': lambda : confify(
-            to_classpath_entries([rsc_cc.rsc_jar_file], self.context._scheduler)),
+          'rsc-then-zinc': lambda : confify([rsc_jar_entries[target]]),
         })()
         self.context.products.get_data('rsc_classpath').add_for_target(
           target,
@@ -418,7 +425,7 @@ class RscCompile(ZincCompile, MirroredTargetOptionMixin):
         # The rsc jobs depend on other rsc jobs, and on zinc jobs for targets that are not
         # processed by rsc.
         list(all_zinc_rsc_invalid_dep_keys(dep_targets)),
-        self._size_estimator(rsc_compile_context.sources),
+        self._estimate_job_size('rsc', target, rsc_compile_context.sources),
       )
 
     def only_zinc_invalid_dep_keys(invalid_deps):
@@ -439,7 +446,7 @@ class RscCompile(ZincCompile, MirroredTargetOptionMixin):
           compile_contexts,
           CompositeProductAdder(*output_products)),
         dependencies=list(dep_keys),
-        size=self._size_estimator(zinc_compile_context.sources),
+        size=self._estimate_job_size('compile', target, zinc_compile_context.sources),
         on_success=ivts.update,
       )
 
@@ -5,6 +5,7 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import os
+from builtins import range
 
 from pants.backend.jvm.tasks.jvm_tool_task_mixin import JvmToolTaskMixin
 from pants.base.exceptions import TaskError
@@ -12,6 +13,7 @@ from pants.java import util
 from pants.java.executor import SubprocessExecutor
 from pants.java.jar.jar_dependency import JarDependency
 from pants.java.nailgun_executor import NailgunExecutor, NailgunProcessGroup
+from pants.java.nailgun_pool import NailgunPool
 from pants.process.subprocess import Subprocess
 from pants.task.task import Task, TaskBase
 from pants.util.objects import enum
@@ -40,6 +42,23 @@ class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
              help='The time (secs) to wait for a nailgun subprocess to start writing to stdout.')
     register('--nailgun-connect-attempts', advanced=True, default=5, type=int,
              help='Max attempts for nailgun connects.')
+    register('--nailgun-pool-size', advanced=True, default=1, type=int,
+             help='The maximum number of warm nailgun servers to keep for this task. Concurrent '
+                  'invocations of this task lease distinct servers, and servers with differing jvm '
+                  'options or classpaths can be kept warm side by side.')
+    register('--nailgun-pool-servers-per-fingerprint', advanced=True, default=1, type=int,
+             help='The maximum number of warm nailgun servers to keep for the same jvm options '
+                  'and classpath.')
+    register('--nailgun-pool-runs-per-server', advanced=True, default=1, type=int,
+             help='The maximum number of concurrent invocations of this task to run in the same '
+                  'nailgun server. Above 1, concurrent invocations with the same jvm options and '
+                  'classpath share a single warm JVM rather than each starting one: eg, to compile '
+                  'with --worker-count jobs in one long-lived zinc server, whose compilers and '
+                  'classloaders they share. The tool that the task runs must support concurrent '
+                  'invocations.')
+    register('--nailgun-pool-memory-budget-mb', advanced=True, default=0, type=int,
+             help='If positive, idle nailgun servers of this task are stopped, least recently used '
+                  'first, while the servers of the task use more than this much resident memory.')
     cls.register_jvm_tool(register,
                           'nailgun-server',
                           classpath=[
@@ -67,6 +86,8 @@ class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
     self._identity = '_'.join(id_tuple)
     self._executor_workdir = os.path.join(self.context.options.for_global_scope().pants_workdir,
                                           *id_tuple)
+    # The pool of nailgun servers of this task for each distribution, created on first use.
+    self._nailgun_pools = {}
 
   # TODO: eventually deprecate this when we can move all subclasses to use the enum!
   @property
@@ -80,17 +101,35 @@ class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
     """
     dist = dist or self.dist
     if self.execution_strategy == self.NAILGUN:
-      classpath = os.pathsep.join(self.tool_classpath('nailgun-server'))
-      return NailgunExecutor(self._identity,
-                             self._executor_workdir,
-                             classpath,
-                             dist,
-                             startup_timeout=self.get_options().nailgun_subprocess_startup_timeout,
-                             connect_timeout=self.get_options().nailgun_timeout_seconds,
-                             connect_attempts=self.get_options().nailgun_connect_attempts)
+      if dist not in self._nailgun_pools:
+        self._nailgun_pools[dist] = self._create_nailgun_pool(dist)
+      return self._nailgun_pools[dist]
     else:
       return SubprocessExecutor(dist)
 
+  def _create_nailgun_pool(self, dist):
+    options = self.get_options()
+    classpath = os.pathsep.join(self.tool_classpath('nailgun-server'))
+
+    def create_executor(slot):
+      # The first slot uses the identity and workdir of the task, so that it keeps using the
+      # server that the task used before it had a pool.
+      suffix = '_{}'.format(slot) if slot else ''
+      return NailgunExecutor(self._identity + suffix,
+                             self._executor_workdir + suffix,
+                             classpath,
+                             dist,
+                             startup_timeout=options.nailgun_subprocess_startup_timeout,
+                             connect_timeout=options.nailgun_timeout_seconds,
+                             connect_attempts=options.nailgun_connect_attempts)
+
+    return NailgunPool(self._identity,
+                       [create_executor(slot) for slot in range(max(1, options.nailgun_pool_size))],
+                       max_servers_per_fingerprint=options.nailgun_pool_servers_per_fingerprint,
+                       max_runs_per_server=max(1, options.nailgun_pool_runs_per_server),
+                       memory_budget=options.nailgun_pool_memory_budget_mb * 1024 * 1024,
+                       stats=self.context.run_tracker.nailgun_pool_stats)
+
   def runjava(self, classpath, main, jvm_options=None, args=None, workunit_name=None,
               workunit_labels=None, workunit_log_config=None, dist=None):
     """Runs the java main using the given classpath and args.
@@ -97,7 +97,7 @@ def identify_missing_init_files(sources):
   return {os.path.join(package, '__init__.py') for package in packages} - set(sources)
 
 
-def _create_source_dumper(builder, tgt):
+def _create_source_dumper(builder, tgt, previous_chroot=None):
   if type(tgt) == Files:
     # Loose `Files` as opposed to `Resources` or `PythonTarget`s have no (implied) package structure
     # and so we chroot them relative to the build root so that they can be accessed via the normal
@@ -109,9 +109,23 @@ def _create_source_dumper(builder, tgt):
   else:
     chroot_path = lambda relpath: os.path.relpath(relpath, tgt.target_base)
 
-  dump = builder.add_resource if has_resources(tgt) else builder.add_source
+  if has_resources(tgt):
+    dump, label = builder.add_resource, 'resource'
+  else:
+    dump, label = builder.add_source, 'source'
   buildroot = get_buildroot()
-  return lambda relpath: dump(os.path.join(buildroot, relpath), chroot_path(relpath))
+
+  def dump_source(relpath):
+    dest = chroot_path(relpath)
+    if previous_chroot:
+      previous = os.path.join(previous_chroot, dest)
+      if os.path.isfile(previous):
+        # The copy in an earlier chroot is never modified, so it can be shared.
+        builder.chroot().link(previous, dest, label)
+        return
+    dump(os.path.join(buildroot, relpath), dest)
+
+  return dump_source
 
 
 def dump_sources(builder, tgt, log):
@@ -300,8 +314,15 @@ class PexBuilderWrapper(object):
 
     return distributions
 
-  def add_sources_from(self, tgt):
-    dump_source = _create_source_dumper(self._builder, tgt)
+  def add_sources_from(self, tgt, previous_chroot=None):
+    """Adds the sources of the given target.
+
+    :param tgt: The target whose sources to add.
+    :param string previous_chroot: The chroot of an earlier pex that holds the same version of the
+                                   sources of `tgt`, to hard link them from rather than copy them
+                                   from the buildroot, or None.
+    """
+    dump_source = _create_source_dumper(self._builder, tgt, previous_chroot=previous_chroot)
     self._log.debug('  Dumping sources: {}'.format(tgt))
     for relpath in tgt.sources_relative_to_buildroot():
       try:
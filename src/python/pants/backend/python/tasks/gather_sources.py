@@ -4,6 +4,7 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import logging
 import os
 
 from pex.interpreter import PythonInterpreter
@@ -17,6 +18,10 @@ from pants.base.exceptions import TaskError
 from pants.invalidation.cache_manager import VersionedTargetSet
 from pants.task.task import Task
 from pants.util.dirutil import safe_concurrent_creation
+from pants.util.json_store import dump_json, load_json
+
+
+logger = logging.getLogger(__name__)
 
 
 class GatherSources(Task):
@@ -55,6 +60,7 @@ class GatherSources(Task):
     with self.invalidated(targets) as invalidation_check:
       pex = self._get_pex_for_versioned_targets(interpreter, invalidation_check.all_vts)
       self.context.products.register_data(self.PYTHON_SOURCES, pex)
+      self._record_latest(pex.path(), invalidation_check.all_vts)
 
   def _collect_source_targets(self):
     python_target_addresses = [p.address for p in self.context.targets(predicate=is_python_target)]
@@ -82,14 +88,41 @@ class GatherSources(Task):
       # Note that we use the same interpreter for all targets: We know the interpreter
       # is compatible (since it's compatible with all targets in play).
       with safe_concurrent_creation(source_pex_path) as safe_path:
-        self._build_pex(interpreter, safe_path, [vt.target for vt in versioned_targets])
+        self._build_pex(interpreter, safe_path, versioned_targets)
     return PEX(source_pex_path, interpreter=interpreter)
 
-  def _build_pex(self, interpreter, path, targets):
+  @property
+  def _latest_path(self):
+    return os.path.join(self.workdir, 'latest.json')
+
+  def _read_latest(self):
+    """Returns the chroot of the latest source pex, and the cache key hash of each of its targets."""
+    latest = load_json(self._latest_path)
+    try:
+      return latest['chroot'], latest['targets']
+    except (KeyError, TypeError) as e:
+      logger.debug('No latest source pex to reuse sources from: {}'.format(e))
+      return None, {}
+
+  def _record_latest(self, chroot, versioned_targets):
+    latest = {
+      'chroot': chroot,
+      'targets': {vt.target.address.spec: vt.cache_key.hash for vt in versioned_targets},
+    }
+    dump_json(latest, self._latest_path)
+
+  def _build_pex(self, interpreter, path, versioned_targets):
     pex_builder = PexBuilderWrapper.Factory.create(
       builder=PEXBuilder(path=path, interpreter=interpreter, copy=True),
       log=self.context.log)
 
-    for target in targets:
-      pex_builder.add_sources_from(target)
+    # A new source pex is needed whenever any target changes, but the sources of the targets that
+    # are unchanged since the latest one are hard linked from it rather than copied anew.
+    latest_chroot, latest_hashes = self._read_latest()
+    if latest_chroot and not os.path.isdir(latest_chroot):
+      latest_chroot = None
+    for vt in versioned_targets:
+      unchanged = latest_hashes.get(vt.target.address.spec) == vt.cache_key.hash
+      pex_builder.add_sources_from(vt.target,
+                                   previous_chroot=latest_chroot if unchanged else None)
     pex_builder.freeze()
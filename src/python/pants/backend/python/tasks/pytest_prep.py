@@ -25,6 +25,7 @@ class PytestPrep(PythonExecutionTaskBase):
     """A `py.test` PEX binary with an embedded default (empty) `pytest.ini` config file."""
 
     _COVERAGE_PLUGIN_MODULE_NAME = '__{}__'.format(__name__.replace('.', '_'))
+    _WORKER_MODULE_NAME = '__{}_worker__'.format(__name__.replace('.', '_'))
 
     def __init__(self, interpreter, pex):
       # Here we hack around `coverage.cmdline` nuking the 0th element of `sys.path` (our root pex)
@@ -32,8 +33,10 @@ class PytestPrep(PythonExecutionTaskBase):
       # See: https://github.com/nedbat/coveragepy/issues/715
       pex_path = pex.path()
       pex_info = PexInfo.from_pex(pex_path)
-      pex_info.merge_pex_path(pex_path)  # We're now on the sys.path twice.
-      PEXBuilder(pex_path, interpreter=interpreter, pex_info=pex_info).freeze()
+      # The pex is reused across runs while its inputs are unchanged, and only needs this once.
+      if pex_path not in (pex_info.pex_path or '').split(':'):
+        pex_info.merge_pex_path(pex_path)  # We're now on the sys.path twice.
+        PEXBuilder(pex_path, interpreter=interpreter, pex_info=pex_info).freeze()
       self._pex = PEX(pex=pex_path, interpreter=interpreter)
       self._interpreter = interpreter
 
@@ -69,9 +72,17 @@ class PytestPrep(PythonExecutionTaskBase):
       """
       return cls._COVERAGE_PLUGIN_MODULE_NAME
 
+    @classmethod
+    def worker_module(cls):
+      """Return the name of the pytest worker server module embedded in this py.test binary.
+
+      :rtype: str
+      """
+      return cls._WORKER_MODULE_NAME
+
   @classmethod
   def implementation_version(cls):
-    return super(PytestPrep, cls).implementation_version() + [('PytestPrep', 2)]
+    return super(PytestPrep, cls).implementation_version() + [('PytestPrep', 3)]
 
   @classmethod
   def product_types(cls):
@@ -88,6 +99,8 @@ class PytestPrep(PythonExecutionTaskBase):
     yield self.ExtraFile.empty('pytest.ini')
     yield self.ExtraFile(path='{}.py'.format(self.PytestBinary.coverage_plugin_module()),
                          content=pkg_resources.resource_string(__name__, 'coverage/plugin.py'))
+    yield self.ExtraFile(path='{}.py'.format(self.PytestBinary.worker_module()),
+                         content=pkg_resources.resource_string(__name__, 'pytest_worker/server.py'))
 
   def execute(self):
     if not self.context.targets(lambda t: isinstance(t, PythonTests)):
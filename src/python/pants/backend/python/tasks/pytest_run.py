@@ -19,6 +19,7 @@ from textwrap import dedent
 from pants.backend.python.targets.python_tests import PythonTests
 from pants.backend.python.tasks.gather_sources import GatherSources
 from pants.backend.python.tasks.pytest_prep import PytestPrep
+from pants.backend.python.tasks.pytest_worker_manager import PytestWorkerManager
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import ErrorWhileTesting, TaskError
 from pants.base.fingerprint_strategy import DefaultFingerprintStrategy
@@ -32,7 +33,7 @@ from pants.util.contextutil import environment_as, pushd, temporary_dir, tempora
 from pants.util.dirutil import mergetree, safe_mkdir, safe_mkdir_for
 from pants.util.memo import memoized_method, memoized_property
 from pants.util.objects import datatype
-from pants.util.process_handler import SubprocessProcessHandler
+from pants.util.process_handler import SubprocessProcessHandler, subprocess
 from pants.util.py2_compat import configparser
 from pants.util.strutil import safe_shlex_join, safe_shlex_split
 from pants.util.xml_parser import XmlParser
@@ -131,6 +132,18 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
              help='Add these entries to the PYTHONPATH when running the tests. '
                   'Useful for attaching to debuggers in test code.')
 
+    register('--workers', type=bool, advanced=True,
+             help='Run each partition of tests in a fork of a warm pytest worker process, rather '
+                  'than in a new interpreter. The worker imports pytest, its plugins and any '
+                  '--worker-preload modules once, and serves later runs until it has been idle for '
+                  '--worker-idle-timeout seconds. Runs with --profile or a --pdb or --trace '
+                  'pass-through arg always use a new interpreter.')
+    register('--worker-preload', type=list, advanced=True,
+             help='Modules for the pytest worker to import before it serves any runs, e.g. large '
+                  'third party libraries imported by most tests. These must not start threads.')
+    register('--worker-idle-timeout', type=int, default=600, advanced=True,
+             help='The number of seconds a pytest worker may be idle for before it exits.')
+
   @classmethod
   def supports_passthru_args(cls):
     return True
@@ -355,6 +368,15 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
             coverage_xml = os.path.join(coverage_workdir, 'coverage.xml')
             coverage_run('xml', ['-i', '--rcfile', coverage_rc, '-o', coverage_xml])
 
+  @staticmethod
+  def _duration_key(testcase_attributes):
+    # Pytest reports the file of each testcase relative to its rootdir, like the location of the
+    # items it collects.
+    path = testcase_attributes.get('file')
+    if path is None:
+      return None
+    return '{}::{}'.format(path, testcase_attributes.get('name', ''))
+
   def _get_shard_conftest_content(self):
     shard_spec = self.get_options().test_shard
     if shard_spec is None:
@@ -364,6 +386,8 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
       sharder = Sharder(shard_spec)
       if sharder.nshards < 2:
         return ''
+      if self.duration_history:
+        return self._get_balanced_shard_conftest_content(sharder)
       return dedent("""
 
         ### GENERATED BY PANTS ###
@@ -388,6 +412,48 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
     except Sharder.InvalidShardSpec as e:
       raise self.InvalidShardSpecification(e)
 
+  def _get_balanced_shard_conftest_content(self, sharder):
+    # The same assignment as `pants.task.duration_history.balance`, which this conftest can't
+    # import: every shard assigns all the collected tests to shards, and keeps those of its own.
+    return dedent("""
+
+      ### GENERATED BY PANTS ###
+
+      import heapq
+
+      # The recorded duration of each test in seconds, keyed by '<file>::<name>'.
+      _DURATIONS = {durations!r}
+
+      def pytest_report_header(config):
+        return 'shard: {shard} of {nshards} (0-based shard numbering, balanced by duration)'
+
+      def pytest_collection_modifyitems(session, config, items):
+        total_count = len(items)
+        def is_conftest(itm):
+          return itm.fspath and itm.fspath.basename == 'conftest.py'
+        tests = [x for x in items if not is_conftest(x)]
+        default = sum(_DURATIONS.values()) / len(_DURATIONS) if _DURATIONS else 1.0
+        durations = [_DURATIONS.get('{{}}::{{}}'.format(x.location[0], x.name), default)
+                     for x in tests]
+        loads = [0.0] * {nshards}
+        shards = [(0.0, s) for s in range({nshards})]
+        kept = set()
+        for i in sorted(range(len(tests)), key=lambda i: (-durations[i], i)):
+          _, shard = heapq.heappop(shards)
+          loads[shard] += durations[i]
+          heapq.heappush(shards, (loads[shard], shard))
+          if shard == {shard}:
+            kept.add(id(tests[i]))
+        items[:] = [x for x in items if is_conftest(x) or id(x) in kept]
+        reporter = config.pluginmanager.getplugin('terminalreporter')
+        reporter.write_line('Only executing {{}} of {{}} total tests in shard {shard} of '
+                            '{nshards} (~{{:.1f}}s of ~{{:.1f}}s)'
+                            .format(len(kept), total_count, loads[{shard}], sum(loads)),
+                            bold=True, invert=True, yellow=True)
+      """.format(durations=self.duration_history.durations,
+                 shard=sharder.shard,
+                 nshards=sharder.nshards))
+
   def _get_conftest_content(self, sources_map, rootdir_comm_path):
     # A conftest hook to modify the console output, replacing the chroot-based
     # source paths with the source-tree based ones, which are more readable to the end user.
@@ -499,7 +565,7 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
       'PEX_PYTHON_PATH': chosen_interpreter_binary_path,
     }
 
-  def _do_run_tests_with_args(self, pex, args):
+  def _do_run_tests_with_args(self, pex, args, cwd=None):
     try:
       env = dict(os.environ)
 
@@ -536,7 +602,8 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
                                      labels=[WorkUnitLabel.TOOL, WorkUnitLabel.TEST]) as workunit:
         # NB: Constrain the pex environment to ensure the use of the selected interpreter!
         env.update(self._constrain_pytest_interpreter_search_path())
-        rc = self.spawn_and_wait(pex, workunit=workunit, args=args, setsid=True, env=env)
+        rc = self.spawn_and_wait(pex, workunit=workunit, args=args, setsid=True, env=env, cwd=cwd,
+                                 use_worker=self._use_workers)
         return PytestResult.rc(rc)
     except ErrorWhileTesting:
       # spawn_and_wait wraps the test runner in a timeout, so it could
@@ -722,14 +789,16 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
       if os.path.exists(junitxml_path):
         os.unlink(junitxml_path)
 
-      with self._maybe_run_in_chroot():
-        result = self._do_run_tests_with_args(pytest_binary.pex, args)
+      cwd = self._source_chroot_path if self.run_tests_in_chroot else None
+      result = self._do_run_tests_with_args(pytest_binary.pex, args, cwd=cwd)
 
       # There was a problem prior to test execution preventing junit xml file creation so just let
       # the failure result bubble.
       if not os.path.exists(junitxml_path):
         return result
 
+      self.record_test_durations(junitxml_path, key=self._duration_key)
+
       pytest_rootdir = get_pytest_rootdir()
       failed_targets = self._get_failed_targets_from_junitxml(junitxml_path,
                                                               test_targets,
@@ -769,13 +838,51 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
     else:
       yield
 
-  def _spawn(self, pex, workunit, args, setsid=False, env=None):
+  @memoized_property
+  def _pytest_worker(self):
+    return PytestWorkerManager('pytest_worker', os.path.join(self.workdir, 'worker'))
+
+  @memoized_property
+  def _use_workers(self):
+    if not self.get_options().workers or self.get_options().profile:
+      return False
+    # A worker has no terminal to debug in.
+    return not any(arg in ('--pdb', '--trace') for arg in self.get_passthru_args())
+
+  def _spawn(self, pex, workunit, args, setsid=False, env=None, cwd=None, use_worker=False):
     env = env or {}
-    process = pex.run(args,
-                      with_chroot=False,  # We handle chrooting ourselves.
-                      blocking=False,
-                      setsid=setsid,
-                      env=env,
-                      stdout=workunit.output('stdout'),
-                      stderr=workunit.output('stderr'))
+    if use_worker:
+      # Runs in a fork of the worker always lead their own session, as with `setsid`.
+      try:
+        self._pytest_worker.ensure_started(pex,
+                                           PytestPrep.PytestBinary.worker_module(),
+                                           env,
+                                           preload_modules=self.get_options().worker_preload,
+                                           idle_timeout=self.get_options().worker_idle_timeout)
+        workunit.output('stdout')
+        workunit.output('stderr')
+        output_paths = workunit.output_paths()
+        return self._pytest_worker.run(args,
+                                       cwd=cwd or os.getcwd(),
+                                       env=env,
+                                       stdout=output_paths['stdout'],
+                                       stderr=output_paths['stderr'])
+      except PytestWorkerManager.Error as e:
+        self.context.log.warn('Running pytest in a new interpreter: {}'.format(e))
+    # NB: This is `PEX.run`, save that the process runs in the given cwd rather than in the cwd of
+    # pants itself, which concurrent partitions must not change.
+    pex.clean_environment()
+    process = subprocess.Popen(pex.cmdline(args),
+                               cwd=cwd,
+                               preexec_fn=os.setsid if setsid else None,
+                               env=env,
+                               stdout=workunit.output('stdout'),
+                               stderr=workunit.output('stderr'))
     return SubprocessProcessHandler(process)
+
+  @property
+  def partition_parallelism(self):
+    # Coverage data is written to the working directory that all partitions share.
+    if self.get_options().coverage:
+      return 1
+    return super(PytestRun, self).partition_parallelism
@@ -0,0 +1,136 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""A warm pytest worker: runs pytest in a fork of itself for each request it receives.
+
+This module is embedded in the pytest PEX and run via PEX_MODULE, so it may only depend on the
+standard library and the requirements of that PEX. Its arguments are:
+
+  <pid file> <socket file> <idle timeout secs> [<module to preload>...]
+
+It imports pytest, the pytest plugins in its environment and the given modules, writes its pid and
+the path of the unix socket it listens on to the given files, and then serves requests until it
+has been idle for the given timeout. Each request is a line of json holding the `args`, `cwd`,
+`env` and `stdout`/`stderr` paths of a pytest run: the fork that serves it replies with a line
+holding its pid, and then with a line holding the exit code of pytest once it completes.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import importlib
+import json
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import traceback
+
+
+def _preload(modules):
+  importlib.import_module('pytest')
+
+  try:
+    import pkg_resources
+  except ImportError:
+    pass
+  else:
+    for entry_point in pkg_resources.iter_entry_points('pytest11'):
+      try:
+        entry_point.load()
+      except Exception:
+        # Pytest will report the plugin when it fails to load it again in a fork.
+        pass
+
+  for module in modules:
+    importlib.import_module(module)
+
+
+def _write(path, value):
+  tmp = '{}.tmp'.format(path)
+  with open(tmp, 'w') as fp:
+    fp.write(str(value))
+  os.rename(tmp, path)
+
+
+def _reply(conn, value):
+  conn.sendall('{}\n'.format(value).encode('utf-8'))
+
+
+def _run(conn):
+  """Runs pytest for the request on the given connection, in a fork of the worker."""
+  request = json.loads(conn.makefile('rb').readline().decode('utf-8'))
+  _reply(conn, os.getpid())
+
+  os.chdir(request['cwd'])
+  os.environ.clear()
+  os.environ.update(request['env'])
+  # The PYTHONPATH of the request is not seen by the interpreter, which has already started.
+  sys.path[:0] = [entry for entry in request['env'].get('PYTHONPATH', '').split(os.pathsep)
+                  if entry]
+  for fd, path in ((1, request['stdout']), (2, request['stderr'])):
+    out = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+    os.dup2(out, fd)
+    os.close(out)
+  sys.argv = [sys.argv[0]] + request['args']
+
+  import pytest
+  try:
+    rc = pytest.main(request['args'])
+  except SystemExit as e:
+    rc = e.code
+  except BaseException:
+    traceback.print_exc()
+    rc = 1
+  sys.stdout.flush()
+  sys.stderr.flush()
+  _reply(conn, int(rc or 0))
+
+
+def _serve(server, idle_timeout):
+  server.settimeout(idle_timeout)
+  while True:
+    try:
+      conn, _ = server.accept()
+    except socket.timeout:
+      return
+    conn.settimeout(None)
+    if os.fork() == 0:
+      try:
+        server.close()
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        # Leads its own process group, so that a client can stop pytest along with its subprocesses.
+        os.setsid()
+        _run(conn)
+      except BaseException:
+        traceback.print_exc()
+      finally:
+        os._exit(0)
+    conn.close()
+
+
+def main(pid_file, socket_file, idle_timeout, *modules):
+  # Forks are reaped as they exit: their exit codes are replied to their clients instead.
+  signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+  signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+  _preload(modules)
+
+  # A private directory keeps the socket short enough to bind, and other users from connecting.
+  socket_dir = tempfile.mkdtemp(prefix='pants-pytest-worker-')
+  try:
+    socket_path = os.path.join(socket_dir, 'socket')
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(64)
+    _write(pid_file, os.getpid())
+    _write(socket_file, socket_path)
+    _serve(server, float(idle_timeout))
+  finally:
+    shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+  main(*sys.argv[1:])
@@ -0,0 +1,221 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import errno
+import hashlib
+import json
+import logging
+import os
+import select
+import signal
+import socket
+import threading
+import time
+
+from future.utils import PY3
+
+from pants.pantsd.process_manager import FingerprintedProcessManager
+from pants.util.dirutil import read_file, safe_file_dump, safe_open
+from pants.util.process_handler import ProcessHandler, subprocess
+
+
+logger = logging.getLogger(__name__)
+
+
+class PytestWorkerManager(FingerprintedProcessManager):
+  """Manages a warm pytest worker, which runs pytest in a fork of itself for each run.
+
+  A worker is started from a pytest PEX with its `worker_module` as the PEX_MODULE, and imports
+  pytest, its plugins and any configured modules once. Each run is then served by a fork of it, so
+  that it starts with everything the worker imported, but without any state left behind by earlier
+  runs. The worker outlives the pants run that started it, and is restarted when the PEX, its
+  interpreter or the preloaded modules change. It exits once it has been idle for a while.
+
+  See `pants.backend.python.tasks.pytest_worker.server` for the worker side.
+  """
+
+  class Error(Exception):
+    """Indicates a failure to start or reach a pytest worker."""
+
+  # Serializes the (re)starts of workers by the concurrent partitions of a run.
+  _SPAWN_LOCK = threading.Lock()
+
+  def __init__(self, identity, workdir, startup_timeout=30, metadata_base_dir=None):
+    """
+    :param string identity: The name of the worker, which identifies it across runs.
+    :param string workdir: The directory to write the output of the worker itself to.
+    :param int startup_timeout: The number of seconds to wait for a new worker to start listening.
+    :param string metadata_base_dir: The overridden base directory for process metadata.
+    """
+    super(PytestWorkerManager, self).__init__(name=identity, socket_type=str,
+                                              metadata_base_dir=metadata_base_dir)
+    self._workdir = workdir
+    self._startup_timeout = startup_timeout
+
+  def __str__(self):
+    return 'PytestWorkerManager({name}, pid={pid} socket={socket})'.format(
+      name=self.name, pid=self.pid, socket=self.socket)
+
+  @staticmethod
+  def fingerprint_for(pex, preload_modules, idle_timeout):
+    """Returns the fingerprint of the worker for the given pytest PEX and configuration."""
+    digest = hashlib.sha1()
+    for item in [pex.path(), pex.interpreter.binary, str(idle_timeout)] + sorted(preload_modules):
+      digest.update(item.encode('utf-8'))
+      digest.update(b'\0')
+    return digest.hexdigest() if PY3 else digest.hexdigest().decode('utf-8')
+
+  def _socket_file(self):
+    return self._metadata_file_path(self.name, 'socket')
+
+  def is_alive(self):
+    """A ProcessManager.is_alive() override that ensures the process is the worker we started."""
+    socket_file = self._socket_file()
+    return super(PytestWorkerManager, self).is_alive(
+      lambda process: socket_file in process.cmdline())
+
+  def ensure_started(self, pex, worker_module, env, preload_modules=(), idle_timeout=600):
+    """Starts a worker for the given pytest PEX and configuration, unless one is already running.
+
+    :param pex: The pytest PEX to start the worker from.
+    :type pex: :class:`pex.pex.PEX`
+    :param string worker_module: The module of the worker server in the PEX.
+    :param dict env: The environment to start the worker in.
+    :param list preload_modules: Modules for the worker to import before it serves any runs.
+    :param int idle_timeout: The number of seconds the worker may be idle for before it exits.
+    """
+    fingerprint = self.fingerprint_for(pex, preload_modules, idle_timeout)
+    with self._SPAWN_LOCK:
+      if not self.needs_restart(fingerprint):
+        return
+      if self.is_alive():
+        logger.debug('Found a pytest worker that needs updating, killing {}'.format(self))
+        self.terminate()
+      self._spawn(pex, worker_module, env, preload_modules, idle_timeout, fingerprint)
+
+  def _spawn(self, pex, worker_module, env, preload_modules, idle_timeout, fingerprint):
+    """Synchronously spawn a new worker."""
+    stdout = os.path.join(self._workdir, 'stdout')
+    stderr = os.path.join(self._workdir, 'stderr')
+    safe_file_dump(stdout, b'', mode='wb')
+    safe_file_dump(stderr, b'', mode='wb')
+
+    # The worker writes its own pid and socket, once it has preloaded everything.
+    args = [self._metadata_file_path(self.name, 'pid'), self._socket_file(), str(idle_timeout)]
+    args.extend(preload_modules)
+    post_fork_child_opts = dict(pex=pex,
+                                args=args,
+                                env=dict(env, PEX_MODULE=worker_module),
+                                stdout=stdout,
+                                stderr=stderr)
+
+    logger.debug('Spawning pytest worker {} with fingerprint={}'.format(self.name, fingerprint))
+    self._process = None
+    self.daemon_spawn(pre_fork_opts=dict(fingerprint=fingerprint),
+                      post_fork_child_opts=post_fork_child_opts)
+    try:
+      self.await_pid(self._startup_timeout)
+      self.await_socket(self._startup_timeout)
+    except self.Timeout as e:
+      raise self.Error('The pytest worker failed to start: {}\n{}'
+                       .format(e, read_file(stderr, binary_mode=False)))
+    logger.debug('Spawned {}'.format(self))
+
+  def pre_fork(self, fingerprint):
+    """Pre-fork() callback for ProcessManager.daemon_spawn()."""
+    self.write_metadata_by_name(self.name, self.FINGERPRINT_KEY, fingerprint)
+
+  def post_fork_child(self, pex, args, env, stdout, stderr):
+    """Post-fork() child callback for ProcessManager.daemon_spawn()."""
+    pex.clean_environment()
+    subprocess.Popen(pex.cmdline(args),
+                     env=env,
+                     stdin=safe_open(os.devnull, 'r'),
+                     stdout=safe_open(stdout, 'w'),
+                     stderr=safe_open(stderr, 'w'),
+                     close_fds=True)
+
+  def run(self, args, cwd, env, stdout, stderr):
+    """Runs pytest in a fork of the started worker.
+
+    :param list args: The arguments to pytest.
+    :param string cwd: The directory to run pytest in.
+    :param dict env: The environment to run pytest in.
+    :param string stdout: The file to append the stdout of pytest to.
+    :param string stderr: The file to append the stderr of pytest to.
+    :rtype: :class:`PytestWorkerManager.Run`
+    """
+    request = json.dumps(dict(args=args, cwd=cwd, env=env, stdout=stdout, stderr=stderr))
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+      sock.connect(self.socket)
+      sock.sendall(request.encode('utf-8') + b'\n')
+      return self.Run(sock, args)
+    except (IOError, OSError) as e:
+      sock.close()
+      raise self.Error('Failed to run pytest via {}: {}'.format(self, e))
+
+  class Run(ProcessHandler):
+    """A pytest run in a fork of a worker, which replies with its pid and then its exit code."""
+
+    def __init__(self, sock, args):
+      self._sock = sock
+      self._args = args
+      self._buffer = b''
+      self._returncode = None
+      self._signal = None
+      pid = self._read_line(timeout=None)
+      if pid is None:
+        raise PytestWorkerManager.Error('The pytest worker exited before it forked for a run.')
+      self.pid = int(pid)
+
+    def _read_line(self, timeout):
+      """Returns the next line of the reply, or None at its end, or raises on timing out."""
+      deadline = None if timeout is None else time.time() + timeout
+      while b'\n' not in self._buffer:
+        remaining = None if deadline is None else max(0, deadline - time.time())
+        readable, _, _ = select.select([self._sock], [], [], remaining)
+        if not readable:
+          raise subprocess.TimeoutExpired(self._args, timeout)
+        data = self._sock.recv(4096)
+        if not data:
+          return None
+        self._buffer += data
+      line, _, self._buffer = self._buffer.partition(b'\n')
+      return line.decode('utf-8')
+
+    def wait(self, timeout=None):
+      if self._returncode is None:
+        rc = self._read_line(timeout)
+        self._sock.close()
+        if rc is not None:
+          self._returncode = int(rc)
+        else:
+          # The fork died before replying: most likely due to a signal we sent it.
+          self._returncode = -(self._signal or signal.SIGKILL)
+      return self._returncode
+
+    def poll(self):
+      try:
+        return self.wait(timeout=0)
+      except subprocess.TimeoutExpired:
+        return None
+
+    def _send_signal(self, signum):
+      if self._returncode is None:
+        self._signal = signum
+        try:
+          # The fork leads its own process group: this stops any subprocesses of pytest too.
+          os.killpg(self.pid, signum)
+        except OSError as e:
+          if e.errno != errno.ESRCH:
+            raise
+
+    def terminate(self):
+      self._send_signal(signal.SIGTERM)
+
+    def kill(self):
+      self._send_signal(signal.SIGKILL)
@@ -8,6 +8,7 @@ import hashlib
 import json
 import logging
 from builtins import bytes, object, open, str
+from json.encoder import encode_basestring_ascii
 
 from future.utils import PY3, binary_type, text_type
 from twitter.common.collections import OrderedSet
@@ -138,6 +139,191 @@ def json_hash(obj, digest=None, encoder=None):
   return hash_all([json_str], digest=digest)
 
 
+class _UnsupportedInput(Exception):
+  """Indicates an input that `_CanonicalJson` can't render exactly as `CoercingEncoder` would."""
+
+
+class _CanonicalJson(object):
+  """Renders objects to the same json that `json.dumps` renders them to with a `CoercingEncoder`.
+
+  `CoercingEncoder.default` first rebuilds the whole input as json-native objects, checking each
+  object against a series of abstract base classes, and `json.dumps` then walks the rebuilt objects
+  to render them. This renders the input in a single walk instead, dispatching on exact types.
+
+  The two walks differ in ways that matter to the output: eg, a dict in a list is rendered by the
+  json module with its keys sorted as they are, but a dict in a tuple is coerced first, and has its
+  keys sorted as strings. So objects are rendered in one of two modes: `coerced` for objects that
+  `CoercingEncoder.default` is applied to, and `native` for those that the json module renders
+  itself. Types that aren't handled here, including subclasses of the handled types, raise
+  `_UnsupportedInput` before any iterator in the input is consumed, so that callers can fall back
+  to `json.dumps`.
+  """
+
+  @classmethod
+  def render(cls, obj):
+    chunks = []
+    cls._coerced(obj, chunks)
+    return ''.join(chunks)
+
+  @classmethod
+  def _coerced(cls, obj, chunks):
+    render = cls._COERCED.get(type(obj))
+    if render is None:
+      raise _UnsupportedInput()
+    render(obj, chunks)
+
+  @classmethod
+  def _native(cls, obj, chunks):
+    render = cls._NATIVE.get(type(obj))
+    if render is None:
+      raise _UnsupportedInput()
+    render(obj, chunks)
+
+  @staticmethod
+  def _str(obj, chunks):
+    chunks.append(encode_basestring_ascii(obj))
+
+  @staticmethod
+  def _const(obj, chunks):
+    chunks.append('null' if obj is None else ('true' if obj else 'false'))
+
+  @staticmethod
+  def _int(obj, chunks):
+    chunks.append(int.__repr__(obj))
+
+  @staticmethod
+  def _float(obj, chunks):
+    if obj != obj or obj in (float('inf'), float('-inf')):
+      raise _UnsupportedInput()
+    chunks.append(float.__repr__(obj))
+
+  @classmethod
+  def _sequence(cls, render_item, obj, chunks):
+    chunks.append('[')
+    for i, item in enumerate(obj):
+      if i:
+        chunks.append(', ')
+      render_item(item, chunks)
+    chunks.append(']')
+
+  @classmethod
+  def _native_sequence(cls, obj, chunks):
+    cls._sequence(cls._native, obj, chunks)
+
+  @classmethod
+  def _coerced_sequence(cls, obj, chunks):
+    # Natively encodable for `CoercingEncoder`, and so rendered by the json module.
+    cls._sequence(cls._native, obj, chunks)
+
+  @classmethod
+  def _coerced_iterable(cls, obj, chunks):
+    cls._sequence(cls._coerced, obj, chunks)
+
+  @classmethod
+  def _str_keyed_dict(cls, render_value, obj, chunks):
+    """Renders a dict whose keys are all strings, which both modes sort as they are."""
+    chunks.append('{')
+    for i, key in enumerate(sorted(obj)):
+      if i:
+        chunks.append(', ')
+      chunks.append(encode_basestring_ascii(key))
+      chunks.append(': ')
+      render_value(obj[key], chunks)
+    chunks.append('}')
+
+  @classmethod
+  def _native_dict(cls, obj, chunks):
+    if all(type(key) is str for key in obj):
+      cls._str_keyed_dict(cls._native, obj, chunks)
+      return
+    rendered = []
+    for key, value in sorted(obj.items()):
+      key_type = type(key)
+      if key_type is str:
+        key_str = key
+      elif key_type is float:
+        key_str = float.__repr__(key)
+      elif key is None or key_type is bool:
+        key_str = 'null' if key is None else ('true' if key else 'false')
+      elif key_type is int:
+        key_str = int.__repr__(key)
+      else:
+        raise _UnsupportedInput()
+      value_chunks = []
+      cls._native(value, value_chunks)
+      rendered.append((key_str, value_chunks))
+    cls._dict_items(rendered, chunks)
+
+  @classmethod
+  def _coerced_dict(cls, obj, chunks):
+    if all(type(key) is str for key in obj):
+      cls._str_keyed_dict(cls._coerced, obj, chunks)
+      return
+    # As `CoercingEncoder.default`, which renders keys that aren't strings to json strings, and keeps
+    # the last value for keys that collide.
+    coerced = {}
+    for key, value in sorted(obj.items(), key=lambda x: x[0]):
+      key_type = type(key)
+      if key_type is str:
+        key_str = key
+      elif key_type is bytes:
+        key_str = key.decode('utf-8')
+      else:
+        key_str = cls.render(key)
+      value_chunks = []
+      cls._coerced(value, value_chunks)
+      coerced[key_str] = value_chunks
+    # The json module then sorts the coerced keys.
+    cls._dict_items(sorted(coerced.items(), key=lambda x: x[0]), chunks)
+
+  @staticmethod
+  def _dict_items(items, chunks):
+    chunks.append('{')
+    for i, (key_str, value_chunks) in enumerate(items):
+      if i:
+        chunks.append(', ')
+      chunks.append(encode_basestring_ascii(key_str))
+      chunks.append(': ')
+      chunks.extend(value_chunks)
+    chunks.append('}')
+
+  @classmethod
+  def _set(cls, obj, chunks):
+    # `CoercingEncoder.default` sorts the coerced items, which are the items themselves only for
+    # strings and numbers.
+    item_types = set(type(item) for item in obj)
+    if not (item_types <= {str} or item_types <= {int, float}):
+      raise _UnsupportedInput()
+    cls._sequence(cls._native, sorted(obj), chunks)
+
+
+_CanonicalJson._NATIVE = {
+  str: _CanonicalJson._str,
+  type(None): _CanonicalJson._const,
+  bool: _CanonicalJson._const,
+  int: _CanonicalJson._int,
+  float: _CanonicalJson._float,
+  list: _CanonicalJson._native_sequence,
+  tuple: _CanonicalJson._native_sequence,
+  dict: _CanonicalJson._native_dict,
+  # The json module hands sets to `CoercingEncoder.default`.
+  set: _CanonicalJson._set,
+  frozenset: _CanonicalJson._set,
+}
+_CanonicalJson._COERCED = {
+  str: _CanonicalJson._str,
+  type(None): _CanonicalJson._const,
+  bool: _CanonicalJson._const,
+  int: _CanonicalJson._int,
+  float: _CanonicalJson._float,
+  list: _CanonicalJson._coerced_sequence,
+  tuple: _CanonicalJson._coerced_iterable,
+  dict: _CanonicalJson._coerced_dict,
+  set: _CanonicalJson._set,
+  frozenset: _CanonicalJson._set,
+}
+
+
 # TODO(#6513): something like python 3's @lru_cache decorator could be useful here!
 def stable_json_sha1(obj, digest=None):
   """Hashes `obj` stably; ie repeated calls with the same inputs will produce the same hash.
@@ -149,6 +335,15 @@ def stable_json_sha1(obj, digest=None):
 
   :API: public
   """
+  if PY3:
+    # The json that `CoercingEncoder` renders objects to is rendered directly where possible, which
+    # produces the same hashes several times faster.
+    try:
+      json_str = _CanonicalJson.render(obj)
+    except (_UnsupportedInput, TypeError, ValueError):
+      pass
+    else:
+      return hash_all([json_str], digest=digest)
   return json_hash(obj, digest=digest, encoder=CoercingEncoder)
 
 
@@ -260,6 +260,10 @@ class DaemonPantsRunner(object):
     client_start_time = env.pop('PANTSD_RUNTRACKER_CLIENT_START_TIME', None)
     return None if client_start_time is None else float(client_start_time)
 
+  def _maybe_get_queue_time_from_env(self, env):
+    queue_time = env.pop('PANTSD_RUNTRACKER_QUEUE_TIME', None)
+    return None if queue_time is None else float(queue_time)
+
   def run(self):
     # Ensure anything referencing sys.argv inherits the Pailgun'd args.
     sys.argv = self._args
@@ -291,6 +295,7 @@ class DaemonPantsRunner(object):
           self._options_bootstrapper,
         )
         runner.set_start_time(self._maybe_get_client_start_time_from_env(self._env))
+        runner.set_queue_time(self._maybe_get_queue_time_from_env(self._env))
 
         runner.run()
       except KeyboardInterrupt:
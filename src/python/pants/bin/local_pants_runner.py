@@ -226,6 +226,11 @@ class LocalPantsRunner(object):
     self._exiter = LocalExiter(self._run_tracker, self._repro, exiter=self._exiter)
     ExceptionSink.reset_exiter(self._exiter)
 
+  def set_queue_time(self, queue_time):
+    """Records the seconds this run waited for other runs of the daemon to complete, if any."""
+    if queue_time is not None:
+      self._run_tracker.pantsd_stats.set_queue_time(queue_time)
+
   def run(self):
     with maybe_profiled(self._profile_path):
       self._run()
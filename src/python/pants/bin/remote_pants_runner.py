@@ -141,6 +141,8 @@ class RemotePantsRunner(object):
     ng_env = NailgunProtocol.isatty_to_env(self._stdin, self._stdout, self._stderr)
     modified_env = combined_dict(self._env, ng_env)
     modified_env['PANTSD_RUNTRACKER_CLIENT_START_TIME'] = str(self._start_time)
+    modified_env['PANTSD_REQUEST_TIMEOUT_LIMIT'] = str(
+      self._bootstrap_options.for_global_scope().pantsd_timeout_when_multiple_invocations)
 
     assert isinstance(port, int), 'port {} is not an integer!'.format(port)
 
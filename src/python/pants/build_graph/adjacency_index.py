@@ -0,0 +1,63 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from builtins import object
+
+
+class AdjacencyIndex(object):
+  """The addresses of a BuildGraph interned to dense int ids, with its edges as lists of ids.
+
+  Traversals over ids track the vertices they have seen in sets of ints, rather than hashing and
+  comparing Addresses in python for every edge they follow.
+
+  The index is kept up to date as targets and dependencies are injected, rather than packed into
+  flat edge arrays, since v1 build graphs keep growing between walks (eg: with synthetic targets).
+  Ids are never reused until the index is discarded.
+  """
+
+  def __init__(self):
+    self._id_by_address = {}
+    # The Address, Target (or None if it was never injected), dependencies and dependees of each id.
+    self.addresses = []
+    self.targets = []
+    self.dependencies = []
+    self.dependees = []
+
+  def __len__(self):
+    return len(self.addresses)
+
+  def id_of(self, address):
+    """Returns the id of the given address, or raises KeyError if it was never indexed."""
+    return self._id_by_address[address]
+
+  def intern(self, address):
+    """Returns the id of the given address, assigning it one if it has none yet."""
+    vertex = self._id_by_address.get(address)
+    if vertex is None:
+      vertex = len(self.addresses)
+      self._id_by_address[address] = vertex
+      self.addresses.append(address)
+      self.targets.append(None)
+      self.dependencies.append([])
+      self.dependees.append([])
+    return vertex
+
+  def set_target(self, address, target):
+    self.targets[self.intern(address)] = target
+
+  def add_dependency(self, dependent, dependency):
+    """Adds an edge: the caller is responsible for adding each edge only once."""
+    dependent_id = self.intern(dependent)
+    dependency_id = self.intern(dependency)
+    self.dependencies[dependent_id].append(dependency_id)
+    self.dependees[dependency_id].append(dependent_id)
+
+  def target(self, vertex):
+    """Returns the target with the given id, or raises KeyError if it was never injected."""
+    target = self.targets[vertex]
+    if target is None:
+      raise KeyError(self.addresses[vertex])
+    return target
@@ -15,6 +15,7 @@ from twitter.common.collections import OrderedSet
 
 from pants.build_graph.address import Address
 from pants.build_graph.address_lookup_error import AddressLookupError
+from pants.build_graph.adjacency_index import AdjacencyIndex
 from pants.build_graph.injectables_mixin import InjectablesMixin
 from pants.build_graph.target import Target
 from pants.util.collections_abc_backport import OrderedDict
@@ -135,6 +136,8 @@ class BuildGraph(AbstractClass):
     self._derived_from_by_derivative = {}  # Address -> Address.
     self._derivatives_by_derived_from = defaultdict(list)   # Address -> list of Address.
     self.synthetic_addresses = set()
+    # The targets and dependencies above, indexed by int ids for transitive walks.
+    self._adjacency_index = AdjacencyIndex()
 
   def add_invalidation_callback(self, callback):
     """Adds a no-arg function that will be called whenever the graph is changed.
@@ -293,7 +296,7 @@ class BuildGraph(AbstractClass):
     if derived_from or synthetic:
       self.synthetic_addresses.add(address)
 
-    self._target_by_address[address] = target
+    self._set_target(address, target)
 
     for dependency_address in dependencies:
       self.inject_dependency(dependent=address, dependency=dependency_address)
@@ -335,8 +338,17 @@ class BuildGraph(AbstractClass):
       logger.debug('{dependent} already depends on {dependency}'
                    .format(dependent=dependent, dependency=dependency))
     else:
-      self._target_dependencies_by_address[dependent].add(dependency)
-      self._target_dependees_by_address[dependency].add(dependent)
+      self._add_dependency(dependent, dependency)
+
+  def _set_target(self, address, target):
+    self._target_by_address[address] = target
+    self._adjacency_index.set_target(address, target)
+
+  def _add_dependency(self, dependent, dependency):
+    """Adds an edge that the graph does not already have, without any validation."""
+    self._target_dependencies_by_address[dependent].add(dependency)
+    self._target_dependees_by_address[dependency].add(dependent)
+    self._adjacency_index.add_dependency(dependent, dependency)
 
   def targets(self, predicate=None):
     """Returns all the targets in the graph in no particular order.
@@ -401,37 +413,54 @@ class BuildGraph(AbstractClass):
       It is not run if ``predicate`` is not passed.
     """
     walk = self._walk_factory(dep_predicate)
+    index = self._adjacency_index
+    # The walk is iterative, so that deep graphs do not exhaust the stack: each frame holds the id,
+    # target and level of a target being walked, and the position of its next dependency to walk.
+    stack = []
+
+    def enter(vertex, level):
+      """Visits the given target, and returns True if its dependencies should be walked."""
+      # If we've followed an edge to this target, stop recursing.
+      if not walk.expand_once(vertex, level):
+        return False
 
-    def _walk_rec(addr, level=0):
-      # If we've followed an edge to this address, stop recursing.
-      if not walk.expand_once(addr, level):
-        return
-
-      target = self._target_by_address[addr]
+      target = index.target(vertex)
 
       if predicate and not predicate(target):
-        return
+        return False
 
-      if not postorder and walk.do_work_once(addr):
+      if not postorder and walk.do_work_once(vertex):
         work(target)
 
       if prelude:
         prelude(target)
 
-      for dep_address in self._target_dependencies_by_address[addr]:
-        if walk.expanded_or_worked(dep_address):
-          continue
-        if walk.dep_predicate(target, self._target_by_address[dep_address], level):
-          _walk_rec(dep_address, level + 1)
+      stack.append([vertex, target, level, 0])
+      return True
 
-      if epilogue:
-        epilogue(target)
+    for address in addresses:
+      enter(index.id_of(address), 0)
+      while stack:
+        frame = stack[-1]
+        vertex, target, level, position = frame
+        dep_ids = index.dependencies[vertex]
+        while position < len(dep_ids):
+          dep_id = dep_ids[position]
+          position += 1
+          if walk.expanded_or_worked(dep_id):
+            continue
+          if walk.dep_predicate(target, index.target(dep_id), level):
+            frame[3] = position
+            if enter(dep_id, level + 1):
+              break
+        else:
+          stack.pop()
 
-      if postorder and walk.do_work_once(addr):
-        work(target)
+          if epilogue:
+            epilogue(target)
 
-    for address in addresses:
-      _walk_rec(address)
+          if postorder and walk.do_work_once(vertex):
+            work(target)
 
   def walk_transitive_dependee_graph(self,
                                      addresses,
@@ -448,25 +477,47 @@ class BuildGraph(AbstractClass):
 
     :API: public
     """
+    index = self._adjacency_index
     walked = set()
+    # As in `walk_transitive_dependency_graph`, frames hold the id and target of a target being
+    # walked, and the position of its next dependee to walk.
+    stack = []
+
+    def enter(vertex):
+      """Visits the given target, and returns True if its dependees should be walked."""
+      walked.add(vertex)
+      target = index.target(vertex)
+      if predicate and not predicate(target):
+        return False
+      if not postorder:
+        work(target)
+      if prelude:
+        prelude(target)
+      stack.append([vertex, target, 0])
+      return True
 
-    def _walk_rec(addr):
-      if addr not in walked:
-        walked.add(addr)
-        target = self._target_by_address[addr]
-        if not predicate or predicate(target):
-          if not postorder:
-            work(target)
-          if prelude:
-            prelude(target)
-          for dep_address in self._target_dependees_by_address[addr]:
-            _walk_rec(dep_address)
+    for address in addresses:
+      vertex = index.id_of(address)
+      if vertex in walked:
+        continue
+      enter(vertex)
+      while stack:
+        frame = stack[-1]
+        vertex, target, position = frame
+        dependee_ids = index.dependees[vertex]
+        while position < len(dependee_ids):
+          dependee_id = dependee_ids[position]
+          position += 1
+          if dependee_id not in walked:
+            frame[2] = position
+            if enter(dependee_id):
+              break
+        else:
+          stack.pop()
           if epilogue:
             epilogue(target)
           if postorder:
             work(target)
-    for address in addresses:
-      _walk_rec(address)
 
   def transitive_dependees_of_addresses(self, addresses, predicate=None, postorder=False):
     """Returns all transitive dependees of `addresses`.
@@ -533,25 +584,26 @@ class BuildGraph(AbstractClass):
       will not be expanded.
     """
     walk = self._walk_factory(dep_predicate)
+    index = self._adjacency_index
 
     ordered_closure = OrderedSet()
-    to_walk = deque((0, addr) for addr in addresses)
+    to_walk = deque((0, index.id_of(addr)) for addr in addresses)
     while len(to_walk) > 0:
-      level, address = to_walk.popleft()
+      level, vertex = to_walk.popleft()
 
-      if not walk.expand_once(address, level):
+      if not walk.expand_once(vertex, level):
         continue
 
-      target = self._target_by_address[address]
+      target = index.target(vertex)
       if predicate and not predicate(target):
         continue
-      if walk.do_work_once(address):
+      if walk.do_work_once(vertex):
         ordered_closure.add(target)
-      for dep_address in self._target_dependencies_by_address[address]:
-        if walk.expanded_or_worked(dep_address):
+      for dep_id in index.dependencies[vertex]:
+        if walk.expanded_or_worked(dep_id):
           continue
-        if walk.dep_predicate(target, self._target_by_address[dep_address], level):
-          to_walk.append((level + 1, dep_address))
+        if walk.dep_predicate(target, index.target(dep_id), level):
+          to_walk.append((level + 1, dep_id))
     return ordered_closure
 
   def inject_synthetic_target(self,
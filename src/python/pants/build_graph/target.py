@@ -448,8 +448,6 @@ class Target(AbstractTarget):
       fingerprint_map = self._cached_all_transitive_fingerprint_map
 
     if fingerprint_strategy not in fingerprint_map:
-      hasher = sha1()
-
       def dep_hash_iter():
         dep_list = fingerprint_strategy.dependencies(self) if direct else self.dependencies
         for dep in dep_list:
@@ -464,18 +462,54 @@ class Target(AbstractTarget):
             raise self.RecursiveDepthError("{message}\n  referenced from {spec}"
                                            .format(message=e, spec=dep.address.spec))
 
-      dep_hashes = sorted(list(dep_hash_iter()))
-      for dep_hash in dep_hashes:
-        hasher.update(dep_hash.encode('utf-8'))
-      target_hash = self.invalidation_hash(fingerprint_strategy)
-      if target_hash is None and not dep_hashes:
+      dep_hashes = list(dep_hash_iter())
+      combined_hash = self._combine_invalidation_hashes(self.invalidation_hash(fingerprint_strategy),
+                                                        dep_hashes)
+      if combined_hash is None:
         return None
-      dependencies_hash = hasher.hexdigest()[:12]
-      combined_hash = '{target_hash}.{deps_hash}'.format(target_hash=target_hash,
-                                                         deps_hash=dependencies_hash)
       fingerprint_map[fingerprint_strategy] = combined_hash
     return fingerprint_map[fingerprint_strategy]
 
+  @staticmethod
+  def _combine_invalidation_hashes(target_hash, dep_hashes):
+    """Combines the invalidation hash of a target with the (non-None) hashes of its dependencies."""
+    if target_hash is None and not dep_hashes:
+      return None
+    hasher = sha1()
+    for dep_hash in sorted(dep_hashes):
+      hasher.update(dep_hash.encode('utf-8'))
+    dependencies_hash = hasher.hexdigest()[:12]
+    return '{target_hash}.{deps_hash}'.format(target_hash=target_hash, deps_hash=dependencies_hash)
+
+  @classmethod
+  def compute_transitive_invalidation_hashes(cls, targets, fingerprint_strategy=None):
+    """Memoizes the transitive invalidation hashes of the given targets and their dependencies.
+
+    The hashes are those of `transitive_invalidation_hash` for dependencies (ie, at depth > 0), but
+    are combined in a single pass over the closure of the targets in dependency order, rather than
+    recursively. Computing the invalidation hashes of the closure beforehand, eg in parallel, leaves
+    only the combining to this pass.
+
+    :API: public
+
+    :param targets: The targets whose transitive hashes to compute.
+    :param FingerprintStrategy fingerprint_strategy: optional fingerprint strategy to use to compute
+    the fingerprint of a target
+    """
+    fingerprint_strategy = fingerprint_strategy or DefaultFingerprintStrategy()
+    hashes = {}
+    # In postorder, the dependencies of each target are visited before it.
+    for target in cls.closure_for_targets(targets, bfs=False, postorder=True):
+      fingerprint_map = target._cached_all_transitive_fingerprint_map
+      combined_hash = fingerprint_map.get(fingerprint_strategy)
+      if combined_hash is None:
+        dep_hashes = [hashes[dep] for dep in target.dependencies if hashes[dep] is not None]
+        combined_hash = cls._combine_invalidation_hashes(
+          target.invalidation_hash(fingerprint_strategy), dep_hashes)
+        if combined_hash is not None:
+          fingerprint_map[fingerprint_strategy] = combined_hash
+      hashes[target] = combined_hash
+
   def mark_transitive_invalidation_hash_dirty(self):
     """
     :API: public
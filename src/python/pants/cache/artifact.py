@@ -6,9 +6,14 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import os
 import shutil
+import struct
+import tempfile
+import zlib
+from builtins import open
+from contextlib import contextmanager
 
 from pants.util.contextutil import open_tar
-from pants.util.dirutil import safe_mkdir, safe_mkdir_for, safe_walk
+from pants.util.dirutil import safe_mkdir, safe_mkdir_for, safe_rmtree, safe_walk
 
 
 class ArtifactError(Exception):
@@ -82,23 +87,38 @@ class TarballArtifact(Artifact):
 
   NATIVE_BINARY = None
 
+  # The supported compression codecs, and the file extension used for tarballs compressed with each.
+  # Native extraction detects the codec of a tarball from its contents.
+  # In our tests, gzip is slightly less compressive than bzip2 on .class files,
+  # but decompression times are much faster. Uncompressed tarballs trade disk and network for CPU.
+  GZIP = 'gzip'
+  UNCOMPRESSED = 'none'
+  EXTENSIONS = {
+    GZIP: '.tgz',
+    UNCOMPRESSED: '.tar',
+  }
+
   # TODO: Expose `dereference` for tasks.
   # https://github.com/pantsbuild/pants/issues/3961
-  def __init__(self, artifact_root, tarfile_, compression=9, dereference=True):
+  def __init__(self, artifact_root, tarfile_, compression=9, dereference=True, codec=GZIP):
     super(TarballArtifact, self).__init__(artifact_root)
+    if codec not in self.EXTENSIONS:
+      raise ValueError('Unknown tarball compression codec: {}'.format(codec))
     self._tarfile = tarfile_
     self._compression = compression
     self._dereference = dereference
+    self._codec = codec
 
   def exists(self):
     return os.path.isfile(self._tarfile)
 
   def collect(self, paths):
-    # In our tests, gzip is slightly less compressive than bzip2 on .class files,
-    # but decompression times are much faster.
-    mode = 'w:gz'
-
-    tar_kwargs = {'dereference': self._dereference, 'errorlevel': 2, 'compresslevel': self._compression}
+    tar_kwargs = {'dereference': self._dereference, 'errorlevel': 2}
+    if self._codec == self.GZIP:
+      mode = 'w:gz'
+      tar_kwargs['compresslevel'] = self._compression
+    else:
+      mode = 'w'
 
     with open_tar(self._tarfile, mode, **tar_kwargs) as tarout:
       for path in paths or ():
@@ -115,3 +135,180 @@ class TarballArtifact(Artifact):
                                             self._artifact_root.encode('utf-8'))
     except Exception as e:
       raise ArtifactError("Extracting artifact failed:\n{}".format(e))
+
+  def extract_stream(self, chunks):
+    """Extract this artifact from a stream, while also writing the stream to this artifact's tarball.
+
+    The files are extracted into a staging directory and only moved into place under the artifact
+    root once the stream has been completely read and verified, so a truncated or corrupt stream
+    leaves no partially extracted files behind. The tarball will also be incomplete in that case,
+    and so should be discarded by the caller.
+
+    :param chunks: An iterator over the bytes of a tarball compressed with this artifact's codec.
+    """
+    safe_mkdir(self._artifact_root)
+    staging_dir = tempfile.mkdtemp(dir=self._artifact_root, prefix='.artifact-staging-')
+    try:
+      with open(self._tarfile, 'wb') as tarball:
+        with self.open_stream(chunks, codec=self._codec, sink=tarball.write) as tarin:
+          tarin.extractall(staging_dir)
+      _move_tree_into(staging_dir, self._artifact_root)
+    except Exception as e:
+      raise ArtifactError("Extracting artifact stream failed:\n{}".format(e))
+    finally:
+      safe_rmtree(staging_dir)
+
+  @classmethod
+  @contextmanager
+  def open_stream(cls, chunks, codec=GZIP, sink=None):
+    """A with-context yielding a `TarFile` that reads the members of a tarball from a stream.
+
+    The members must be consumed in order. On exit, the stream is checked to have been complete,
+    raising an ArtifactError if it was truncated or corrupt.
+
+    :param chunks: An iterator over the bytes of a tarball compressed with the given codec.
+    :param sink: An optional callable that is handed each chunk as it is consumed.
+    """
+    reader_type = _GzipStreamReader if codec == cls.GZIP else _TarStreamReader
+    stream = reader_type(chunks, sink or (lambda chunk: None))
+    with open_tar(stream, 'r|', errorlevel=2) as tarin:
+      yield tarin
+    stream.verify()
+
+
+def _move_tree_into(src_root, dst_root):
+  """Moves the files under `src_root` to the same relative paths under `dst_root`.
+
+  Existing files at the destination are replaced; existing directories are merged into.
+  """
+  for dir_name, dirnames, filenames in os.walk(src_root):
+    dst_dir = os.path.join(dst_root, os.path.relpath(dir_name, src_root))
+    safe_mkdir(dst_dir)
+    # `os.walk` reports symlinks to directories as directories, but they move like files.
+    links = [d for d in dirnames if os.path.islink(os.path.join(dir_name, d))]
+    dirnames[:] = [d for d in dirnames if d not in links]
+    for name in filenames + links:
+      os.rename(os.path.join(dir_name, name), os.path.join(dst_dir, name))
+
+
+class _TarStreamReader(object):
+  """A file-like reader over the contents of an uncompressed tar stream.
+
+  Each chunk of input is handed to `sink` as it is consumed. Once the consumer is done reading,
+  `verify` drains any remaining input and checks that the stream ended with a tar end-of-archive
+  marker: a stream truncated at a member boundary would otherwise look like a complete (but shorter)
+  tarball.
+  """
+
+  # A tar archive is a sequence of 512 byte blocks, ending with two zero-filled blocks.
+  _BLOCK_SIZE = 512
+  _END_OF_ARCHIVE = b'\x00' * 1024
+
+  def __init__(self, chunks, sink):
+    self._chunks = iter(chunks)
+    self._sink = sink
+    # Decoded input is appended to `_buffer`, and read from `_offset` onwards.
+    self._buffer = bytearray()
+    self._offset = 0
+    self._tail = b''
+    self._decoded_size = 0
+
+  def read(self, size=-1):
+    while (size < 0 or len(self._buffer) - self._offset < size) and self._fill():
+      pass
+    end = len(self._buffer) if size < 0 else min(self._offset + size, len(self._buffer))
+    data = bytes(self._buffer[self._offset:end])
+    self._offset = end
+    # Only discard read input once it makes up most of the buffer, so that reading a large chunk in
+    # small records does not copy the rest of the chunk for each record.
+    if self._offset * 2 >= len(self._buffer):
+      del self._buffer[:self._offset]
+      self._offset = 0
+    return data
+
+  def verify(self):
+    while self._fill():
+      pass
+    if self._decoded_size % self._BLOCK_SIZE or self._tail != self._END_OF_ARCHIVE:
+      raise ArtifactError('Truncated tar stream.')
+
+  def _fill(self):
+    """Decodes another chunk of input into the buffer, returning False once input is exhausted."""
+    chunk = next(self._chunks, None)
+    if chunk is None:
+      return False
+    self._sink(chunk)
+    data = self._decode(chunk)
+    if data:
+      self._tail = (self._tail + data[-len(self._END_OF_ARCHIVE):])[-len(self._END_OF_ARCHIVE):]
+      self._decoded_size += len(data)
+      self._buffer += data
+    return True
+
+  def _decode(self, chunk):
+    return chunk
+
+
+class _GzipStreamReader(_TarStreamReader):
+  """A file-like reader over the decompressed contents of a gzipped tar stream.
+
+  In addition to the end-of-archive marker, `verify` checks the gzip trailer.
+  """
+
+  _MAGIC = b'\x1f\x8b'
+  _FHCRC, _FEXTRA, _FNAME, _FCOMMENT = 0x02, 0x04, 0x08, 0x10
+
+  def __init__(self, chunks, sink):
+    super(_GzipStreamReader, self).__init__(chunks, sink)
+    # Raw deflate: we parse the gzip header and trailer ourselves, so that the end of the stream
+    # can be detected without relying on `decompressobj().eof`, which is python 3 only.
+    self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+    self._header = b''
+    self._in_body = False
+    self._crc = 0
+
+  def verify(self):
+    super(_GzipStreamReader, self).verify()
+    trailer = self._decompressor.unused_data
+    if not self._in_body or len(trailer) < 8:
+      raise ArtifactError('Truncated gzip stream.')
+    crc, size = struct.unpack(b'<II', trailer[:8])
+    if crc != self._crc & 0xffffffff or size != self._decoded_size & 0xffffffff:
+      raise ArtifactError('Corrupt gzip stream: crc or length mismatch.')
+
+  def _decode(self, chunk):
+    if not self._in_body:
+      self._header += chunk
+      chunk = self._consume_header()
+    if not chunk:
+      return None
+    data = self._decompressor.decompress(chunk)
+    self._crc = zlib.crc32(data, self._crc)
+    return data
+
+  def _consume_header(self):
+    """Returns the deflate data following the gzip header once the complete header is buffered."""
+    header = self._header
+    if len(header) < 10:
+      return None
+    if header[:2] != self._MAGIC or bytearray(header[2:3])[0] != 8:
+      raise ArtifactError('Not a gzip stream.')
+    flags = bytearray(header[3:4])[0]
+    offset = 10
+    if flags & self._FEXTRA:
+      if len(header) < offset + 2:
+        return None
+      offset += 2 + struct.unpack(b'<H', header[offset:offset + 2])[0]
+    for flag in (self._FNAME, self._FCOMMENT):
+      if flags & flag:
+        end = header.find(b'\x00', offset)
+        if end == -1:
+          return None
+        offset = end + 1
+    if flags & self._FHCRC:
+      offset += 2
+    if len(header) < offset:
+      return None
+    self._in_body = True
+    self._header = b''
+    return header[offset:]
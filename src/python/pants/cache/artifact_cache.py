@@ -9,6 +9,8 @@ import os
 import sys
 from builtins import object
 
+from pants.cache.cache_telemetry import CacheTelemetry
+
 
 # Note throughout the distinction between the artifact_root (which is where the artifacts are
 # originally built and where the cache restores them to) and the cache root path/URL (which is
@@ -66,6 +68,8 @@ class ArtifactCache(object):
     All artifacts must be under artifact_root.
     """
     self.artifact_root = artifact_root
+    # Replaced by the run's telemetry when the cache is created for a task: see `CacheFactory`.
+    self.telemetry = CacheTelemetry()
 
   def prune(self):
     """Prune stale cache files
@@ -75,6 +79,13 @@ class ArtifactCache(object):
     """
     pass
 
+  def evict(self):
+    """Evict cached artifacts to keep the cache within its configured bounds, if it has any.
+
+    Called in the background after artifacts have been inserted.
+    """
+    pass
+
   def insert(self, cache_key, paths, overwrite=False):
     """Cache the output of a build.
 
@@ -114,6 +125,28 @@ class ArtifactCache(object):
   def has(self, cache_key):
     pass
 
+  def has_many(self, cache_keys):
+    """Check for the presence of artifacts for many keys at once.
+
+    Subclasses may override this to answer in fewer round trips than one `has` call per key.
+
+    :param list cache_keys: A list of CacheKey objects.
+    :returns: A list of booleans, one per input key and in the same order, indicating whether the
+              cache (probably) holds an artifact for that key. A `True` is only a hint: the
+              artifact may still fail to be read by `use_cached_files`.
+    :rtype: list of bool
+    """
+    return self._has_many(cache_keys)
+
+  def _has_many(self, cache_keys):
+    """Checks for many keys at once, like `has_many`, but without recording any lookups.
+
+    Callers only call `use_cached_files`, which records the outcome of a lookup, for the keys that
+    `has_many` reports present: so an implementation of `has_many` that records lookups records a
+    miss for each of the others, and composite caches check their layers via this method instead.
+    """
+    return [bool(self.has(cache_key)) for cache_key in cache_keys]
+
   def use_cached_files(self, cache_key, results_dir=None):
     """Use the files cached for the given key.
 
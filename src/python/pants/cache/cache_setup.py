@@ -11,13 +11,17 @@ from collections import namedtuple
 
 from future.moves.urllib.parse import urlparse
 
-from pants.base.build_environment import get_buildroot
+from pants.base.build_environment import get_buildroot, get_pants_cachedir
 from pants.cache.artifact import TarballArtifact
 from pants.cache.artifact_cache import ArtifactCacheError
+from pants.cache.content_addressed_artifact_cache import ContentAddressedLocalArtifactCache
 from pants.cache.local_artifact_cache import LocalArtifactCache, TempLocalArtifactCache
+from pants.cache.local_cache_eviction import LRUEvictionPolicy, record_task_name
+from pants.cache.negative_lookup_cache import NegativeLookupCache
 from pants.cache.pinger import BestUrlSelector, Pinger
 from pants.cache.resolver import NoopResolver, Resolver, RESTfulResolver
 from pants.cache.restful_artifact_cache import RESTfulArtifactCache
+from pants.cache.upload_queue import ArtifactUploadQueue
 from pants.subsystem.subsystem import Subsystem
 from pants.util.memo import memoized_property
 
@@ -46,6 +50,10 @@ CacheSpec = namedtuple('CacheSpec', ['local', 'remote'])
 class CacheSetup(Subsystem):
   options_scope = 'cache'
 
+  # The formats of local caches.
+  TARBALL = 'tarball'
+  CONTENT_ADDRESSED = 'content-addressed'
+
   @classmethod
   def register_options(cls, register):
     super(CacheSetup, cls).register_options(register)
@@ -78,12 +86,61 @@ class CacheSetup(Subsystem):
              help='The read timeout for any remote caches in use, in seconds.')
     register('--write-timeout', advanced=True, type=float, default=4.0,
              help='The write timeout for any remote caches in use, in seconds.')
+    register('--max-concurrent-requests', advanced=True, type=int, default=16,
+             help='The maximum number of requests to have in flight to a remote cache at once '
+                  'when checking for the artifacts of many targets.')
+    register('--remote-miss-ttl', advanced=True, type=int, default=0,
+             help='The number of seconds to remember that an artifact was missing from a remote '
+                  'cache, during which it is not requested again unless this host inserts it. '
+                  'Remembered misses are shared by the runs on a host, under the local cache '
+                  'root if there is one. 0 to always request artifacts.')
+    register('--stream-remote-artifacts', advanced=True, type=bool, default=False,
+             help='Extract artifacts fetched from a remote cache while they are downloaded, '
+                  'instead of writing them to the local cache first and then reading them back '
+                  'for extraction.')
+    register('--write-behind', advanced=True, type=bool, default=False,
+             help='Stage artifacts written to a remote cache in a durable local queue, and upload '
+                  'them from a detached process started at the end of the run, rather than '
+                  'uploading them during the run.')
+    register('--write-behind-queue-dir', advanced=True,
+             default=os.path.join(get_pants_cachedir(), 'artifact_upload_queue'),
+             help='The directory of the queue of artifacts waiting to be uploaded to remote '
+                  'caches, shared by all runs using it.')
+    register('--write-behind-max-attempts', advanced=True, type=int, default=5,
+             help='The number of times a queued artifact is tried before it is dropped from the '
+                  'queue.')
+    register('--compression-codec', advanced=True,
+             choices=sorted(TarballArtifact.EXTENSIONS.keys()), default=TarballArtifact.GZIP,
+             help='The compression codec for created artifacts. Artifacts of each codec are '
+                  'stored under a distinct name, so caches shared by differently configured runs '
+                  'hold both. none: uncompressed tarballs, trading disk and network for CPU.')
     register('--compression-level', advanced=True, type=int, default=5,
              help='The gzip compression level (0-9) for created artifacts.')
     register('--dereference-symlinks', type=bool, default=True, fingerprint=True,
              help='Dereference symlinks when creating cache tarball.')
     register('--max-entries-per-target', advanced=True, type=int, default=8,
              help='Maximum number of old cache files to keep per task target pair')
+    register('--local-cache-format', advanced=True,
+             choices=[cls.TARBALL, cls.CONTENT_ADDRESSED], default=cls.TARBALL,
+             help='How artifacts are stored in a local cache. {}: one tarball per artifact. {}: a '
+                  'manifest per artifact, with the files of all artifacts stored once per '
+                  'distinct content under the cache root.'
+                  .format(cls.TARBALL, cls.CONTENT_ADDRESSED))
+    register('--local-cache-hardlink', advanced=True, type=bool, default=False,
+             help='Restore the files of artifacts from a content-addressed local cache by '
+                  'hardlinking them into place, rather than copying them. Restored files are then '
+                  'read-only, so that they cannot be modified in place.')
+    register('--max-local-cache-bytes', advanced=True, type=int, default=None,
+             help='The maximum total size in bytes of the artifacts in a local cache, across all '
+                  'tasks. When exceeded, the least recently used artifacts are evicted in the '
+                  'background. Unbounded by default.')
+    register('--max-local-cache-age', advanced=True, type=int, default=None,
+             help='The maximum number of seconds since an artifact in a local cache was last '
+                  'inserted or read, after which it is evicted in the background. Unbounded by '
+                  'default.')
+    register('--local-cache-eviction-interval', advanced=True, type=int, default=300,
+             help='The minimum number of seconds between two eviction sweeps of a local cache, '
+                  'shared by all runs using it.')
     register('--pinger-timeout', advanced=True, type=float, default=0.5,
              help='number of seconds before pinger times out')
     register('--pinger-tries', advanced=True, type=int, default=2,
@@ -117,6 +174,10 @@ class CacheFactory(object):
     self._read_cache = None
     self._write_cache = None
 
+    self.upload_queue = (ArtifactUploadQueue(os.path.expanduser(options.write_behind_queue_dir))
+                         if options.write_behind else None)
+    self._upload_queue_drainer_registered = False
+
     # Protects local filesystem setup, and assignment to the references above.
     self._cache_setup_lock = threading.Lock()
 
@@ -181,9 +242,41 @@ class CacheFactory(object):
       cache_spec = self._resolve(self._sanitize_cache_spec(self._options.write_to))
       if cache_spec:
         with self._cache_setup_lock:
-          self._write_cache = self._do_create_artifact_cache(cache_spec, 'will write to')
+          self._write_cache = self._do_create_artifact_cache(cache_spec, 'will write to',
+                                                             upload_queue=self.upload_queue)
     return self._write_cache
 
+  def register_upload_queue_drainer(self, worker_pool, stats, cache_name):
+    """Arrange for the artifacts queued by the write cache to be uploaded after this run.
+
+    Once all the background work of the run is done, records the queued artifacts in the given
+    stats and spawns a detached uploader to drain the queue.
+
+    :param worker_pool: The run's background WorkerPool.
+    :param stats: The run's ArtifactCacheStats.
+    :param str cache_name: The name to record the queued artifacts under.
+    """
+    upload_queue = self.upload_queue
+    if upload_queue is None:
+      return
+    with self._cache_setup_lock:
+      if self._upload_queue_drainer_registered:
+        return
+      self._upload_queue_drainer_registered = True
+
+    def drain():
+      if upload_queue.enqueued_count:
+        stats.add_queued_uploads(cache_name, upload_queue.enqueued_count,
+                                 upload_queue.enqueued_bytes)
+      backlog_artifacts, backlog_bytes = upload_queue.backlog()
+      stats.set_upload_queue_stats(upload_queue.root, backlog_artifacts, backlog_bytes,
+                                   upload_queue.last_drain())
+      if backlog_artifacts:
+        upload_queue.spawn_uploader(self._options.max_concurrent_requests,
+                                    self._options.write_behind_max_attempts)
+
+    worker_pool.add_shutdown_hook(drain)
+
   # VisibleForTesting
   def _sanitize_cache_spec(self, spec):
     if not isinstance(spec, (list, tuple)):
@@ -262,7 +355,7 @@ class CacheFactory(object):
 
     return available_urls
 
-  def _do_create_artifact_cache(self, spec, action):
+  def _do_create_artifact_cache(self, spec, action, upload_queue=None):
     """Returns an artifact cache for the specified spec.
 
     spec can be:
@@ -270,21 +363,40 @@ class CacheFactory(object):
       - a URL of a RESTful cache root.
       - a bar-separated list of URLs, where we'll pick the one with the best ping times.
       - A list or tuple of two specs, local, then remote, each as described above
+
+    If an upload_queue is given, a remote cache stages inserted artifacts in it.
     """
     compression = self._options.compression_level
     if compression not in range(1, 10):
       raise ValueError('compression_level must be an integer 1-9: {}'.format(compression))
 
     artifact_root = self._options.pants_workdir
+    telemetry = self._task.context.run_tracker.artifact_cache_stats.telemetry
 
     def create_local_cache(parent_path):
       path = os.path.join(parent_path, self._cache_dirname)
       self._log.debug('{0} {1} local artifact cache at {2}'
                       .format(self._task.stable_name(), action, path))
-      return LocalArtifactCache(artifact_root, path, compression,
-                                self._options.max_entries_per_target,
-                                permissions=self._options.write_permissions,
-                                dereference=self._options.dereference_symlinks)
+      eviction_policy = LRUEvictionPolicy(
+        os.path.realpath(os.path.expanduser(parent_path)),
+        max_bytes=self._options.max_local_cache_bytes,
+        max_age_secs=self._options.max_local_cache_age,
+        min_interval_secs=self._options.local_cache_eviction_interval)
+      cache_kwargs = dict(permissions=self._options.write_permissions,
+                          dereference=self._options.dereference_symlinks,
+                          codec=self._options.compression_codec,
+                          eviction_policy=eviction_policy)
+      if self._options.local_cache_format == CacheSetup.CONTENT_ADDRESSED:
+        cache = ContentAddressedLocalArtifactCache(artifact_root, path, compression,
+                                                   self._options.max_entries_per_target,
+                                                   hardlink=self._options.local_cache_hardlink,
+                                                   **cache_kwargs)
+      else:
+        cache = LocalArtifactCache(artifact_root, path, compression,
+                                   self._options.max_entries_per_target, **cache_kwargs)
+      record_task_name(os.path.expanduser(path), self._task.stable_name())
+      cache.telemetry = telemetry
+      return cache
 
     def create_remote_cache(remote_spec, local_cache):
       urls = self.get_available_urls(remote_spec.split('|'))
@@ -293,14 +405,30 @@ class CacheFactory(object):
         best_url_selector = BestUrlSelector(
           ['{}/{}'.format(url.rstrip('/'), self._cache_dirname) for url in urls]
         )
-        local_cache = local_cache or TempLocalArtifactCache(artifact_root, compression)
-        return RESTfulArtifactCache(
+        if not local_cache:
+          local_cache = TempLocalArtifactCache(artifact_root, compression,
+                                               codec=self._options.compression_codec)
+          local_cache.telemetry = telemetry
+        negative_cache = None
+        if self._options.remote_miss_ttl > 0:
+          negative_cache_parent = (os.path.expanduser(spec.local) if spec.local
+                                   else get_pants_cachedir())
+          negative_cache = NegativeLookupCache(
+            os.path.join(negative_cache_parent, NegativeLookupCache.DIRNAME),
+            self._options.remote_miss_ttl)
+        remote_cache = RESTfulArtifactCache(
           artifact_root,
           best_url_selector,
           local_cache,
           read_timeout=self._options.read_timeout,
           write_timeout=self._options.write_timeout,
+          max_concurrent_requests=self._options.max_concurrent_requests,
+          stream_artifacts=self._options.stream_remote_artifacts,
+          upload_queue=upload_queue,
+          negative_cache=negative_cache,
         )
+        remote_cache.telemetry = telemetry
+        return remote_cache
 
     local_cache = create_local_cache(spec.local) if spec.local else None
     remote_cache = create_remote_cache(spec.remote, local_cache) if spec.remote else None
@@ -0,0 +1,157 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import threading
+import time
+from builtins import object, range, str, zip
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class LatencyHistogram(object):
+  """A histogram of durations, in buckets whose upper bounds are powers of two milliseconds."""
+
+  # The upper bounds of the buckets in milliseconds: the last bucket holds everything slower.
+  BOUNDS_MS = tuple(2 ** i for i in range(17))
+
+  def __init__(self):
+    self.count = 0
+    self.total_secs = 0.0
+    self._counts = [0] * (len(self.BOUNDS_MS) + 1)
+
+  def add(self, secs):
+    millis = secs * 1000
+    index = next((i for i, bound in enumerate(self.BOUNDS_MS) if millis <= bound),
+                 len(self.BOUNDS_MS))
+    self._counts[index] += 1
+    self.count += 1
+    self.total_secs += secs
+
+  def percentile_ms(self, percentile):
+    """Returns the upper bound of the bucket holding the given percentile, or None if empty.
+
+    The slowest bucket is unbounded, so its percentiles are reported as None.
+    """
+    if not self.count:
+      return None
+    rank = percentile / 100.0 * self.count
+    seen = 0
+    for bound, count in zip(self.BOUNDS_MS, self._counts):
+      seen += count
+      if seen >= rank:
+        return bound
+    return None
+
+  def as_dict(self):
+    buckets = {'<={}ms'.format(bound): count
+               for bound, count in zip(self.BOUNDS_MS, self._counts) if count}
+    if self._counts[-1]:
+      buckets['>{}ms'.format(self.BOUNDS_MS[-1])] = self._counts[-1]
+    return {
+      'count': self.count,
+      'total_secs': self.total_secs,
+      'p50_ms': self.percentile_ms(50),
+      'p90_ms': self.percentile_ms(90),
+      'p99_ms': self.percentile_ms(99),
+      'buckets': buckets,
+    }
+
+
+class CacheTelemetry(object):
+  """Records where the time of a run goes in its artifact caches.
+
+  Artifact caches record to the telemetry of the run's `ArtifactCacheStats`, from any thread:
+  - the outcome of each lookup, by the layer that answered it: `local` or `remote`. A remote cache
+    only looks up artifacts that are not in its local cache, so each lookup is recorded once.
+  - the latency and outcome of each request to a remote cache, by method and by server.
+  - the bytes transferred to and from remote caches.
+  - the time spent in each phase of using an artifact, such as extracting it.
+  """
+
+  LOCAL = 'local'
+  REMOTE = 'remote'
+
+  HIT = 'hit'
+  MISS = 'miss'
+  ERROR = 'error'
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._lookups = defaultdict(lambda: defaultdict(int))
+    self._request_latencies = defaultdict(LatencyHistogram)
+    self._requests_per_server = defaultdict(lambda: defaultdict(int))
+    self._bytes = defaultdict(int)
+    self._phase_latencies = defaultdict(LatencyHistogram)
+
+  def record_lookup(self, layer, outcome):
+    """Records a lookup of an artifact in the given layer: one of HIT, MISS or ERROR."""
+    with self._lock:
+      self._lookups[layer][outcome] += 1
+
+  def record_request(self, method, server, secs, outcome):
+    """Records a request to a remote cache.
+
+    :param str method: The http method of the request.
+    :param str server: The server the request was sent to, as `host:port`.
+    :param float secs: How long the request took to respond.
+    :param str outcome: HIT for a 2xx response, MISS for a 404 and ERROR otherwise.
+    """
+    with self._lock:
+      self._request_latencies[method].add(secs)
+      counts = self._requests_per_server[server]
+      counts['requests'] += 1
+      counts[outcome] += 1
+
+  def record_bytes(self, direction, num_bytes):
+    """Records bytes transferred to (`uploaded`) or from (`downloaded`) a remote cache."""
+    with self._lock:
+      self._bytes[direction] += num_bytes
+
+  @contextmanager
+  def timing(self, phase):
+    """Records the time spent in the wrapped block as the given phase, if it succeeds."""
+    start = time.time()
+    yield
+    with self._lock:
+      self._phase_latencies[phase].add(time.time() - start)
+
+  def get_all(self):
+    """Returns the telemetry as a json-serializable dict."""
+    with self._lock:
+      lookups = {layer: dict(outcomes) for layer, outcomes in self._lookups.items()}
+      # Each lookup is recorded once, by the layer that answered it.
+      num_lookups = sum(sum(outcomes.values()) for outcomes in lookups.values())
+      num_hits = sum(outcomes.get(self.HIT, 0) for outcomes in lookups.values())
+      servers = {}
+      for server, counts in self._requests_per_server.items():
+        servers[server] = dict(counts, error_rate=counts[self.ERROR] / counts['requests'])
+      return {
+        'lookups': lookups,
+        'hit_ratio': num_hits / num_lookups if num_lookups else None,
+        'requests': {method: histogram.as_dict()
+                     for method, histogram in self._request_latencies.items()},
+        'servers': servers,
+        'bytes': dict(self._bytes),
+        'phases': {phase: histogram.as_dict()
+                   for phase, histogram in self._phase_latencies.items()},
+      }
+
+  def get_annotations(self):
+    """Returns a summary of the telemetry as a flat dict of strings, eg for tracing spans."""
+    telemetry = self.get_all()
+    annotations = {'artifact_cache.hit_ratio': telemetry['hit_ratio']}
+    for layer, outcomes in telemetry['lookups'].items():
+      for outcome, count in outcomes.items():
+        annotations['artifact_cache.{}.{}'.format(layer, outcome)] = count
+    for direction, num_bytes in telemetry['bytes'].items():
+      annotations['artifact_cache.bytes_{}'.format(direction)] = num_bytes
+    for kind in ('requests', 'phases'):
+      for name, histogram in telemetry[kind].items():
+        for stat in ('count', 'total_secs', 'p50_ms', 'p90_ms'):
+          annotations['artifact_cache.{}.{}'.format(name, stat)] = histogram[stat]
+    for server, counts in telemetry['servers'].items():
+      annotations['artifact_cache.server.{}.error_rate'.format(server)] = counts['error_rate']
+    return {key: str(value) for key, value in annotations.items()}
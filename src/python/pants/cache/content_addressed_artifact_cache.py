@@ -0,0 +1,344 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import errno
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import stat
+import tempfile
+import time
+from builtins import object, open
+from contextlib import contextmanager
+
+from future.utils import PY3
+
+from pants.cache.artifact import Artifact, ArtifactError, TarballArtifact
+from pants.cache.local_artifact_cache import LocalArtifactCache
+from pants.util.dirutil import safe_delete, safe_mkdir, safe_mkdir_for
+
+
+logger = logging.getLogger(__name__)
+
+
+# The extension of the manifests that a content-addressed local cache stores per cache key.
+MANIFEST_EXTENSION = '.manifest'
+
+# The directory under a shared local cache root holding the blobs of all content-addressed caches.
+BLOB_DIR = '.blobs'
+
+
+def read_manifest(path):
+  """Read the manifest at the given path.
+
+  A manifest is a json object with the total `size` of the artifact's files, and a list of
+  `entries` each with a `path` relative to the artifact root and a `type`: one of `dir`,
+  `symlink` (with a link `target`) or `file` (with the `digest` of its blob, its `size` and its
+  `mode`).
+  """
+  with open(path, 'r') as fp:
+    return json.load(fp)
+
+
+class BlobStore(object):
+  """A directory of read-only files named by the sha256 of their contents."""
+
+  # Blobs younger than this are not garbage collected, to protect those of concurrent inserts
+  # whose manifests have not yet been written. Reused blobs are touched to renew their grace.
+  GRACE_SECS = 60 * 60
+
+  # The Linux ioctl that clones a file's extents on filesystems that support it (btrfs, xfs): it
+  # fails elsewhere, and restores fall back to a plain copy.
+  _FICLONE = 0x40049409
+
+  _CHUNK_SIZE = 1024 * 1024
+
+  def __init__(self, root):
+    self._root = root
+    safe_mkdir(self._root)
+
+  def path(self, digest):
+    return os.path.join(self._root, digest[:2], digest)
+
+  def store_file(self, src):
+    """Store the contents of the file at `src`, and return their (digest, size).
+
+    The file is hashed before it is copied, so that contents that are already stored are not
+    written again.
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    with open(src, 'rb') as fp:
+      for chunk in iter(lambda: fp.read(self._CHUNK_SIZE), b''):
+        hasher.update(chunk)
+        size += len(chunk)
+    digest = hasher.hexdigest()
+    if not self._reuse(digest):
+      with open(src, 'rb') as fp:
+        executable = bool(os.fstat(fp.fileno()).st_mode & stat.S_IXUSR)
+        self._write(fp, executable, expected_digest=digest)
+    return digest, size
+
+  def store_stream(self, fileobj, executable=False):
+    """Store the contents read from `fileobj`, and return their (digest, size)."""
+    return self._write(fileobj, executable)
+
+  def restore(self, digest, dest, mode, hardlink=False):
+    """Materialize the blob with the given digest at `dest`, which must not exist.
+
+    :param int mode: The permission bits of the restored file.
+    :param bool hardlink: Hardlink the blob into place rather than copying it. The restored file
+                          is then read-only, and its permission bits are only honored to the extent
+                          of whether it is executable: if those differ, it is copied instead.
+    """
+    blob = self.path(digest)
+    if hardlink and bool(os.stat(blob).st_mode & stat.S_IXUSR) == bool(mode & stat.S_IXUSR):
+      try:
+        os.link(blob, dest)
+        return
+      except OSError as e:
+        # Eg: the artifact root is on another device.
+        logger.debug('Failed to hardlink {} to {}, copying instead: {}'.format(blob, dest, e))
+    self._copy(blob, dest)
+    os.chmod(dest, mode)
+
+  def collect_garbage(self, referenced_digests, now=None):
+    """Delete the blobs not in `referenced_digests`, and abandoned temporary files.
+
+    :returns: The number of bytes freed.
+    """
+    now = time.time() if now is None else now
+    freed = 0
+    for dirpath, _, filenames in os.walk(self._root):
+      for filename in filenames:
+        if filename in referenced_digests:
+          continue
+        path = os.path.join(dirpath, filename)
+        try:
+          st = os.lstat(path)
+          if now - st.st_mtime > self.GRACE_SECS:
+            os.unlink(path)
+            freed += st.st_size
+        except OSError as e:
+          if e.errno != errno.ENOENT:
+            raise
+    return freed
+
+  def _reuse(self, digest):
+    try:
+      os.utime(self.path(digest), None)
+      return True
+    except OSError as e:
+      if e.errno != errno.ENOENT:
+        raise
+      return False
+
+  def _write(self, fileobj, executable, expected_digest=None):
+    hasher = hashlib.sha256()
+    size = 0
+    fd, tmp = tempfile.mkstemp(dir=self._root, prefix='.tmp-')
+    try:
+      with os.fdopen(fd, 'wb') as out:
+        for chunk in iter(lambda: fileobj.read(self._CHUNK_SIZE), b''):
+          hasher.update(chunk)
+          size += len(chunk)
+          out.write(chunk)
+      digest = hasher.hexdigest()
+      if expected_digest is not None and digest != expected_digest:
+        raise ArtifactError('Contents of a file changed while it was stored: expected {}, got {}.'
+                            .format(expected_digest, digest))
+      if not self._reuse(digest):
+        # Blobs are read-only, so that hardlinked restores cannot be modified in place.
+        os.chmod(tmp, 0o555 if executable else 0o444)
+        safe_mkdir_for(self.path(digest))
+        os.rename(tmp, self.path(digest))
+      return digest, size
+    finally:
+      safe_delete(tmp)
+
+  @classmethod
+  def _copy(cls, src, dest):
+    with open(src, 'rb') as fsrc:
+      with open(dest, 'wb') as fdest:
+        try:
+          fcntl.ioctl(fdest.fileno(), cls._FICLONE, fsrc.fileno())
+          return
+        except (IOError, OSError):
+          pass
+        shutil.copyfileobj(fsrc, fdest)
+
+
+class ContentAddressedArtifact(Artifact):
+  """An artifact stored as a manifest of its files, whose contents are stored in a `BlobStore`."""
+
+  def __init__(self, artifact_root, manifest, blob_store, dereference=True, hardlink=False,
+               codec=TarballArtifact.GZIP):
+    """
+    :param str artifact_root: The path under which cacheable products will be read/written.
+    :param str manifest: The path of the manifest of this artifact.
+    :param BlobStore blob_store: The store holding the contents of the files of this artifact.
+    :param bool dereference: Dereference symlinks when collecting the artifact.
+    :param bool hardlink: Hardlink files into place when extracting the artifact: see
+                          `BlobStore.restore`.
+    :param str codec: The compression codec of the tarballs this artifact is streamed from.
+    """
+    super(ContentAddressedArtifact, self).__init__(artifact_root)
+    self._manifest = manifest
+    self._blob_store = blob_store
+    self._dereference = dereference
+    self._hardlink = hardlink
+    self._codec = codec
+
+  def exists(self):
+    return os.path.isfile(self._manifest)
+
+  def collect(self, paths):
+    entries = []
+    for path in paths or ():
+      relpath = os.path.relpath(path, self._artifact_root)
+      self._collect_path(path, relpath, entries)
+      self._relpaths.add(relpath)
+    self._write_manifest(entries)
+
+  def extract(self):
+    try:
+      manifest = read_manifest(self._manifest)
+      for entry in manifest['entries']:
+        self._extract_entry(entry)
+    except Exception as e:
+      raise ArtifactError('Extracting artifact failed:\n{}'.format(e))
+
+  def extract_stream(self, chunks):
+    """Collect this artifact from a tarball stream, and then extract it.
+
+    Nothing is extracted unless the stream is complete, in which case the manifest is written.
+
+    :param chunks: An iterator over the bytes of a tarball compressed with this artifact's codec.
+    """
+    entries = []
+    digests_by_path = {}
+    try:
+      with TarballArtifact.open_stream(chunks, codec=self._codec) as tarin:
+        for member in tarin:
+          relpath = self._checked_relpath(member.name)
+          mode = member.mode & 0o7777
+          if member.isdir():
+            entries.append({'path': relpath, 'type': 'dir'})
+          elif member.issym():
+            entries.append({'path': relpath, 'type': 'symlink', 'target': member.linkname})
+          elif member.islnk():
+            digest, size = digests_by_path[self._checked_relpath(member.linkname)]
+            entries.append(self._file_entry(relpath, digest, size, mode))
+          elif member.isfile():
+            digest, size = self._blob_store.store_stream(tarin.extractfile(member),
+                                                         executable=bool(mode & stat.S_IXUSR))
+            digests_by_path[relpath] = (digest, size)
+            entries.append(self._file_entry(relpath, digest, size, mode))
+          else:
+            raise ArtifactError('Unsupported tarball member type for {}.'.format(member.name))
+    except Exception as e:
+      raise ArtifactError('Extracting artifact stream failed:\n{}'.format(e))
+    self._write_manifest(entries)
+    self.extract()
+
+  def _collect_path(self, path, relpath, entries):
+    if os.path.islink(path) and not self._dereference:
+      entries.append({'path': relpath, 'type': 'symlink', 'target': os.readlink(path)})
+    elif os.path.isdir(path):
+      entries.append({'path': relpath, 'type': 'dir'})
+      for name in sorted(os.listdir(path)):
+        self._collect_path(os.path.join(path, name), os.path.join(relpath, name), entries)
+    else:
+      digest, size = self._blob_store.store_file(path)
+      entries.append(self._file_entry(relpath, digest, size, os.stat(path).st_mode & 0o7777))
+
+  @staticmethod
+  def _file_entry(relpath, digest, size, mode):
+    return {'path': relpath, 'type': 'file', 'digest': digest, 'size': size, 'mode': mode}
+
+  @staticmethod
+  def _checked_relpath(name):
+    relpath = os.path.normpath(name)
+    if os.path.isabs(relpath) or relpath == os.pardir or relpath.startswith(os.pardir + os.sep):
+      raise ArtifactError('Artifact member {} is outside of the artifact root.'.format(name))
+    return relpath
+
+  def _write_manifest(self, entries):
+    manifest = {
+      'size': sum(entry['size'] for entry in entries if entry['type'] == 'file'),
+      'entries': entries,
+    }
+    mode = 'w' if PY3 else 'wb'
+    with open(self._manifest, mode) as fp:
+      json.dump(manifest, fp, sort_keys=True)
+
+  def _extract_entry(self, entry):
+    dest = os.path.join(self._artifact_root, entry['path'])
+    if entry['type'] == 'dir':
+      safe_mkdir(dest)
+      return
+    safe_mkdir_for(dest)
+    if os.path.islink(dest) or os.path.isfile(dest):
+      os.unlink(dest)
+    if entry['type'] == 'symlink':
+      os.symlink(entry['target'], dest)
+    else:
+      self._blob_store.restore(entry['digest'], dest, entry['mode'], hardlink=self._hardlink)
+
+
+class ContentAddressedLocalArtifactCache(LocalArtifactCache):
+  """A local artifact cache that stores a manifest per cache key, rather than a tarball.
+
+  The files of the artifacts of all tasks sharing a local cache root are stored once per distinct
+  content, in a `BlobStore` under that root. Artifacts are still exchanged with remote caches as
+  tarballs, which are unpacked into the blob store as they are fetched.
+  """
+
+  def __init__(self, artifact_root, cache_root, compression, max_entries_per_target=None,
+               blob_root=None, hardlink=False, **kwargs):
+    """
+    :param str blob_root: The directory of the blob store, by default a sibling of `cache_root`.
+    :param bool hardlink: Hardlink files into place when restoring artifacts, rather than copying
+                          them: see `BlobStore.restore`.
+
+    See `LocalArtifactCache` for the remaining parameters.
+    """
+    super(ContentAddressedLocalArtifactCache, self).__init__(artifact_root, cache_root,
+                                                             compression, max_entries_per_target,
+                                                             **kwargs)
+    self._blob_store = BlobStore(blob_root or
+                                 os.path.join(os.path.dirname(self._cache_root), BLOB_DIR))
+    self._hardlink = hardlink
+
+  def _artifact(self, path):
+    return ContentAddressedArtifact(self.artifact_root, path, self._blob_store,
+                                    dereference=self._dereference, hardlink=self._hardlink,
+                                    codec=self._codec)
+
+  @contextmanager
+  def insert_paths(self, cache_key, paths):
+    # Yields a tarball of the paths, for upload to a remote cache.
+    with self._tmpfile(cache_key, 'write') as tmp:
+      TarballArtifact(self.artifact_root, tmp.name, self._compression,
+                      dereference=self._dereference, codec=self._codec).collect(paths)
+      self.try_insert(cache_key, paths)
+      yield tmp.name
+
+  def try_insert(self, cache_key, paths):
+    with self._tmpfile(cache_key, 'write') as tmp:
+      tmp.close()
+      self._artifact(tmp.name).collect(paths)
+      self._store_tarball(cache_key, tmp.name)
+
+  def store_and_use_artifact(self, cache_key, src, results_dir=None):
+    # Fetched artifacts are unpacked into the blob store as they are read in any case.
+    return self.stream_and_use_artifact(cache_key, src, results_dir=results_dir)
+
+  def _cache_file_for_key(self, cache_key):
+    return os.path.join(self._cache_root, cache_key.id, cache_key.hash) + MANIFEST_EXTENSION
@@ -4,12 +4,14 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import errno
 import logging
 import os
 from contextlib import contextmanager
 
 from pants.cache.artifact import TarballArtifact
 from pants.cache.artifact_cache import ArtifactCache, UnreadableArtifact
+from pants.cache.cache_telemetry import CacheTelemetry
 from pants.util.contextutil import temporary_file
 from pants.util.dirutil import (safe_delete, safe_mkdir, safe_mkdir_for,
                                 safe_rm_oldest_items_in_dir, safe_rmtree)
@@ -20,22 +22,32 @@ logger = logging.getLogger(__name__)
 
 class BaseLocalArtifactCache(ArtifactCache):
 
-  def __init__(self, artifact_root, compression, permissions=None, dereference=True):
+  def __init__(self, artifact_root, compression, permissions=None, dereference=True,
+               codec=TarballArtifact.GZIP):
     """
     :param str artifact_root: The path under which cacheable products will be read/written.
     :param int compression: The gzip compression level for created artifacts.
                             Valid values are 0-9.
     :param str permissions: File permissions to use when creating artifact files.
     :param bool dereference: Dereference symlinks when creating the cache tarball.
+    :param str codec: The compression codec for created artifacts: one of the keys of
+                      `TarballArtifact.EXTENSIONS`.
     """
     super(BaseLocalArtifactCache, self).__init__(artifact_root)
     self._compression = compression
     self._cache_root = None
     self._permissions = permissions
     self._dereference = dereference
+    self._codec = codec
+
+  @property
+  def artifact_extension(self):
+    """The file extension of artifacts created by this cache, which identifies their codec."""
+    return TarballArtifact.EXTENSIONS[self._codec]
 
   def _artifact(self, path):
-    return TarballArtifact(self.artifact_root, path, self._compression, dereference=self._dereference)
+    return TarballArtifact(self.artifact_root, path, self._compression, dereference=self._dereference,
+                           codec=self._codec)
 
   @contextmanager
   def _tmpfile(self, cache_key, use):
@@ -60,8 +72,9 @@ class BaseLocalArtifactCache(ArtifactCache):
       be cleared both before extraction, and after a failure to extract.
     """
     with self._tmpfile(cache_key, 'read') as tmp:
-      for chunk in src:
-        tmp.write(chunk)
+      with self.telemetry.timing('download'):
+        for chunk in src:
+          tmp.write(chunk)
       tmp.close()
       tarball = self._store_tarball(cache_key, tmp.name)
       artifact = self._artifact(tarball)
@@ -74,7 +87,8 @@ class BaseLocalArtifactCache(ArtifactCache):
         safe_mkdir(results_dir, clean=True)
 
       try:
-        artifact.extract()
+        with self.telemetry.timing('extract'):
+          artifact.extract()
       except Exception:
         # Do our best to clean up after a failed artifact extraction. If a results_dir has been
         # specified, it is "expected" to represent the output destination of the extracted
@@ -86,6 +100,34 @@ class BaseLocalArtifactCache(ArtifactCache):
 
       return True
 
+  def stream_and_use_artifact(self, cache_key, src, results_dir=None):
+    """Extract the artifact from the given `src` iterator while storing it for the given cache_key.
+
+    Unlike `store_and_use_artifact`, the artifact is extracted as it is read, rather than being
+    written out in full and then read back for extraction. It is only stored once it has been
+    completely read and extracted.
+
+    :param cache_key: Cache key for the artifact.
+    :param src: Iterator over binary data to store for the artifact.
+    :param str results_dir: The path to the expected destination of the artifact extraction: will
+      be cleared both before extraction, and after a failure to extract.
+    """
+    with self._tmpfile(cache_key, 'read') as tmp:
+      tmp.close()
+      if results_dir is not None:
+        safe_mkdir(results_dir, clean=True)
+
+      try:
+        with self.telemetry.timing('download_and_extract'):
+          self._artifact(tmp.name).extract_stream(src)
+      except Exception:
+        if results_dir is not None:
+          safe_mkdir(results_dir, clean=True)
+        raise
+
+      self._store_tarball(cache_key, tmp.name)
+      return True
+
   def _store_tarball(self, cache_key, src):
     """Given a src path to an artifact tarball, store it and return stored artifact's path."""
     pass
@@ -95,7 +137,8 @@ class LocalArtifactCache(BaseLocalArtifactCache):
   """An artifact cache that stores the artifacts in local files."""
 
   def __init__(self, artifact_root, cache_root, compression, max_entries_per_target=None,
-               permissions=None, dereference=True):
+               permissions=None, dereference=True, codec=TarballArtifact.GZIP,
+               eviction_policy=None):
     """
     :param str artifact_root: The path under which cacheable products will be read/written.
     :param str cache_root: The locally cached files are stored under this directory.
@@ -103,15 +146,20 @@ class LocalArtifactCache(BaseLocalArtifactCache):
     :param int max_entries_per_target: The maximum number of old cache files to leave behind on a cache miss.
     :param str permissions: File permissions to use when creating artifact files.
     :param bool dereference: Dereference symlinks when creating the cache tarball.
+    :param str codec: The compression codec for created artifacts.
+    :param eviction_policy: An optional `LRUEvictionPolicy` bounding the shared cache root that
+                            this cache is stored under.
     """
     super(LocalArtifactCache, self).__init__(
       artifact_root,
       compression,
       permissions=int(permissions.strip(), base=8) if permissions else None,
-      dereference=dereference
+      dereference=dereference,
+      codec=codec
     )
     self._cache_root = os.path.realpath(os.path.expanduser(cache_root))
     self._max_entries_per_target = max_entries_per_target
+    self._eviction_policy = eviction_policy
     safe_mkdir(self._cache_root)
 
   def prune(self, root):
@@ -127,9 +175,46 @@ class LocalArtifactCache(BaseLocalArtifactCache):
     if os.path.isdir(root) and max_entries_per_target:
       safe_rm_oldest_items_in_dir(root, max_entries_per_target)
 
+  def evict(self):
+    if self._eviction_policy:
+      self._eviction_policy.maybe_evict()
+
   def has(self, cache_key):
     return self._artifact_for(cache_key).exists()
 
+  def has_many(self, cache_keys):
+    results = self._has_many(cache_keys)
+    for present in results:
+      if not present:
+        self.telemetry.record_lookup(CacheTelemetry.LOCAL, CacheTelemetry.MISS)
+    return results
+
+  def _has_many(self, cache_keys):
+    # List the cache root once, and then each target directory at most once, rather than stat-ing
+    # one file per key: on a cold cache most keys are answered by the first listing alone.
+    cached_ids = set(self._listdir(self._cache_root))
+    cached_files_by_id = {}
+    results = []
+    for cache_key in cache_keys:
+      if cache_key.id not in cached_ids:
+        results.append(False)
+        continue
+      cached_files = cached_files_by_id.get(cache_key.id)
+      if cached_files is None:
+        cached_files = set(self._listdir(os.path.join(self._cache_root, cache_key.id)))
+        cached_files_by_id[cache_key.id] = cached_files
+      results.append(os.path.basename(self._cache_file_for_key(cache_key)) in cached_files)
+    return results
+
+  @staticmethod
+  def _listdir(path):
+    try:
+      return os.listdir(path)
+    except OSError as e:
+      if e.errno not in (errno.ENOENT, errno.ENOTDIR):
+        raise
+      return []
+
   def _artifact_for(self, cache_key):
     return self._artifact(self._cache_file_for_key(cache_key))
 
@@ -140,16 +225,30 @@ class LocalArtifactCache(BaseLocalArtifactCache):
       if artifact.exists():
         if results_dir is not None:
           safe_rmtree(results_dir)
-        artifact.extract()
+        with self.telemetry.timing('extract'):
+          artifact.extract()
+        self._record_use(tarfile)
+        self.telemetry.record_lookup(CacheTelemetry.LOCAL, CacheTelemetry.HIT)
         return True
     except Exception as e:
       # TODO(davidt): Consider being more granular in what is caught.
       logger.warn('Error while reading {0} from local artifact cache: {1}'.format(tarfile, e))
       safe_delete(tarfile)
+      self.telemetry.record_lookup(CacheTelemetry.LOCAL, CacheTelemetry.ERROR)
       return UnreadableArtifact(cache_key, e)
 
+    self.telemetry.record_lookup(CacheTelemetry.LOCAL, CacheTelemetry.MISS)
     return False
 
+  @staticmethod
+  def _record_use(tarfile):
+    # Eviction, and pruning on a miss, remove the least recently used artifacts by mtime.
+    try:
+      os.utime(tarfile, None)
+    except OSError:
+      # Evicted by a concurrent run since it was extracted.
+      pass
+
   def try_insert(self, cache_key, paths):
     with self.insert_paths(cache_key, paths):
       pass
@@ -169,7 +268,8 @@ class LocalArtifactCache(BaseLocalArtifactCache):
   def _cache_file_for_key(self, cache_key):
     # Note: it's important to use the id as well as the hash, because two different targets
     # may have the same hash if both have no sources, but we may still want to differentiate them.
-    return os.path.join(self._cache_root, cache_key.id, cache_key.hash) + '.tgz'
+    # The extension identifies the codec, so that artifacts of different codecs can coexist.
+    return os.path.join(self._cache_root, cache_key.id, cache_key.hash) + self.artifact_extension
 
 
 class TempLocalArtifactCache(BaseLocalArtifactCache):
@@ -179,12 +279,12 @@ class TempLocalArtifactCache(BaseLocalArtifactCache):
   actually stores files between calls, but is useful for handling file IO for a remote cache.
   """
 
-  def __init__(self, artifact_root, compression, permissions=None):
+  def __init__(self, artifact_root, compression, permissions=None, codec=TarballArtifact.GZIP):
     """
     :param str artifact_root: The path under which cacheable products will be read/written.
     """
     super(TempLocalArtifactCache, self).__init__(artifact_root, compression=compression,
-                                                 permissions=permissions)
+                                                 permissions=permissions, codec=codec)
 
   def _store_tarball(self, cache_key, src):
     return src
@@ -0,0 +1,221 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import errno
+import logging
+import os
+import time
+from builtins import object
+from collections import namedtuple
+
+from pants.cache.artifact import TarballArtifact
+from pants.cache.content_addressed_artifact_cache import (BLOB_DIR, MANIFEST_EXTENSION, BlobStore,
+                                                          read_manifest)
+from pants.util.dirutil import safe_file_dump, touch
+
+
+logger = logging.getLogger(__name__)
+
+
+# The name of the file in each task's cache directory that records the name of the task it
+# belongs to: the directory itself is named for the task's fingerprint.
+TASK_NAME_FILE = '.task'
+
+
+class LocalCacheEntry(namedtuple('LocalCacheEntry', ['task_dir', 'path', 'size', 'last_used'])):
+  """An artifact stored in a shared local cache root.
+
+  :param str task_dir: The name of the task cache directory holding the artifact.
+  :param str path: The absolute path of the artifact.
+  :param int size: The size of the artifact in bytes. For the manifest of a content-addressed
+                   artifact, this is the total size of its files, whether or not they are shared
+                   with other artifacts.
+  :param float last_used: The time the artifact was last inserted or read, in seconds since the
+                          epoch.
+  """
+
+
+def record_task_name(task_cache_dir, task_name):
+  """Record the name of the task that owns the given task cache directory, if not already known."""
+  path = os.path.join(task_cache_dir, TASK_NAME_FILE)
+  if not os.path.exists(path):
+    try:
+      safe_file_dump(path, task_name)
+    except (IOError, OSError) as e:
+      logger.debug('Failed to record the task name for {}: {}'.format(task_cache_dir, e))
+
+
+def read_task_name(task_cache_dir):
+  """Return the name of the task that owns the given task cache directory, or None if unknown."""
+  try:
+    with open(os.path.join(task_cache_dir, TASK_NAME_FILE), 'r') as fp:
+      return fp.read().strip() or None
+  except (IOError, OSError):
+    return None
+
+
+def _listdir(path):
+  try:
+    return os.listdir(path)
+  except OSError as e:
+    if e.errno not in (errno.ENOENT, errno.ENOTDIR):
+      raise
+    return []
+
+
+def list_local_cache_entries(root):
+  """Yield a `LocalCacheEntry` for each artifact stored under the given shared local cache root.
+
+  The root holds one directory per task, each holding one directory per target, each holding the
+  artifacts for that target. Anything else, such as the temporary files of in-flight writes, is
+  ignored.
+  """
+  extensions = tuple(TarballArtifact.EXTENSIONS.values()) + (MANIFEST_EXTENSION,)
+  for task_dir in _listdir(root):
+    if task_dir.startswith('.'):
+      continue
+    task_path = os.path.join(root, task_dir)
+    for target_dir in _listdir(task_path):
+      if target_dir.startswith('.'):
+        continue
+      target_path = os.path.join(task_path, target_dir)
+      for name in _listdir(target_path):
+        if not name.endswith(extensions):
+          continue
+        path = os.path.join(target_path, name)
+        try:
+          stat = os.stat(path)
+          size = read_manifest(path)['size'] if name.endswith(MANIFEST_EXTENSION) else stat.st_size
+        except (IOError, OSError, ValueError, KeyError):
+          # Deleted by a concurrent run, or unreadable: in which case its next use deletes it.
+          continue
+        yield LocalCacheEntry(task_dir, path, size, stat.st_mtime)
+
+
+class LRUEvictionPolicy(object):
+  """Bounds the total size and age of the artifacts in a shared local cache root.
+
+  Artifacts are evicted in least recently used order: the local cache records a use by updating
+  the mtime of an artifact on every hit. Sweeps are rate limited across all runs sharing the root
+  by the mtime of a marker file in it, and free space down to a low watermark below the byte
+  budget, so that steady-state inserts do not trigger a sweep each time they cross it.
+
+  Sweeps of a root holding content-addressed artifacts also delete the blobs that are no longer
+  referenced by any manifest, whether or not the root is bounded.
+  """
+
+  MARKER_FILE = '.last_eviction'
+
+  # The fraction of the byte budget that a sweep evicts down to.
+  LOW_WATERMARK = 0.9
+
+  def __init__(self, root, max_bytes=None, max_age_secs=None, min_interval_secs=0):
+    """
+    :param str root: The shared local cache root, holding the cache directories of all tasks.
+    :param int max_bytes: The maximum total size of the artifacts under the root, or None for no
+                          bound.
+    :param int max_age_secs: The maximum time since an artifact was last used, or None for no bound.
+    :param int min_interval_secs: The minimum time between two sweeps of the root.
+    """
+    self._root = root
+    self._max_bytes = max_bytes
+    self._max_age_secs = max_age_secs
+    self._min_interval_secs = min_interval_secs
+
+  @property
+  def enabled(self):
+    return bool(self._max_bytes or self._max_age_secs or os.path.isdir(self._blob_root))
+
+  @property
+  def _blob_root(self):
+    return os.path.join(self._root, BLOB_DIR)
+
+  def maybe_evict(self):
+    """Sweep the cache root if it has not been swept within the minimum interval.
+
+    :returns: The list of evicted `LocalCacheEntry`s, or None if no sweep was made.
+    """
+    if not self.enabled:
+      return None
+    now = time.time()
+    marker = os.path.join(self._root, self.MARKER_FILE)
+    try:
+      if now - os.path.getmtime(marker) < self._min_interval_secs:
+        return None
+    except OSError:
+      pass
+    # Claim this sweep before making it, so that concurrent runs skip theirs.
+    try:
+      touch(marker)
+    except (IOError, OSError):
+      return None
+    return self.evict(now=now)
+
+  def evict(self, now=None):
+    """Evict artifacts that exceed the age bound, and then the least recently used artifacts until
+    the total size is within the byte budget.
+
+    :returns: The list of evicted `LocalCacheEntry`s.
+    """
+    now = time.time() if now is None else now
+    entries = sorted(list_local_cache_entries(self._root), key=lambda entry: entry.last_used)
+
+    evicted = []
+    live = []
+    for entry in entries:
+      expired = self._max_age_secs and now - entry.last_used > self._max_age_secs
+      if expired and self._delete(entry):
+        evicted.append(entry)
+      else:
+        live.append(entry)
+
+    total_bytes = sum(entry.size for entry in live)
+    if self._max_bytes and total_bytes > self._max_bytes:
+      target_bytes = int(self._max_bytes * self.LOW_WATERMARK)
+      for entry in live:
+        if total_bytes <= target_bytes:
+          break
+        if self._delete(entry):
+          evicted.append(entry)
+          total_bytes -= entry.size
+
+    if evicted:
+      logger.debug('Evicted {} artifacts ({} bytes) from {}.'.format(
+        len(evicted), sum(entry.size for entry in evicted), self._root))
+    if os.path.isdir(self._blob_root):
+      self._collect_garbage_blobs(live, evicted, now)
+    return evicted
+
+  def _collect_garbage_blobs(self, live, evicted, now):
+    evicted_paths = {entry.path for entry in evicted}
+    referenced = set()
+    for entry in live:
+      if entry.path in evicted_paths or not entry.path.endswith(MANIFEST_EXTENSION):
+        continue
+      try:
+        manifest = read_manifest(entry.path)
+      except (IOError, OSError, ValueError):
+        # Deleted by a concurrent run, or unreadable: in which case its next use deletes it.
+        continue
+      referenced.update(e['digest'] for e in manifest['entries'] if e['type'] == 'file')
+    freed = BlobStore(self._blob_root).collect_garbage(referenced, now=now)
+    if freed:
+      logger.debug('Collected {} bytes of unreferenced blobs from {}.'.format(freed, self._root))
+
+  @staticmethod
+  def _delete(entry):
+    try:
+      os.unlink(entry.path)
+    except OSError as e:
+      if e.errno != errno.ENOENT:
+        logger.warn('Failed to evict {}: {}'.format(entry.path, e))
+        return False
+    # Remove the target directory if this was its last artifact.
+    try:
+      os.rmdir(os.path.dirname(entry.path))
+    except OSError:
+      pass
+    return True
@@ -0,0 +1,80 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import errno
+import hashlib
+import logging
+import os
+import time
+from builtins import object
+
+from pants.util.dirutil import safe_delete, touch
+
+
+logger = logging.getLogger(__name__)
+
+
+class NegativeLookupCache(object):
+  """Remembers, for a short time, the urls that a remote artifact cache reported as missing.
+
+  Each miss is an empty file named for the hash of its url, whose mtime is the time of the miss, so
+  that the cache can be shared by concurrent runs on a host without any locking.
+  """
+
+  # The name of the directory under a local cache root holding its negative lookup cache.
+  DIRNAME = '.remote_misses'
+
+  def __init__(self, root, ttl_secs):
+    """
+    :param str root: The directory holding the cache.
+    :param int ttl_secs: The number of seconds a miss is remembered for.
+    """
+    self._root = root
+    self._ttl_secs = ttl_secs
+    self._last_prune = None
+
+  @property
+  def root(self):
+    return self._root
+
+  def is_known_miss(self, url, now=None):
+    """Returns True if the given url was missing less than the ttl ago."""
+    try:
+      missed_at = os.path.getmtime(self._path_for_url(url))
+    except OSError:
+      return False
+    now = time.time() if now is None else now
+    return now - missed_at < self._ttl_secs
+
+  def record_miss(self, url):
+    try:
+      touch(self._path_for_url(url))
+    except (IOError, OSError) as e:
+      logger.debug('Failed to record a remote cache miss for {}: {}'.format(url, e))
+
+  def invalidate(self, url):
+    """Forget any miss of the given url: eg, because an artifact was just inserted there."""
+    safe_delete(self._path_for_url(url))
+
+  def prune(self, now=None):
+    """Removes the misses that have outlived the ttl, at most once per ttl."""
+    now = time.time() if now is None else now
+    if self._last_prune is not None and now - self._last_prune < self._ttl_secs:
+      return
+    self._last_prune = now
+    for dirpath, _, names in os.walk(self._root):
+      for name in names:
+        path = os.path.join(dirpath, name)
+        try:
+          if now - os.path.getmtime(path) >= self._ttl_secs:
+            os.unlink(path)
+        except OSError as e:
+          if e.errno != errno.ENOENT:
+            raise
+
+  def _path_for_url(self, url):
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return os.path.join(self._root, digest[:2], digest[2:])
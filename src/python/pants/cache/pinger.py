@@ -4,6 +4,7 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import threading
 from builtins import object, range, zip
 from collections import deque
 from contextlib import contextmanager
@@ -88,6 +89,7 @@ class BestUrlSelector(object):
     self.parsed_urls = deque(self._parse_urls(available_urls))
     self.unsuccessful_calls = Counter()
     self.max_failures = max_failures
+    self._lock = threading.Lock()
 
   def _parse_urls(self, urls):
     parsed_urls = [urlparse(url) for url in urls]
@@ -112,12 +114,15 @@ class BestUrlSelector(object):
     try:
       yield best_url
     except Exception:
-      self.unsuccessful_calls[best_url] += 1
-
-      # Not thread-safe but pool used by cache is based on subprocesses, therefore no race.
-      if self.unsuccessful_calls[best_url] > self.max_failures:
-        self.parsed_urls.rotate(-1)
-        self.unsuccessful_calls[best_url] = 0
+      # Callers may issue requests from many threads at once (see `RESTfulArtifactCache.has_many`).
+      with self._lock:
+        self.unsuccessful_calls[best_url] += 1
+        if self.unsuccessful_calls[best_url] > self.max_failures:
+          # Only rotate if another thread has not already rotated away from this url.
+          if self.parsed_urls[0] == best_url:
+            self.parsed_urls.rotate(-1)
+          self.unsuccessful_calls[best_url] = 0
       raise
     else:
-      self.unsuccessful_calls[best_url] = 0
+      with self._lock:
+        self.unsuccessful_calls[best_url] = 0
@@ -6,14 +6,19 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import logging
 import multiprocessing
+import os
 import queue
 import threading
-from builtins import object, open
+import time
+from builtins import object, open, zip
+from multiprocessing.pool import ThreadPool
 
 import requests
 from requests import RequestException
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 
 from pants.cache.artifact_cache import ArtifactCache, NonfatalArtifactCacheError, UnreadableArtifact
+from pants.cache.cache_telemetry import CacheTelemetry
 
 
 logger = logging.getLogger(__name__)
@@ -25,12 +30,24 @@ logging.getLogger('requests').setLevel(logging.WARNING)
 
 class RequestsSession(object):
   _session = None
+  _pool_size = DEFAULT_POOLSIZE
+  _lock = threading.Lock()
 
   @classmethod
-  def instance(cls):
-    if cls._session is None:
-      cls._session = requests.Session()
-    return cls._session
+  def instance(cls, pool_size=None):
+    """Returns the shared session.
+
+    :param int pool_size: If specified, the session will keep at least this many connections per
+                          host alive for reuse.
+    """
+    with cls._lock:
+      if cls._session is None:
+        cls._session = requests.Session()
+      if pool_size is not None and pool_size > cls._pool_size:
+        for prefix in ('http://', 'https://'):
+          cls._session.mount(prefix, HTTPAdapter(pool_maxsize=pool_size))
+        cls._pool_size = pool_size
+      return cls._session
 
 
 class RESTfulArtifactCache(ArtifactCache):
@@ -38,13 +55,23 @@ class RESTfulArtifactCache(ArtifactCache):
 
   READ_SIZE_BYTES = 4 * 1024 * 1024
 
-  def __init__(self, artifact_root, best_url_selector, local, read_timeout=4.0, write_timeout=4.0):
+  def __init__(self, artifact_root, best_url_selector, local, read_timeout=4.0, write_timeout=4.0,
+               max_concurrent_requests=16, stream_artifacts=False, upload_queue=None,
+               negative_cache=None):
     """
     :param string artifact_root: The path under which cacheable products will be read/written.
     :param BestUrlSelector best_url_selector: Url selector that supports fail-over. Each returned
       url represents prefix for some RESTful service. We must be able to PUT and GET to any path
       under this base.
     :param BaseLocalArtifactCache local: local cache instance for storing and creating artifacts
+    :param int max_concurrent_requests: The maximum number of requests to have in flight to the
+      selected url at once when checking many keys via `has_many`.
+    :param bool stream_artifacts: True to extract fetched artifacts while they are downloaded,
+      rather than after they have been written to the local cache.
+    :param ArtifactUploadQueue upload_queue: If specified, inserted artifacts are staged in this
+      queue for a background uploader, rather than uploaded by `insert`.
+    :param NegativeLookupCache negative_cache: If specified, artifacts recently found missing are
+      not requested again until its ttl expires, or they are inserted by this host.
     """
     super(RESTfulArtifactCache, self).__init__(artifact_root)
 
@@ -52,20 +79,60 @@ class RESTfulArtifactCache(ArtifactCache):
     self._read_timeout_secs = read_timeout
     self._write_timeout_secs = write_timeout
     self._localcache = local
+    self._max_concurrent_requests = max_concurrent_requests
+    self._stream_artifacts = stream_artifacts
+    self._upload_queue = upload_queue
+    self._negative_cache = negative_cache
 
   def try_insert(self, cache_key, paths):
     # Delegate creation of artifact to local cache.
     with self._localcache.insert_paths(cache_key, paths) as tarfile:
+      if self._upload_queue is not None:
+        with self.best_url_selector.select_best_url() as best_url:
+          url = self._url_for_key(best_url, cache_key)
+          self._upload_queue.enqueue(url, tarfile, timeout=self._write_timeout_secs)
+          if self._negative_cache:
+            self._negative_cache.invalidate(url)
+        return
       # Upload local artifact to remote cache.
       with open(tarfile, 'rb') as infile:
         if not self._request('PUT', cache_key, body=infile):
           raise NonfatalArtifactCacheError('Failed to PUT {0}.'.format(cache_key))
+      self.telemetry.record_bytes('uploaded', os.path.getsize(tarfile))
 
   def has(self, cache_key):
     if self._localcache.has(cache_key):
       return True
     return self._request('HEAD', cache_key) is not None
 
+  def has_many(self, cache_keys):
+    # A key missing from the local cache is looked up remotely, and so recorded as a remote lookup.
+    results = self._localcache._has_many(cache_keys)
+    remote_keys = [cache_key for cache_key, present in zip(cache_keys, results) if not present]
+    if not remote_keys:
+      return results
+
+    pool = ThreadPool(processes=min(len(remote_keys), self._max_concurrent_requests))
+    try:
+      remote_results = pool.map(self._has_remote, remote_keys, chunksize=1)
+    finally:
+      pool.close()
+      pool.join()
+    for present in remote_results:
+      if not present:
+        self.telemetry.record_lookup(CacheTelemetry.REMOTE, CacheTelemetry.MISS)
+    remote_results = iter(remote_results)
+    return [present or next(remote_results) for present in results]
+
+  def _has_remote(self, cache_key):
+    try:
+      return self._request('HEAD', cache_key) is not None
+    except NonfatalArtifactCacheError as e:
+      # Report the key as present so that a subsequent `use_cached_files` surfaces the failure in
+      # the usual way.
+      logger.debug('Error while checking remote artifact cache for {}: {}'.format(cache_key, e))
+      return True
+
   def use_cached_files(self, cache_key, results_dir=None):
     if self._localcache.has(cache_key):
       return self._localcache.use_cached_files(cache_key, results_dir)
@@ -83,29 +150,54 @@ class RESTfulArtifactCache(ArtifactCache):
           )
         ).start()
         # Delegate storage and extraction to local cache
-        byte_iter = response.iter_content(self.READ_SIZE_BYTES)
-        res = self._localcache.store_and_use_artifact(cache_key, byte_iter, results_dir)
+        byte_iter = self._count_downloaded(response.iter_content(self.READ_SIZE_BYTES))
+        if self._stream_artifacts:
+          res = self._localcache.stream_and_use_artifact(cache_key, byte_iter, results_dir)
+        else:
+          res = self._localcache.store_and_use_artifact(cache_key, byte_iter, results_dir)
         queue.put(None)
+        self.telemetry.record_lookup(CacheTelemetry.REMOTE, CacheTelemetry.HIT)
         return res
     except Exception as e:
       logger.warn('\nError while reading from remote artifact cache: {0}\n'.format(e))
       queue.put(None)
+      self.telemetry.record_lookup(CacheTelemetry.REMOTE, CacheTelemetry.ERROR)
       # TODO(peiyu): clean up partially downloaded local file if any
       return UnreadableArtifact(cache_key, e)
 
+    self.telemetry.record_lookup(CacheTelemetry.REMOTE, CacheTelemetry.MISS)
     return False
 
+  def _count_downloaded(self, chunks):
+    num_bytes = 0
+    try:
+      for chunk in chunks:
+        num_bytes += len(chunk)
+        yield chunk
+    finally:
+      self.telemetry.record_bytes('downloaded', num_bytes)
+
   def delete(self, cache_key):
     self._localcache.delete(cache_key)
     self._request('DELETE', cache_key)
 
+  def evict(self):
+    self._localcache.evict()
+    if self._negative_cache:
+      self._negative_cache.prune()
+
   # Returns a response if we get a 200, None if we get a 404 and raises an exception otherwise.
   def _request(self, method, cache_key, body=None):
 
-    session = RequestsSession.instance()
+    session = RequestsSession.instance(pool_size=self._max_concurrent_requests)
     with self.best_url_selector.select_best_url() as best_url:
       url = self._url_for_key(best_url, cache_key)
+      if self._negative_cache and method in ('GET', 'HEAD'):
+        if self._negative_cache.is_known_miss(url):
+          logger.debug('Skipping {0} request to {1}: recently missing'.format(method, url))
+          return None
       logger.debug('Sending {0} request to {1}'.format(method, url))
+      start = time.time()
       try:
         if 'PUT' == method:
           response = session.put(url,
@@ -128,13 +220,26 @@ class RESTfulArtifactCache(ArtifactCache):
         else:
           raise ValueError('Unknown request method {0}'.format(method))
       except RequestException as e:
+        self.telemetry.record_request(method, best_url.netloc, time.time() - start,
+                                      CacheTelemetry.ERROR)
         raise NonfatalArtifactCacheError('Failed to {0} {1}. Error: {2}'
                                          .format(method, url, e))
+      if int(response.status_code / 100) == 2:
+        outcome = CacheTelemetry.HIT
+      elif response.status_code == 404:
+        outcome = CacheTelemetry.MISS
+      else:
+        outcome = CacheTelemetry.ERROR
+      self.telemetry.record_request(method, best_url.netloc, time.time() - start, outcome)
       # Allow all 2XX responses. E.g., nginx returns 201 on PUT. HEAD may return 204.
       if int(response.status_code / 100) == 2:
+        if self._negative_cache and method == 'PUT':
+          self._negative_cache.invalidate(url)
         return response
       elif response.status_code == 404:
         logger.debug('404 returned for {0} request to {1}'.format(method, url))
+        if self._negative_cache and method in ('GET', 'HEAD'):
+          self._negative_cache.record_miss(url)
         return None
       else:
         raise NonfatalArtifactCacheError('Failed to {0} {1}. Error: {2} {3}'
@@ -142,7 +247,8 @@ class RESTfulArtifactCache(ArtifactCache):
                                                  response.status_code, response.reason))
 
   def _url_suffix_for_key(self, cache_key):
-    return '{0}/{1}.tgz'.format(cache_key.id, cache_key.hash)
+    # The extension identifies the codec, so that artifacts of different codecs can coexist.
+    return '{0}/{1}{2}'.format(cache_key.id, cache_key.hash, self._localcache.artifact_extension)
 
   def _url_for_key(self, url, cache_key):
     path_prefix = url.path.rstrip('/')
@@ -0,0 +1,278 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import errno
+import fcntl
+import json
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from builtins import object, open
+from multiprocessing.pool import ThreadPool
+
+from future.utils import PY3
+from requests import RequestException
+
+from pants.cache.restful_artifact_cache import RequestsSession
+from pants.util.dirutil import safe_delete, safe_mkdir
+from pants.util.process_handler import subprocess
+
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactUploadQueue(object):
+  """A durable queue of artifacts waiting to be uploaded to remote caches.
+
+  Each entry is a staged copy of an artifact's tarball, with a json file naming the url to PUT it
+  to. The json file is written last, so that only complete entries are visible to uploaders.
+
+  Entries are uploaded by `drain`, typically in a detached uploader process started by
+  `spawn_uploader` at the end of a run, so that runs do not wait on remote caches to finish. An
+  uploader holds a lock on the queue for as long as it drains it, so that at most one uploads at
+  once; entries that fail to upload are retried by later uploaders up to `max_attempts` times.
+  """
+
+  _DATA_SUFFIX = '.data'
+  _ENTRY_SUFFIX = '.json'
+  _LOCK_FILE = '.uploader.lock'
+  _STATS_FILE = '.last_drain.json'
+
+  # Data files without an entry are abandoned after this long: the enqueuing run died.
+  _ABANDONED_DATA_SECS = 60 * 60
+
+  # The (pid, root) pairs for which an uploader has been spawned.
+  _spawned = set()
+  _spawned_lock = threading.Lock()
+
+  def __init__(self, root):
+    """
+    :param str root: The directory holding the queue, shared by all the runs that use it.
+    """
+    self._root = root
+    self._lock = threading.Lock()
+    self.enqueued_count = 0
+    self.enqueued_bytes = 0
+
+  @property
+  def root(self):
+    return self._root
+
+  def enqueue(self, url, tarball, timeout=None):
+    """Stage the given artifact tarball for upload to the given url.
+
+    :param str url: The url to PUT the artifact to.
+    :param str tarball: The path of the tarball, which is linked or copied into the queue.
+    :param float timeout: The timeout of the upload, in seconds.
+    """
+    safe_mkdir(self._root)
+    entry_id = uuid.uuid4().hex
+    data = os.path.join(self._root, entry_id + self._DATA_SUFFIX)
+    try:
+      os.link(tarball, data)
+    except OSError:
+      # Eg: the tarball is on another device.
+      shutil.copyfile(tarball, data)
+    size = os.path.getsize(data)
+    self._write_entry(entry_id, {'url': url, 'size': size, 'timeout': timeout, 'attempts': 0})
+    with self._lock:
+      self.enqueued_count += 1
+      self.enqueued_bytes += size
+
+  def backlog(self):
+    """Returns the number and total size in bytes of the entries waiting to be uploaded."""
+    count = 0
+    size = 0
+    for entry_id in self._entry_ids():
+      entry = self._read_entry(entry_id)
+      if entry is not None:
+        count += 1
+        size += entry['size']
+    return count, size
+
+  def last_drain(self):
+    """Returns the stats of the last completed `drain` of this queue, or None."""
+    try:
+      with open(os.path.join(self._root, self._STATS_FILE), 'r') as fp:
+        return json.load(fp)
+    except (IOError, OSError, ValueError):
+      return None
+
+  def spawn_uploader(self, max_concurrency, max_attempts):
+    """Start a detached process that drains this queue, and outlives this one.
+
+    At most one uploader is spawned per queue by each process.
+    """
+    with self._spawned_lock:
+      spawned_key = (os.getpid(), self._root)
+      if spawned_key in self._spawned:
+        return
+      self._spawned.add(spawned_key)
+    cmd = [sys.executable, '-m', __name__,
+           '--max-concurrency', str(max_concurrency),
+           '--max-attempts', str(max_attempts),
+           self._root]
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.pathsep.join(p for p in sys.path if p)
+    with open(os.devnull, 'r+b') as devnull:
+      subprocess.Popen(cmd, env=env, stdin=devnull, stdout=devnull, stderr=devnull,
+                       close_fds=True, preexec_fn=os.setsid)
+
+  def drain(self, max_concurrency=8, max_attempts=5):
+    """Upload the entries of this queue until it is empty, or its remaining entries all failed.
+
+    Returns immediately if another process is draining the queue.
+
+    :returns: A dict of stats about the drain, or None if the queue is being drained elsewhere.
+    """
+    safe_mkdir(self._root)
+    totals = None
+    while True:
+      with open(os.path.join(self._root, self._LOCK_FILE), 'a') as lock_file:
+        try:
+          fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except (IOError, OSError):
+          return totals
+        stats = self._drain_locked(max_concurrency, max_attempts)
+      totals = stats if totals is None else {k: totals[k] + v for k, v in stats.items()}
+      # Entries enqueued while we held the lock may have been skipped by an uploader that found it
+      # held: drain again if there are any that were never tried.
+      if not self._has_untried_entries():
+        return totals
+
+  def _drain_locked(self, max_concurrency, max_attempts):
+    start = time.time()
+    stats = {'uploaded': 0, 'uploaded_bytes': 0, 'failed': 0, 'dropped': 0}
+    self._remove_abandoned_data(start)
+
+    round_num = 0
+    while True:
+      entry_ids = self._entry_ids()
+      if not entry_ids:
+        break
+      pool = ThreadPool(processes=min(len(entry_ids), max_concurrency))
+      try:
+        outcomes = pool.map(lambda entry_id: self._upload(entry_id, max_attempts), entry_ids,
+                            chunksize=1)
+      finally:
+        pool.close()
+        pool.join()
+      uploaded = [size for outcome, size in outcomes if outcome == 'uploaded']
+      failed = sum(1 for outcome, _ in outcomes if outcome == 'failed')
+      stats['uploaded'] += len(uploaded)
+      stats['uploaded_bytes'] += sum(uploaded)
+      stats['failed'] += failed
+      stats['dropped'] += sum(1 for outcome, _ in outcomes if outcome == 'dropped')
+      if not uploaded:
+        # Everything that remains failed: leave it to a later uploader, rather than spinning.
+        break
+      if failed:
+        # Back off before retrying the failures of this round.
+        time.sleep(min(2 ** round_num, 30))
+        round_num += 1
+
+    stats['seconds'] = time.time() - start
+    last_drain = dict(stats, bytes_per_second=stats['uploaded_bytes'] / max(stats['seconds'], 1e-6),
+                      finished=time.time())
+    self._write_json(os.path.join(self._root, self._STATS_FILE), last_drain)
+    return stats
+
+  def _has_untried_entries(self):
+    for entry_id in self._entry_ids():
+      entry = self._read_entry(entry_id)
+      if entry is not None and entry['attempts'] == 0:
+        return True
+    return False
+
+  def _upload(self, entry_id, max_attempts):
+    """Attempts to upload the given entry, and returns a pair of its outcome and size."""
+    entry = self._read_entry(entry_id)
+    if entry is None:
+      return 'missing', 0
+    data = os.path.join(self._root, entry_id + self._DATA_SUFFIX)
+    try:
+      with open(data, 'rb') as body:
+        response = RequestsSession.instance().put(entry['url'], data=body,
+                                                  timeout=entry['timeout'], allow_redirects=True)
+      if int(response.status_code / 100) != 2:
+        raise RequestException('{} {}'.format(response.status_code, response.reason))
+    except (IOError, OSError, RequestException) as e:
+      entry['attempts'] += 1
+      if entry['attempts'] < max_attempts:
+        logger.debug('Failed to upload {}, will retry: {}'.format(entry['url'], e))
+        self._write_entry(entry_id, entry)
+        return 'failed', entry['size']
+      logger.warn('Failed to upload {} after {} attempts: {}'.format(entry['url'],
+                                                                     entry['attempts'], e))
+      self._remove(entry_id)
+      return 'dropped', entry['size']
+    self._remove(entry_id)
+    return 'uploaded', entry['size']
+
+  def _entry_ids(self):
+    try:
+      names = os.listdir(self._root)
+    except OSError as e:
+      if e.errno != errno.ENOENT:
+        raise
+      return []
+    return sorted(name[:-len(self._ENTRY_SUFFIX)] for name in names
+                  if name.endswith(self._ENTRY_SUFFIX) and not name.startswith('.'))
+
+  def _read_entry(self, entry_id):
+    try:
+      with open(os.path.join(self._root, entry_id + self._ENTRY_SUFFIX), 'r') as fp:
+        return json.load(fp)
+    except (IOError, OSError, ValueError):
+      return None
+
+  def _write_entry(self, entry_id, entry):
+    self._write_json(os.path.join(self._root, entry_id + self._ENTRY_SUFFIX), entry)
+
+  def _write_json(self, path, value):
+    tmp = '{}.tmp-{}'.format(path, uuid.uuid4().hex)
+    mode = 'w' if PY3 else 'wb'
+    with open(tmp, mode) as fp:
+      json.dump(value, fp)
+    os.rename(tmp, path)
+
+  def _remove(self, entry_id):
+    # The entry goes first, so that a crash leaves at worst an abandoned data file.
+    safe_delete(os.path.join(self._root, entry_id + self._ENTRY_SUFFIX))
+    safe_delete(os.path.join(self._root, entry_id + self._DATA_SUFFIX))
+
+  def _remove_abandoned_data(self, now):
+    entry_ids = set(self._entry_ids())
+    for name in os.listdir(self._root):
+      path = os.path.join(self._root, name)
+      if name.endswith(self._DATA_SUFFIX):
+        abandoned = name[:-len(self._DATA_SUFFIX)] not in entry_ids
+      else:
+        abandoned = '.tmp-' in name
+      try:
+        if abandoned and now - os.path.getmtime(path) > self._ABANDONED_DATA_SECS:
+          safe_delete(path)
+      except OSError:
+        pass
+
+
+def main(args=None):
+  parser = argparse.ArgumentParser(description='Upload the artifacts queued in an upload queue.')
+  parser.add_argument('--max-concurrency', type=int, default=8)
+  parser.add_argument('--max-attempts', type=int, default=5)
+  parser.add_argument('root')
+  options = parser.parse_args(args)
+  ArtifactUploadQueue(options.root).drain(max_concurrency=options.max_concurrency,
+                                          max_attempts=options.max_attempts)
+
+
+if __name__ == '__main__':
+  main()
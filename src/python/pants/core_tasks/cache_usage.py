@@ -0,0 +1,66 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import time
+from collections import defaultdict
+
+from pants.cache.cache_setup import CacheFactory, CacheSetup
+from pants.cache.local_cache_eviction import list_local_cache_entries, read_task_name
+from pants.task.console_task import ConsoleTask
+from pants.util.strutil import pluralize
+
+
+class CacheUsage(ConsoleTask):
+  """Report the size of the local artifact caches, and how recently their artifacts were used.
+
+  The caches reported are the local caches among the `read_from` and `write_to` options of the
+  `cache` scope. For each cache, the artifacts of each task are bucketed by the time since they
+  were last inserted or hit.
+  """
+
+  # The buckets of time since an artifact was last used, with their upper bounds in seconds.
+  LAST_USED_BUCKETS = (
+    ('<1h', 60 * 60),
+    ('<1d', 24 * 60 * 60),
+    ('<1w', 7 * 24 * 60 * 60),
+    ('older', None),
+  )
+
+  def _local_cache_roots(self):
+    options = CacheSetup.scoped_instance(self).get_options()
+    roots = []
+    for spec in options.read_from + options.write_to:
+      if CacheFactory.is_local(spec):
+        root = os.path.realpath(os.path.expanduser(spec))
+        if root not in roots:
+          roots.append(root)
+    return roots
+
+  def _bucket(self, age):
+    for name, bound in self.LAST_USED_BUCKETS:
+      if bound is None or age < bound:
+        return name
+
+  def console_output(self, targets):
+    now = time.time()
+    for root in self._local_cache_roots():
+      sizes = defaultdict(int)
+      counts = defaultdict(int)
+      buckets = defaultdict(lambda: defaultdict(int))
+      for entry in list_local_cache_entries(root):
+        sizes[entry.task_dir] += entry.size
+        counts[entry.task_dir] += 1
+        buckets[entry.task_dir][self._bucket(now - entry.last_used)] += 1
+
+      yield '{}: {} bytes in {}'.format(root, sum(sizes.values()),
+                                        pluralize(sum(counts.values()), 'artifact'))
+      for task_dir in sorted(sizes, key=lambda d: (-sizes[d], d)):
+        task_name = read_task_name(os.path.join(root, task_dir)) or '<unknown task>'
+        last_used = ', '.join('{}: {}'.format(name, buckets[task_dir][name])
+                              for name, _ in self.LAST_USED_BUCKETS)
+        yield '  {} ({}): {} bytes in {}; last used {}'.format(
+          task_name, task_dir, sizes[task_dir], pluralize(counts[task_dir], 'artifact'), last_used)
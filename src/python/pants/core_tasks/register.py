@@ -5,6 +5,7 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 from pants.core_tasks.bash_completion import BashCompletion
+from pants.core_tasks.cache_usage import CacheUsage
 from pants.core_tasks.clean import Clean
 from pants.core_tasks.deferred_sources_mapper import DeferredSourcesMapper
 from pants.core_tasks.explain_options_task import ExplainOptionsTask
@@ -90,6 +91,7 @@ def register_goals():
 
   # Workspace information.
   task(name='roots', action=ListRoots).install()
+  task(name='cache-usage', action=CacheUsage).install()
   task(name='bash-completion', action=BashCompletion).install()
 
   # Handle sources that aren't loose files in the repo.
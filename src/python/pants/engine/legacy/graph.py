@@ -15,6 +15,7 @@ from twitter.common.collections import OrderedSet
 
 from pants.base.exceptions import TargetDefinitionException
 from pants.base.parse_context import ParseContext
+from pants.base.project_tree import Dir
 from pants.base.specs import AscendantAddresses, DescendantAddresses, SingleAddress, Specs
 from pants.build_graph.address import Address
 from pants.build_graph.address_lookup_error import AddressLookupError
@@ -26,7 +27,7 @@ from pants.engine.addressable import BuildFileAddresses
 from pants.engine.fs import PathGlobs, Snapshot
 from pants.engine.legacy.address_mapper import LegacyAddressMapper
 from pants.engine.legacy.structs import BundleAdaptor, BundlesField, HydrateableField, SourcesField
-from pants.engine.mapper import AddressMapper
+from pants.engine.mapper import AddressFamily, AddressMapper
 from pants.engine.objects import Collection
 from pants.engine.parser import HydratedStruct
 from pants.engine.rules import RootRule, rule
@@ -129,7 +130,7 @@ class LegacyBuildGraph(BuildGraph):
     # Instantiate the target.
     address = target_adaptor.address
     target = self._instantiate_target(target_adaptor)
-    self._target_by_address[address] = target
+    self._set_target(address, target)
 
     for dependency in target_adaptor.dependencies:
       if dependency in self._target_dependencies_by_address[address]:
@@ -139,8 +140,7 @@ class LegacyBuildGraph(BuildGraph):
           .format(spec=dependency.spec, target=address.spec)
         )
       # Link its declared dependencies, which will be indexed independently.
-      self._target_dependencies_by_address[address].add(dependency)
-      self._target_dependees_by_address[dependency].add(address)
+      self._add_dependency(address, dependency)
     return target
 
   def _instantiate_target(self, target_adaptor):
@@ -252,12 +252,24 @@ class LegacyBuildGraph(BuildGraph):
       yield hydrated_target.address
 
 
-class _DependentGraph(object):
+class _DirectoryDependencies(datatype([('dependencies', tuple)])):
+  """The dependencies of the targets defined in the BUILD files of one directory.
+
+  Each entry is a triple of a target address, its declared dependency addresses, and its implicit
+  dependency addresses.
+  """
+
+
+class DependentGraph(object):
   """A graph for walking dependent addresses of TargetAdaptor objects.
 
   This avoids/imitates constructing a v1 BuildGraph object, because that codepath results
   in many references held in mutable global state (ie, memory leaks).
 
+  The graph for the whole repo is an engine product, memoized along with the dependencies of each
+  directory that it is built from: under pantsd, it is only recomputed when a BUILD file changes,
+  and then only the dependencies of the directories whose BUILD files changed are recomputed.
+
   The long term goal is to deprecate the `changed` goal in favor of sufficiently good cache
   hit rates, such that rather than running:
 
@@ -271,17 +283,31 @@ class _DependentGraph(object):
   """
 
   @classmethod
-  def from_iterable(cls, target_types, address_mapper, adaptor_iter):
-    """Create a new DependentGraph from an iterable of TargetAdaptor subclasses."""
-    inst = cls(target_types, address_mapper)
+  def from_directory_dependencies(cls, directory_dependencies):
+    """Create a new DependentGraph from an iterable of _DirectoryDependencies."""
+    inst = cls()
     all_valid_addresses = set()
-    for target_adaptor in adaptor_iter:
-      inst._inject_target(target_adaptor)
-      all_valid_addresses.add(target_adaptor.address)
+    for dependencies in directory_dependencies:
+      for address, declared_deps, implicit_deps in dependencies.dependencies:
+        inst._inject_dependencies(address, declared_deps, implicit_deps)
+        all_valid_addresses.add(address)
     inst._validate(all_valid_addresses)
     return inst
 
-  def __init__(self, target_types, address_mapper):
+  @staticmethod
+  def dependencies_of(target_types, address_mapper, target_adaptor):
+    """Returns the declared and implicit dependency addresses of the given TargetAdaptor."""
+    target_cls = target_types[target_adaptor.type_alias]
+
+    declared_deps = tuple(target_adaptor.dependencies)
+    implicit_deps = tuple(Address.parse(s,
+                                        relative_to=target_adaptor.address.spec_path,
+                                        subproject_roots=address_mapper.subproject_roots)
+                          for s in target_cls.compute_dependency_specs(
+                            kwargs=target_adaptor.kwargs()))
+    return declared_deps, implicit_deps
+
+  def __init__(self):
     # TODO: Dependencies and implicit dependencies are mapped independently, because the latter
     # cannot be validated until:
     #  1) Subsystems are computed in engine: #5869. Currently instantiating a subsystem to find
@@ -289,8 +315,6 @@ class _DependentGraph(object):
     #  2) Targets-class Subsystem deps can be expanded in-engine (similar to Fields): #4535,
     self._dependent_address_map = defaultdict(set)
     self._implicit_dependent_address_map = defaultdict(set)
-    self._target_types = target_types
-    self._address_mapper = address_mapper
 
   def _validate(self, all_valid_addresses):
     """Validate that all of the dependencies in the graph exist in the given addresses set."""
@@ -303,19 +327,12 @@ class _DependentGraph(object):
           )
         )
 
-  def _inject_target(self, target_adaptor):
-    """Inject a target, respecting all sources of dependencies."""
-    target_cls = self._target_types[target_adaptor.type_alias]
-
-    declared_deps = target_adaptor.dependencies
-    implicit_deps = (Address.parse(s,
-                                   relative_to=target_adaptor.address.spec_path,
-                                   subproject_roots=self._address_mapper.subproject_roots)
-                     for s in target_cls.compute_dependency_specs(kwargs=target_adaptor.kwargs()))
+  def _inject_dependencies(self, address, declared_deps, implicit_deps):
+    """Inject the edges of a target, respecting all sources of dependencies."""
     for dep in declared_deps:
-      self._dependent_address_map[dep].add(target_adaptor.address)
+      self._dependent_address_map[dep].add(address)
     for dep in implicit_deps:
-      self._implicit_dependent_address_map[dep].add(target_adaptor.address)
+      self._implicit_dependent_address_map[dep].add(address)
 
   def dependents_of_addresses(self, addresses):
     """Given an iterable of addresses, yield all of those addresses dependents."""
@@ -384,8 +401,8 @@ class OwnersRequest(datatype([
   """
 
 
-@rule(BuildFileAddresses, [BuildConfiguration, AddressMapper, OwnersRequest])
-def find_owners(build_configuration, address_mapper, owners_request):
+@rule(BuildFileAddresses, [OwnersRequest])
+def find_owners(owners_request):
   sources_set = OrderedSet(owners_request.sources)
   dirs_set = OrderedSet(dirname(source) for source in sources_set)
 
@@ -420,14 +437,7 @@ def find_owners(build_configuration, address_mapper, owners_request):
     yield BuildFileAddresses(direct_owners)
   else:
     # Otherwise: find dependees.
-    all_addresses = yield Get(BuildFileAddresses, Specs((DescendantAddresses(''),)))
-    all_structs = yield [Get(HydratedStruct, Address, a.to_address()) for a in all_addresses]
-    all_structs = [s.value for s in all_structs]
-
-    bfa = build_configuration.registered_aliases()
-    graph = _DependentGraph.from_iterable(target_types_from_build_file_aliases(bfa),
-                                          address_mapper,
-                                          all_structs)
+    graph = yield Get(DependentGraph, Specs, Specs((DescendantAddresses(''),)))
     if owners_request.include_dependees == 'direct':
       yield BuildFileAddresses(tuple(graph.dependents_of_addresses(direct_owners)))
     else:
@@ -435,6 +445,35 @@ def find_owners(build_configuration, address_mapper, owners_request):
       yield BuildFileAddresses(tuple(graph.transitive_dependents_of_addresses(direct_owners)))
 
 
+@rule(DependentGraph, [Specs])
+def dependent_graph(specs):
+  """Builds the DependentGraph of the targets matched by the given Specs."""
+  addresses = yield Get(BuildFileAddresses, Specs, specs)
+  directories = OrderedSet(address.spec_path for address in addresses)
+  directory_dependencies = yield [Get(_DirectoryDependencies, Dir(d)) for d in directories]
+  yield DependentGraph.from_directory_dependencies(directory_dependencies)
+
+
+@rule(_DirectoryDependencies, [BuildConfiguration, AddressMapper, Dir])
+def directory_dependencies(build_configuration, address_mapper, directory):
+  """Computes the dependencies of the targets defined in the BUILD files of a directory.
+
+  This is memoized per directory, so that a change to one BUILD file only recomputes the
+  dependencies of the targets in its directory.
+  """
+  address_family = yield Get(AddressFamily, Dir, directory)
+  addresses = sorted(address_family.addressables)
+  structs = yield [Get(HydratedStruct, Address, a.to_address()) for a in addresses]
+
+  target_types = target_types_from_build_file_aliases(build_configuration.registered_aliases())
+  dependencies = []
+  for address, struct in zip(addresses, structs):
+    declared_deps, implicit_deps = DependentGraph.dependencies_of(target_types, address_mapper,
+                                                                  struct.value)
+    dependencies.append((address, declared_deps, implicit_deps))
+  yield _DirectoryDependencies(tuple(dependencies))
+
+
 @rule(TransitiveHydratedTargets, [BuildFileAddresses])
 def transitive_hydrated_targets(build_file_addresses):
   """Given BuildFileAddresses, kicks off recursion on expansion of TransitiveHydratedTargets.
@@ -560,6 +599,8 @@ def create_legacy_graph_tasks():
     hydrated_targets,
     hydrate_target,
     find_owners,
+    dependent_graph,
+    directory_dependencies,
     hydrate_sources,
     hydrate_bundles,
     RootRule(OwnersRequest),
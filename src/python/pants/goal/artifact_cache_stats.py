@@ -9,12 +9,16 @@ from builtins import object, open, str, zip
 from collections import defaultdict, namedtuple
 
 from pants.cache.artifact_cache import UnreadableArtifact
+from pants.cache.cache_telemetry import CacheTelemetry
 from pants.util.dirutil import safe_mkdir
 
 
 # Lists of target addresses.
 CacheStat = namedtuple('CacheStat', ['hit_targets', 'miss_targets'])
 
+# The number and total size of the artifacts queued for upload to remote caches.
+QueuedUploads = namedtuple('QueuedUploads', ['num_artifacts', 'num_bytes'])
+
 
 class ArtifactCacheStats(object):
   """Tracks the hits and misses in the artifact cache.
@@ -25,6 +29,9 @@ class ArtifactCacheStats(object):
     def init_stat():
       return CacheStat([], [])
     self.stats_per_cache = defaultdict(init_stat)
+    self.queued_uploads_per_cache = defaultdict(lambda: QueuedUploads(0, 0))
+    self.upload_queues = {}
+    self.telemetry = CacheTelemetry()
     self._dir = dir
     safe_mkdir(self._dir)
 
@@ -35,6 +42,38 @@ class ArtifactCacheStats(object):
   def add_misses(self, cache_name, targets, causes):
     self._add_stat(1, cache_name, targets, causes)
 
+  def add_queued_uploads(self, cache_name, num_artifacts, num_bytes):
+    """Records artifacts queued for upload to a remote cache, rather than uploaded in this run."""
+    queued = self.queued_uploads_per_cache[cache_name]
+    self.queued_uploads_per_cache[cache_name] = QueuedUploads(queued.num_artifacts + num_artifacts,
+                                                              queued.num_bytes + num_bytes)
+
+  def set_upload_queue_stats(self, queue_root, backlog_artifacts, backlog_bytes, last_drain=None):
+    """Records the state of an upload queue at the end of this run.
+
+    :param str queue_root: The directory of the queue.
+    :param int backlog_artifacts: The number of artifacts waiting in the queue.
+    :param int backlog_bytes: The total size of the artifacts waiting in the queue.
+    :param dict last_drain: The stats of the last completed drain of the queue, if any: including
+                            its upload throughput.
+    """
+    self.upload_queues[queue_root] = {
+      'queue': queue_root,
+      'backlog_artifacts': backlog_artifacts,
+      'backlog_bytes': backlog_bytes,
+      'last_drain': last_drain,
+    }
+
+  def get_upload_stats(self):
+    """Returns the stats of queued remote cache uploads as a dict."""
+    return {
+      'queued': [{'cache_name': cache_name,
+                  'num_artifacts': queued.num_artifacts,
+                  'num_bytes': queued.num_bytes}
+                 for cache_name, queued in self.queued_uploads_per_cache.items()],
+      'queues': list(self.upload_queues.values()),
+    }
+
   def get_all(self):
     """Returns the cache stats as a list of dicts."""
     ret = []
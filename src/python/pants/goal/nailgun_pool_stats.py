@@ -0,0 +1,54 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import threading
+from builtins import object
+from collections import defaultdict
+
+
+class NailgunPoolStats(object):
+  """Tracks the use of the pools of warm nailgun servers of tasks, by pool."""
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._stats = defaultdict(lambda: {
+      'leases': 0,
+      'hits': 0,
+      'misses': 0,
+      'shared': 0,
+      'spawn_time': 0.0,
+      'wait_time': 0.0,
+      'evictions': 0,
+    })
+
+  def record_lease(self, pool, wait_time, spawn_time=None, shared=False):
+    """Records a run via a server of the given pool.
+
+    :param string pool: The name of the pool.
+    :param float wait_time: How long the run waited for a server to be free.
+    :param float spawn_time: How long the run waited for a server to start, or None if it found
+                             a warm server.
+    :param bool shared: True if the server was running other runs at the same time.
+    """
+    with self._lock:
+      stats = self._stats[pool]
+      stats['leases'] += 1
+      stats['wait_time'] += wait_time
+      if shared:
+        stats['shared'] += 1
+      if spawn_time is None:
+        stats['hits'] += 1
+      else:
+        stats['misses'] += 1
+        stats['spawn_time'] += spawn_time
+
+  def record_eviction(self, pool):
+    with self._lock:
+      self._stats[pool]['evictions'] += 1
+
+  def get_all(self):
+    with self._lock:
+      return {pool: dict(stats) for pool, stats in self._stats.items()}
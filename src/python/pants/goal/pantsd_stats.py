@@ -12,6 +12,7 @@ class PantsDaemonStats(object):
 
   def __init__(self):
     self.scheduler_metrics = {}
+    self.queue_time = 0.0
 
   def set_scheduler_metrics(self, scheduler_metrics):
     self.scheduler_metrics = scheduler_metrics
@@ -22,7 +23,11 @@ class PantsDaemonStats(object):
   def set_affected_targets_size(self, size):
     self.scheduler_metrics['affected_targets_size'] = size
 
+  def set_queue_time(self, secs):
+    """Sets the time the run waited for other runs of the daemon to complete before starting."""
+    self.queue_time = secs
+
   def get_all(self):
     for key in ['target_root_size', 'affected_targets_size']:
       self.scheduler_metrics.setdefault(key, 0)
-    return self.scheduler_metrics
+    return dict(self.scheduler_metrics, queue_time=self.queue_time)
@@ -6,7 +6,7 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import os
 from builtins import object, str
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 
 import six
 from twitter.common.collections import OrderedSet
@@ -136,6 +136,165 @@ class UnionProducts(object):
     return not self == other
 
 
+class InternedUnionProducts(object):
+  """UnionProducts whose members are interned, for products with many members shared by targets.
+
+  Each distinct member is stored and hashed once, in a table of members by id, and the products of
+  a target are an insertion ordered set of member ids. Unions over many targets (eg: the classpath
+  of the transitive dependencies of a target) then dedupe ints rather than re-hashing each member,
+  which matters when members have expensive `__hash__` and `__eq__` implementations.
+
+  :API: public
+  """
+
+  def __init__(self):
+    """
+    :API: public
+    """
+    self._members = []
+    self._ids_by_member = {}
+    # A map of target to an OrderedDict whose keys are the ids of the members of its products.
+    self._ids_by_target = {}
+
+  def _intern(self, member):
+    member_id = self._ids_by_member.get(member)
+    if member_id is None:
+      member_id = len(self._members)
+      self._ids_by_member[member] = member_id
+      self._members.append(member)
+    return member_id
+
+  def copy(self):
+    """Returns a copy of this InternedUnionProducts.
+
+    Edits to the copy's mappings will not affect the product mappings in the original. As for
+    `UnionProducts.copy`, the members themselves are shared.
+
+    :API: public
+
+    :rtype: :class:`InternedUnionProducts`
+    """
+    copied = InternedUnionProducts()
+    copied._members = list(self._members)
+    copied._ids_by_member = dict(self._ids_by_member)
+    copied._ids_by_target = {target: OrderedDict(ids) for target, ids in self._ids_by_target.items()}
+    return copied
+
+  def targets(self):
+    """Returns the targets that have products.
+
+    :API: public
+    """
+    return [target for target, ids in self._ids_by_target.items() if ids]
+
+  def add_for_target(self, target, products):
+    """Updates the products for a particular target, adding to existing entries.
+
+    :API: public
+    """
+    ids = self._ids_by_target.get(target)
+    if ids is None:
+      ids = self._ids_by_target[target] = OrderedDict()
+    for product in products:
+      ids[self._intern(product)] = None
+
+  def add_for_targets(self, targets, products):
+    """Updates the products for the given targets, adding to existing entries.
+
+    :API: public
+    """
+    products = list(products)
+    for target in targets:
+      self.add_for_target(target, products)
+
+  def remove_for_target(self, target, products):
+    """Updates the products for a particular target, removing the given existing entries.
+
+    :API: public
+    """
+    ids = self._ids_by_target.get(target)
+    if ids:
+      for product in products:
+        member_id = self._ids_by_member.get(product)
+        if member_id is not None:
+          ids.pop(member_id, None)
+
+  def get_for_target(self, target):
+    """Gets the products for the given target.
+
+    :API: public
+    """
+    return self.get_for_targets([target])
+
+  def get_for_targets(self, targets):
+    """Gets the union of the products for the given targets, preserving the input order.
+
+    :API: public
+
+    :rtype: :class:`twitter.common.collections.OrderedSet`
+    """
+    return OrderedSet(self.union_for_targets(targets))
+
+  def union_for_targets(self, targets):
+    """As `get_for_targets`, but returns the union as a list, without building an OrderedSet.
+
+    :API: public
+
+    :rtype: list
+    """
+    union = OrderedDict()
+    for target in targets:
+      ids = self._ids_by_target.get(target)
+      if ids:
+        # Ids already in the union keep their position.
+        union.update(ids)
+    members = self._members
+    return [members[member_id] for member_id in union]
+
+  def get_product_target_mappings_for_targets(self, targets):
+    """Gets the product-target associations for the given targets, preserving the input order.
+
+    :API: public
+
+    :param targets: The targets to lookup products for.
+    :returns: The ordered (product, target) tuples.
+    """
+    members = self._members
+    product_target_mappings = []
+    for target in targets:
+      for member_id in self._ids_by_target.get(target, ()):
+        product_target_mappings.append((members[member_id], target))
+    return product_target_mappings
+
+  def target_for_product(self, product):
+    """Looks up the target key for a product.
+
+    :API: public
+
+    :param product: The product to search for
+    :return: None if there is no target for the product
+    """
+    member_id = self._ids_by_member.get(product)
+    if member_id is not None:
+      for target, ids in self._ids_by_target.items():
+        if member_id in ids:
+          return target
+    return None
+
+  def _as_dict(self):
+    return {target: [self._members[member_id] for member_id in ids]
+            for target, ids in self._ids_by_target.items() if ids}
+
+  def __str__(self):
+    return "InternedUnionProducts({})".format(self._as_dict())
+
+  def __eq__(self, other):
+    return isinstance(other, InternedUnionProducts) and self._as_dict() == other._as_dict()
+
+  def __ne__(self, other):
+    return not self == other
+
+
 class RootedProducts(object):
   """File products of a build that have a concept of a 'root' directory.
 
@@ -25,6 +25,7 @@ from pants.base.worker_pool import SubprocPool, WorkerPool
 from pants.base.workunit import WorkUnit, WorkUnitLabel
 from pants.goal.aggregated_timings import AggregatedTimings
 from pants.goal.artifact_cache_stats import ArtifactCacheStats
+from pants.goal.nailgun_pool_stats import NailgunPoolStats
 from pants.goal.pantsd_stats import PantsDaemonStats
 from pants.option.config import Config
 from pants.option.options_fingerprinter import CoercingOptionEncoder
@@ -120,6 +121,7 @@ class RunTracker(Subsystem):
     self.cumulative_timings = None
     self.self_timings = None
     self.artifact_cache_stats = None
+    self.nailgun_pool_stats = None
     self.pantsd_stats = None
 
     # Initialized in `start()`.
@@ -230,6 +232,9 @@ class RunTracker(Subsystem):
     self.artifact_cache_stats = ArtifactCacheStats(os.path.join(self.run_info_dir,
                                                                 'artifact_cache_stats'))
 
+    # Use of the pools of warm nailgun servers.
+    self.nailgun_pool_stats = NailgunPoolStats()
+
     # Daemon stats.
     self.pantsd_stats = PantsDaemonStats()
 
@@ -424,6 +429,9 @@ class RunTracker(Subsystem):
       return {
         'run_info': self.run_information(),
         'artifact_cache_stats': self.artifact_cache_stats.get_all(),
+        'artifact_upload_stats': self.artifact_cache_stats.get_upload_stats(),
+        'artifact_cache_telemetry': self.artifact_cache_stats.telemetry.get_all(),
+        'nailgun_pool_stats': self.nailgun_pool_stats.get_all(),
         'pantsd_stats': self.pantsd_stats.get_all(),
         'workunits': self.json_reporter.results,
       }
@@ -434,6 +442,9 @@ class RunTracker(Subsystem):
         'self_timings': self.self_timings.get_all(),
         'critical_path_timings': self.get_critical_path_timings().get_all(),
         'artifact_cache_stats': self.artifact_cache_stats.get_all(),
+        'artifact_upload_stats': self.artifact_cache_stats.get_upload_stats(),
+        'artifact_cache_telemetry': self.artifact_cache_stats.telemetry.get_all(),
+        'nailgun_pool_stats': self.nailgun_pool_stats.get_all(),
         'pantsd_stats': self.pantsd_stats.get_all(),
         'outcomes': self.outcomes,
         'recorded_options': self._get_options_to_record(),
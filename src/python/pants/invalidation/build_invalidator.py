@@ -7,6 +7,8 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import errno
 import hashlib
 import os
+import threading
+import weakref
 from abc import abstractmethod
 from builtins import object, open
 from collections import namedtuple
@@ -15,7 +17,7 @@ from pants.base.hash_utils import hash_all
 from pants.build_graph.target import Target
 from pants.fs.fs import safe_filename
 from pants.subsystem.subsystem import Subsystem
-from pants.util.dirutil import safe_mkdir
+from pants.util.dirutil import safe_delete, safe_mkdir
 from pants.util.meta import AbstractClass
 
 
@@ -127,6 +129,15 @@ class BuildInvalidator(object):
   class Factory(Subsystem):
     options_scope = 'build-invalidator'
 
+    @classmethod
+    def register_options(cls, register):
+      super(BuildInvalidator.Factory, cls).register_options(register)
+      register('--store', advanced=True, choices=['files', 'log'], default='files',
+               help='How to persist target fingerprints. files: one small file per target per '
+                    'task. log: a single append-only log per task, read into memory once per run. '
+                    'Fingerprints left behind by the files store are imported by the log store '
+                    'on first use.')
+
     @classmethod
     def create(cls, build_task=None):
       """Creates a build invalidator optionally scoped to a task.
@@ -135,7 +146,10 @@ class BuildInvalidator(object):
                              supplied the build invalidator will act globally across all build
                              tasks.
       """
-      root = os.path.join(cls.global_instance().get_options().pants_workdir, 'build_invalidator')
+      options = cls.global_instance().get_options()
+      root = os.path.join(options.pants_workdir, 'build_invalidator')
+      if options.store == 'log':
+        return IndexedBuildInvalidator(root, scope=build_task)
       return BuildInvalidator(root, scope=build_task)
 
   @staticmethod
@@ -158,6 +172,11 @@ class BuildInvalidator(object):
       root = os.path.join(root, scope)
     self._root = root
     safe_mkdir(self._root)
+    self._discard_other_stores()
+
+  def _discard_other_stores(self):
+    # Fingerprints recorded by the `log` store go stale as soon as this store is used in its place.
+    safe_delete(os.path.join(self._root, IndexedBuildInvalidator._LOG_NAME))
 
   def previous_key(self, cache_key):
     """If there was a previous successful build for the given key, return the previous key.
@@ -228,3 +247,150 @@ class BuildInvalidator(object):
       if e.errno != errno.ENOENT:
         raise
       return None  # File doesn't exist.
+
+
+class IndexedBuildInvalidator(BuildInvalidator):
+  """A BuildInvalidator that stores all fingerprints for its scope in a single append-only log.
+
+  The log is read into an in-memory index the first time the invalidator is consulted, and each
+  update or invalidation afterwards appends one record to the already open log. This trades the
+  open/read/close per target per task of the per-file layout for a single sequential read.
+
+  The log is rewritten (atomically, via rename) when it is loaded and found to be dominated by
+  superseded records. Any `.hash` files left in the scope by the per-file layout are imported and
+  removed on first load.
+
+  Like the rest of the workdir, the log is not safe for concurrent writes from multiple pants
+  processes; those are excluded by the global workdir lock.
+  """
+
+  _LOG_NAME = 'fingerprints.log'
+  _LEGACY_EXTENSION = '.hash'
+
+  # Compact the log when it holds more than this many records per live fingerprint (and at
+  # least _MIN_COMPACTION_RECORDS records in total).
+  _COMPACTION_RATIO = 2
+  _MIN_COMPACTION_RECORDS = 1000
+
+  # All live instances, so that `force_invalidate_all` on a parent scope can reset the in-memory
+  # index of invalidators for the nested scopes it deletes.
+  _instances = weakref.WeakSet()
+
+  def __init__(self, root, scope=None):
+    super(IndexedBuildInvalidator, self).__init__(root, scope=scope)
+    self._log_path = os.path.join(self._root, self._LOG_NAME)
+    self._lock = threading.RLock()
+    self._index = None
+    self._log = None
+    self._instances.add(self)
+
+  def _discard_other_stores(self):
+    # Fingerprints left behind by the per-file store are imported lazily; see `_loaded_index`.
+    pass
+
+  def force_invalidate_all(self):
+    prefix = os.path.join(self._root, '')
+    for invalidator in list(self._instances):
+      if invalidator is self or invalidator._root.startswith(prefix):
+        invalidator._reset()
+    super(IndexedBuildInvalidator, self).force_invalidate_all()
+
+  def force_invalidate(self, cache_key):
+    if self.cacheable(cache_key):
+      self._append(cache_key.id, None)
+
+  def _write_sha(self, cache_key):
+    self._append(cache_key.id, cache_key.hash)
+
+  def _read_sha_by_id(self, id):
+    return self._loaded_index().get(id)
+
+  def _reset(self):
+    with self._lock:
+      if self._log is not None:
+        self._log.close()
+        self._log = None
+      self._index = None
+
+  def _append(self, id, hash):
+    with self._lock:
+      index = self._loaded_index()
+      if hash is None:
+        if index.pop(id, None) is None:
+          return
+      elif index.get(id) == hash:
+        return
+      else:
+        index[id] = hash
+
+      if self._log is None:
+        self._log = open(self._log_path, 'a')
+      self._log.write('{}\t{}\n'.format(id, hash or ''))
+      self._log.flush()
+
+  def _loaded_index(self):
+    with self._lock:
+      if self._index is None:
+        # Our scope may have been deleted out from under us by a parent's `force_invalidate_all`.
+        safe_mkdir(self._root)
+        index, record_count, truncated = self._read_log()
+        imported = self._import_legacy_files(index)
+        if (truncated or imported or
+            record_count > max(self._MIN_COMPACTION_RECORDS,
+                               self._COMPACTION_RATIO * len(index))):
+          self._compact(index)
+        self._index = index
+      return self._index
+
+  def _read_log(self):
+    """Replays the log, returning the live index, the number of records read and whether the log
+    ended in a partially written record."""
+    index = {}
+    record_count = 0
+    try:
+      with open(self._log_path, 'r') as fd:
+        for line in fd:
+          if not line.endswith('\n'):
+            # An interrupted write: drop the partial record and rewrite the log without it, so that
+            # later appends are not concatenated onto it.
+            return index, record_count, True
+          record_count += 1
+          id, _, hash = line[:-1].partition('\t')
+          if hash:
+            index[id] = hash
+          else:
+            index.pop(id, None)
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+    return index, record_count, False
+
+  def _import_legacy_files(self, index):
+    """Moves fingerprints written by the per-file layout into the given index.
+
+    Files whose names were shortened by `safe_filename` cannot be mapped back to a target id; they
+    are dropped, which just means their targets are rebuilt once.
+
+    :returns: True if any legacy files were found.
+    """
+    legacy_files = [name for name in os.listdir(self._root)
+                    if name.endswith(self._LEGACY_EXTENSION)
+                    and os.path.isfile(os.path.join(self._root, name))]
+    for name in legacy_files:
+      id = name[:-len(self._LEGACY_EXTENSION)]
+      if safe_filename(id, extension=self._LEGACY_EXTENSION) == name:
+        hash = super(IndexedBuildInvalidator, self)._read_sha_by_id(id)
+        if hash:
+          index[id] = hash
+      safe_delete(os.path.join(self._root, name))
+    return bool(legacy_files)
+
+  def _compact(self, index):
+    if self._log is not None:
+      self._log.close()
+      self._log = None
+    tmp_path = '{}.tmp'.format(self._log_path)
+    with open(tmp_path, 'w') as fd:
+      for id, hash in sorted(index.items()):
+        fd.write('{}\t{}\n'.format(id, hash))
+    os.rename(tmp_path, self._log_path)
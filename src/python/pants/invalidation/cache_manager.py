@@ -4,13 +4,18 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import multiprocessing
 import os
 import shutil
 from builtins import object
+from contextlib import contextmanager
 from hashlib import sha1
+from multiprocessing.pool import ThreadPool
 
 from future.utils import raise_from
+from twitter.common.collections import OrderedSet
 
+from pants.base.fingerprint_strategy import DefaultFingerprintStrategy
 from pants.build_graph.build_graph import sort_targets
 from pants.build_graph.target import Target
 from pants.invalidation.build_invalidator import CacheKey
@@ -18,6 +23,30 @@ from pants.util.dirutil import relative_symlink, safe_delete, safe_mkdir, safe_r
 from pants.util.memo import memoized_method
 
 
+def compute_invalidation_hashes(targets, fingerprint_strategy=None, max_workers=None):
+  """Memoizes the invalidation hashes of the given targets, computing them in parallel.
+
+  Most of the cost of an invalidation hash is hashing the target's payload, and in particular the
+  files of lazily globbed sources, which releases the GIL: so the hashes are computed on a thread
+  pool. Targets and their payloads are not picklable, which rules out a process pool. Hashes are
+  memoized on targets, which are shared by all the tasks of a run, so each hash is computed once.
+
+  :param targets: The targets whose invalidation hashes to compute.
+  :param FingerprintStrategy fingerprint_strategy: The strategy to compute the hashes with.
+  :param int max_workers: The maximum number of hashes to compute at once: defaults to the cpu
+                          count.
+  """
+  targets = list(targets)
+  if len(targets) < 2:
+    return
+  pool = ThreadPool(processes=min(len(targets), max_workers or multiprocessing.cpu_count()))
+  try:
+    pool.map(lambda target: target.invalidation_hash(fingerprint_strategy), targets, chunksize=1)
+  finally:
+    pool.close()
+    pool.join()
+
+
 class VersionedTargetSet(object):
   """Represents a list of targets, a corresponding CacheKey, and a flag determining whether the
   list of targets is currently valid.
@@ -273,9 +302,13 @@ class InvalidationCacheManager(object):
                invalidation_report=None,
                task_name=None,
                task_version_slug=None,
-               artifact_write_callback=lambda _: None):
+               artifact_write_callback=lambda _: None,
+               workunit_factory=None):
     """
     :API: public
+
+    :param workunit_factory: An optional factory of workunits to time the phases of computing cache
+                             keys under, such as `Context.new_workunit`.
     """
     self._cache_key_generator = cache_key_generator
     self._task_name = task_name or 'UNKNOWN'
@@ -283,6 +316,7 @@ class InvalidationCacheManager(object):
     self._invalidator = build_invalidator
     self._fingerprint_strategy = fingerprint_strategy
     self._artifact_write_callback = artifact_write_callback
+    self._workunit_factory = workunit_factory
     self.invalidation_report = invalidation_report
 
     # Create the task-versioned prefix of the results dir, and a stable symlink to it
@@ -363,6 +397,7 @@ class InvalidationCacheManager(object):
         sorted_targets = [t for t in reversed(sort_targets(targets)) if t in target_set]
       else:
         sorted_targets = sorted(targets)
+      self._compute_hashes(sorted_targets)
       for target in sorted_targets:
         target_key = self._key_for(target)
         if target_key is not None:
@@ -380,6 +415,42 @@ class InvalidationCacheManager(object):
   def previous_key(self, cache_key):
     return self._invalidator.previous_key(cache_key)
 
+  def _compute_hashes(self, targets):
+    """Computes the hashes that the keys of the given targets need in batch, rather than one by one.
+
+    The invalidation hashes that keys depend on are computed in parallel first, and then combined
+    into transitive hashes in a single pass, each under a workunit of its own.
+    """
+    fingerprint_strategy = self._fingerprint_strategy or DefaultFingerprintStrategy()
+    transitive_roots = []
+    if not self._invalidate_dependents:
+      hashed_targets = targets
+    else:
+      # Keys for targets that the strategy fingerprints directly only depend on the invalidation
+      # hashes of the target and of the dependencies the strategy selects.
+      hashed_targets = OrderedSet()
+      for target in targets:
+        if fingerprint_strategy.direct(target):
+          hashed_targets.add(target)
+          hashed_targets.update(fingerprint_strategy.dependencies(target))
+        else:
+          transitive_roots.append(target)
+      hashed_targets.update(Target.closure_for_targets(transitive_roots))
+
+    with self._workunit('direct-hashes'):
+      compute_invalidation_hashes(hashed_targets, fingerprint_strategy)
+    if transitive_roots:
+      with self._workunit('transitive-hashes'):
+        Target.compute_transitive_invalidation_hashes(transitive_roots, fingerprint_strategy)
+
+  @contextmanager
+  def _workunit(self, name):
+    if self._workunit_factory is None:
+      yield
+    else:
+      with self._workunit_factory(name):
+        yield
+
   def _key_for(self, target):
     try:
       return self._cache_key_generator.key_for_target(target,
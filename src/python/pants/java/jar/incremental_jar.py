@@ -0,0 +1,182 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+import os
+import struct
+import time
+import uuid
+import zipfile
+import zlib
+from builtins import object, open
+
+from pants.util.dirutil import safe_delete
+
+
+logger = logging.getLogger(__name__)
+
+
+# The headers of a zip without zip64 extensions: see
+# https://pkware.cachefly.net/webdocs/casestudies/APPNOTE.TXT
+_LOCAL_HEADER = struct.Struct(str('<4s5H3L2H'))
+_CENTRAL_HEADER = struct.Struct(str('<4s6H3L5H2L'))
+_END_OF_CENTRAL_DIRECTORY = struct.Struct(str('<4s4H2LH'))
+
+_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+_CENTRAL_HEADER_SIGNATURE = b'PK\x01\x02'
+_END_OF_CENTRAL_DIRECTORY_SIGNATURE = b'PK\x05\x06'
+
+_VERSION = 20
+_ENCRYPTED_FLAG = 0x1
+_UTF8_FLAG = 0x800
+_DIRECTORY_ATTRIBUTES = 0x10
+
+
+def _dos_date_time(date_time):
+  """Returns the (date, time) pair of a zip header for a (year, month, day, hour, min, sec) tuple."""
+  year, month, day, hour, minute, second = date_time[:6]
+  if year < 1980:
+    year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+  return (year - 1980) << 9 | month << 5 | day, hour << 11 | minute << 5 | second // 2
+
+
+class IncrementalJar(object):
+  """Writes a jar, reusing the compressed bytes of unchanged entries from a previous version of it.
+
+  Compressing its entries dominates the time taken to jar a large target, while recompiling it
+  usually changes only a few of its class files. A file whose size and crc32 match those of its entry
+  in the previous jar, and that is written with the same compression, has the compressed bytes of that
+  entry copied as-is, as located by the offset of its local header in the central directory. Only the
+  other files are compressed anew.
+  """
+
+  class Unsupported(Exception):
+    """Indicates a jar that cannot be written incrementally, and must be written from scratch."""
+
+  # The limits of a zip without zip64 extensions.
+  _MAX_ENTRIES = 0xffff
+  _MAX_OFFSET = 0xffffffff
+
+  def __init__(self, path, previous_path=None, compressed=True):
+    """
+    :param string path: The path to write the jar to: any existing file is replaced.
+    :param string previous_path: The path to the previous version of the jar, which may be `path`
+                                 itself, or None to compress all entries anew.
+    :param bool compressed: Whether to deflate the entries of the jar, or store them uncompressed.
+    """
+    self._path = path
+    self._previous_path = previous_path
+    self._compress_type = zipfile.ZIP_DEFLATED if compressed else zipfile.ZIP_STORED
+
+  def write(self, entries):
+    """Writes the given entries to the jar.
+
+    Each entry is preceded by an entry for each of its parent directories that has none yet.
+
+    :param entries: An iterable of (dest, src) pairs, where `dest` is the path of an entry in the jar
+                    and `src` is the path of the file holding its contents, in the order to write
+                    them in.
+    :returns: The number of entries whose compressed bytes were reused.
+    :raises: `IncrementalJar.Unsupported` if the jar needs zip64 extensions.
+    """
+    previous_entries = self._read_previous_entries()
+    tmp = '{}.tmp-{}'.format(self._path, uuid.uuid4().hex)
+    try:
+      with open(tmp, 'wb') as out:
+        previous = open(self._previous_path, 'rb') if previous_entries else None
+        try:
+          reused = self._write(out, entries, previous, previous_entries)
+        finally:
+          if previous:
+            previous.close()
+      os.rename(tmp, self._path)
+      return reused
+    finally:
+      safe_delete(tmp)
+
+  def _read_previous_entries(self):
+    if not self._previous_path or not os.path.isfile(self._previous_path):
+      return {}
+    try:
+      with zipfile.ZipFile(self._previous_path) as previous:
+        return {info.filename: info for info in previous.infolist()}
+    except (zipfile.BadZipfile, zipfile.LargeZipFile, IOError, OSError) as e:
+      logger.debug('Not reusing the entries of {}: {}'.format(self._previous_path, e))
+      return {}
+
+  def _write(self, out, entries, previous, previous_entries):
+    central_directory = []
+    directories = set()
+    reused = 0
+
+    def add(name, data, crc, size, compress_type, date_time, external_attributes=0):
+      offset = out.tell()
+      encoded_name = name.encode('utf-8')
+      flags = _UTF8_FLAG if len(encoded_name) != len(name) else 0
+      date, time_of_day = date_time
+      if len(central_directory) >= self._MAX_ENTRIES or offset + len(data) > self._MAX_OFFSET:
+        raise self.Unsupported('{} is too large for a jar without zip64 extensions'.format(self._path))
+      out.write(_LOCAL_HEADER.pack(_LOCAL_HEADER_SIGNATURE, _VERSION, flags, compress_type,
+                                   time_of_day, date, crc, len(data), size, len(encoded_name), 0))
+      out.write(encoded_name)
+      out.write(data)
+      central_directory.append(_CENTRAL_HEADER.pack(_CENTRAL_HEADER_SIGNATURE, _VERSION, _VERSION,
+                                                    flags, compress_type, time_of_day, date, crc,
+                                                    len(data), size, len(encoded_name), 0, 0, 0, 0,
+                                                    external_attributes, offset) + encoded_name)
+
+    for dest, src in entries:
+      parent = dest.rpartition('/')[0]
+      missing = []
+      while parent and parent not in directories:
+        directories.add(parent)
+        missing.append(parent)
+        parent = parent.rpartition('/')[0]
+      for directory in reversed(missing):
+        add(directory + '/', b'', 0, 0, zipfile.ZIP_STORED, _dos_date_time(time.localtime()),
+            external_attributes=_DIRECTORY_ATTRIBUTES)
+
+      with open(src, 'rb') as fp:
+        contents = fp.read()
+      crc = zlib.crc32(contents) & 0xffffffff
+      info = previous_entries.get(dest)
+      if (info is not None and info.file_size == len(contents) and info.CRC == crc and
+          info.compress_type == self._compress_type and not info.flag_bits & _ENCRYPTED_FLAG):
+        data = self._read_raw(previous, info)
+        date_time = _dos_date_time(info.date_time)
+        reused += 1
+      else:
+        data = self._compress(contents)
+        date_time = _dos_date_time(time.localtime(os.path.getmtime(src)))
+      add(dest, data, crc, len(contents), self._compress_type, date_time)
+
+    central_directory_offset = out.tell()
+    for header in central_directory:
+      out.write(header)
+    central_directory_size = out.tell() - central_directory_offset
+    if central_directory_offset + central_directory_size > self._MAX_OFFSET:
+      raise self.Unsupported('{} is too large for a jar without zip64 extensions'.format(self._path))
+    out.write(_END_OF_CENTRAL_DIRECTORY.pack(_END_OF_CENTRAL_DIRECTORY_SIGNATURE, 0, 0,
+                                             len(central_directory), len(central_directory),
+                                             central_directory_size, central_directory_offset, 0))
+    return reused
+
+  @staticmethod
+  def _read_raw(previous, info):
+    """Returns the compressed bytes of the given entry of the previous jar."""
+    previous.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(previous.read(_LOCAL_HEADER.size))
+    if header[0] != _LOCAL_HEADER_SIGNATURE:
+      raise zipfile.BadZipfile('Bad local header for {} in {}'.format(info.filename, previous.name))
+    name_length, extra_length = header[-2:]
+    previous.seek(name_length + extra_length, os.SEEK_CUR)
+    return previous.read(info.compress_size)
+
+  def _compress(self, contents):
+    if self._compress_type == zipfile.ZIP_STORED:
+      return contents
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(contents) + compressor.flush()
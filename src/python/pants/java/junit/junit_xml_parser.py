@@ -68,6 +68,14 @@ class RegistryOfTests(object):
     """
     return len(self._test_to_target) == 0
 
+  @property
+  def tests(self):
+    """Return the registered tests.
+
+    :rtype: tuple of :class:`Test`
+    """
+    return tuple(self._test_to_target)
+
   def match_test_spec(self, possible_test_specs):
     """
     This matches the user specified test spec with what tests Pants knows.
@@ -13,6 +13,7 @@ import threading
 import time
 from contextlib import closing
 
+import psutil
 from future.utils import PY3, string_types
 from twitter.common.collections import maybe_list
 
@@ -97,6 +98,17 @@ class NailgunExecutor(Executor, FingerprintedProcessManager):
     self._startup_timeout = startup_timeout
     self._connect_timeout = connect_timeout
     self._connect_attempts = connect_attempts
+    # Per thread, since runs that share a server may lease it from several threads at once.
+    self._spawn_times = threading.local()
+
+  @property
+  def last_spawn_time(self):
+    """How long the last nailgun server spawned by this executor in this thread took to start."""
+    return getattr(self._spawn_times, 'last', None)
+
+  @last_spawn_time.setter
+  def last_spawn_time(self, spawn_time):
+    self._spawn_times.last = spawn_time
 
   def __str__(self):
     return 'NailgunExecutor({identity}, dist={dist}, pid={pid} socket={socket})'.format(
@@ -127,6 +139,19 @@ class NailgunExecutor(Executor, FingerprintedProcessManager):
       digest.update(str(item).encode('utf-8'))
     return digest.hexdigest() if PY3 else digest.hexdigest().decode('utf-8')
 
+  def fingerprint_for(self, jvm_options, classpath):
+    """Returns the fingerprint of the nailgun server that runs the given jvm options and classpath."""
+    return self._fingerprint(jvm_options, self._nailgun_classpath + classpath,
+                             self._distribution.version)
+
+  def memory_usage(self):
+    """Returns the resident memory of the running nailgun server in bytes, or 0 if none is running."""
+    try:
+      process = self._as_process()
+      return process.memory_info().rss if process else 0
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+      return 0
+
   def _runner(self, classpath, main, jvm_options, args, cwd=None):
     """Runner factory. Called via Executor.execute()."""
     command = self._create_command(classpath, main, jvm_options, args)
@@ -169,8 +194,8 @@ class NailgunExecutor(Executor, FingerprintedProcessManager):
   def _get_nailgun_client(self, jvm_options, classpath, stdout, stderr, stdin):
     """This (somewhat unfortunately) is the main entrypoint to this class via the Runner. It handles
        creation of the running nailgun server as well as creation of the client."""
+    new_fingerprint = self.fingerprint_for(jvm_options, classpath)
     classpath = self._nailgun_classpath + classpath
-    new_fingerprint = self._fingerprint(jvm_options, classpath, self._distribution.version)
 
     with self._NAILGUN_SPAWN_LOCK:
       running, updated = self._check_nailgun_state(new_fingerprint)
@@ -243,6 +268,7 @@ Stderr:
 
   def _spawn_nailgun_server(self, fingerprint, jvm_options, classpath, stdout, stderr, stdin):
     """Synchronously spawn a new nailgun server."""
+    start_time = time.time()
     # Truncate the nailguns stdout & stderr.
     safe_file_dump(self._ng_stdout, b'', mode='wb')
     safe_file_dump(self._ng_stderr, b'', mode='wb')
@@ -271,6 +297,7 @@ Stderr:
 
     client = self._create_ngclient(self.socket, stdout, stderr, stdin)
     self.ensure_connectable(client)
+    self.last_spawn_time = time.time() - start_time
 
     return client
 
@@ -0,0 +1,175 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+import threading
+import time
+from builtins import range
+from collections import defaultdict
+from contextlib import contextmanager
+
+from pants.java.executor import Executor
+
+
+logger = logging.getLogger(__name__)
+
+
+class NailgunPool(Executor):
+  """Executes java programs via a pool of warm nailgun servers, sharded by fingerprint.
+
+  The pool has a fixed number of slots, each of which is a `NailgunExecutor` that hosts at most one
+  nailgun server, and that restarts it when it is leased for a different fingerprint (ie, jvm
+  options, classpath and java version). Each run leases a slot for its duration:
+  - a slot whose server has the run's fingerprint and runs fewer than `max_runs_per_server` runs is
+    leased when there is one, the least busy first.
+  - otherwise, if the fingerprint has fewer than `max_servers_per_fingerprint` servers, an idle
+    slot without a server is leased, or else the idle slot least recently used.
+  - otherwise, the run waits for a slot to be released.
+
+  A nailgun server runs each of its clients in a thread of its own, so a server that allows several
+  runs at once serves them from a single warm JVM, sharing its JIT and classloaders: eg, the
+  concurrent compiles of a task with a `--worker-count` above 1.
+
+  Servers outlive the runs that started them, so that later runs find them warm. When the servers of
+  the pool use more memory than its budget, idle servers are stopped, least recently used first.
+  """
+
+  # The metadata key under which the time that each slot was last released is recorded, so that the
+  # servers of a pool are evicted in LRU order across runs.
+  _LAST_USED_KEY = 'last_used'
+
+  def __init__(self, identity, executors, max_servers_per_fingerprint=1, max_runs_per_server=1,
+               memory_budget=None, stats=None):
+    """
+    :param string identity: The name of the pool in stats.
+    :param list executors: The `NailgunExecutor` of each slot: they must all have the same
+                           distribution and nailgun classpath.
+    :param int max_servers_per_fingerprint: The maximum number of servers with the same fingerprint.
+    :param int max_runs_per_server: The maximum number of concurrent runs via each server.
+    :param int memory_budget: The maximum resident memory of the servers of the pool in bytes, or
+                              None for no limit.
+    :param stats: An optional `NailgunPoolStats` to record the use of the pool to.
+    """
+    super(NailgunPool, self).__init__(distribution=executors[0].distribution)
+    self._identity = identity
+    self._executors = executors
+    self._max_servers_per_fingerprint = max_servers_per_fingerprint
+    self._max_runs_per_server = max_runs_per_server
+    self._memory_budget = memory_budget
+    self._stats = stats
+
+    self._condition = threading.Condition()
+    # The number of runs that lease each slot that is in use.
+    self._leases = defaultdict(int)
+    # The fingerprint of the server of each slot, or None if it has no server.
+    self._fingerprints = [executor.fingerprint if executor.is_alive() else None
+                          for executor in executors]
+    self._last_used = [executor.read_metadata_by_name(executor.name, self._LAST_USED_KEY, float) or 0
+                       for executor in executors]
+
+  def __str__(self):
+    return 'NailgunPool({identity}, slots={slots})'.format(identity=self._identity,
+                                                           slots=len(self._executors))
+
+  def _runner(self, classpath, main, jvm_options, args, cwd=None):
+    """Runner factory. Called via Executor.execute()."""
+    command = self._create_command(classpath, main, jvm_options, args)
+
+    class Runner(self.Runner):
+      @property
+      def executor(this):
+        return self
+
+      @property
+      def command(this):
+        return list(command)
+
+      def run(this, stdout=None, stderr=None, stdin=None, cwd=None):
+        with self._lease(jvm_options, classpath) as executor:
+          runner = executor.runner(classpath, main, jvm_options=jvm_options, args=args)
+          return runner.run(stdout=stdout, stderr=stderr, stdin=stdin, cwd=cwd)
+
+    return Runner()
+
+  @contextmanager
+  def _lease(self, jvm_options, classpath):
+    """Leases the slot to run the given jvm options and classpath in, for the duration of the block."""
+    fingerprint = self._executors[0].fingerprint_for(jvm_options, classpath)
+    start_time = time.time()
+    with self._condition:
+      slot = self._choose_slot(fingerprint)
+      while slot is None:
+        self._condition.wait()
+        slot = self._choose_slot(fingerprint)
+      shared = self._leases[slot] > 0
+      self._leases[slot] += 1
+      self._fingerprints[slot] = fingerprint
+    wait_time = time.time() - start_time
+
+    # The executor records the spawn time of its server for the thread that spawned it.
+    executor = self._executors[slot]
+    executor.last_spawn_time = None
+    logger.debug('Leased slot {} of {} for fingerprint {}'.format(slot, self, fingerprint))
+    try:
+      yield executor
+    except Exception:
+      # The executor stops its server when it fails to run via it.
+      if not executor.is_alive():
+        with self._condition:
+          self._fingerprints[slot] = None
+      raise
+    finally:
+      if self._stats:
+        self._stats.record_lease(self._identity, wait_time, executor.last_spawn_time, shared=shared)
+      with self._condition:
+        self._last_used[slot] = time.time()
+        executor.write_metadata_by_name(executor.name, self._LAST_USED_KEY,
+                                        str(self._last_used[slot]))
+        self._leases[slot] -= 1
+        if not self._leases[slot]:
+          del self._leases[slot]
+        self._enforce_memory_budget()
+        self._condition.notify_all()
+
+  def _choose_slot(self, fingerprint):
+    """Returns the slot to lease for the given fingerprint, or None if a slot must be released first.
+
+    Must be called with the condition held.
+    """
+    warm = [slot for slot, slot_fingerprint in enumerate(self._fingerprints)
+            if slot_fingerprint == fingerprint and
+            self._leases.get(slot, 0) < self._max_runs_per_server]
+    if warm:
+      # N.B. Idle slots must not be inserted into the leases, which hold only the leased slots.
+      return min(warm, key=lambda slot: self._leases.get(slot, 0))
+    idle = [slot for slot in range(len(self._executors)) if slot not in self._leases]
+    if not idle or self._fingerprints.count(fingerprint) >= self._max_servers_per_fingerprint:
+      return None
+    # Prefer a slot without a server, and otherwise replace the least recently used server.
+    return min(idle, key=lambda slot: (self._fingerprints[slot] is not None, self._last_used[slot]))
+
+  def _enforce_memory_budget(self):
+    """Stops idle servers, least recently used first, until the pool fits its memory budget.
+
+    Must be called with the condition held.
+    """
+    if not self._memory_budget:
+      return
+    usage = {slot: self._executors[slot].memory_usage()
+             for slot, fingerprint in enumerate(self._fingerprints) if fingerprint is not None}
+    total = sum(usage.values())
+    idle = sorted((slot for slot in usage if slot not in self._leases),
+                  key=lambda slot: self._last_used[slot])
+    for slot in idle:
+      if total <= self._memory_budget:
+        break
+      executor = self._executors[slot]
+      logger.debug('Stopping {} to fit {} within its memory budget'.format(executor, self))
+      executor.terminate()
+      self._fingerprints[slot] = None
+      total -= usage[slot]
+      if self._stats:
+        self._stats.record_eviction(self._identity)
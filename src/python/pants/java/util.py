@@ -15,6 +15,7 @@ from pants.base.workunit import WorkUnit, WorkUnitLabel
 from pants.java.executor import Executor, SubprocessExecutor
 from pants.java.jar.manifest import Manifest
 from pants.java.nailgun_executor import NailgunExecutor
+from pants.java.nailgun_pool import NailgunPool
 from pants.util.contextutil import open_zip, temporary_file
 from pants.util.dirutil import safe_concurrent_rename, safe_mkdir, safe_mkdtemp
 from pants.util.process_handler import ProcessHandler, SubprocessProcessHandler
@@ -146,7 +147,7 @@ def execute_runner(runner, workunit_factory=None, workunit_name=None, workunit_l
   else:
     workunit_labels = [
         WorkUnitLabel.TOOL,
-        WorkUnitLabel.NAILGUN if isinstance(runner.executor, NailgunExecutor) else WorkUnitLabel.JVM
+        WorkUnitLabel.NAILGUN if isinstance(runner.executor, (NailgunExecutor, NailgunPool)) else WorkUnitLabel.JVM
     ] + (workunit_labels or [])
 
     with workunit_factory(name=workunit_name, labels=workunit_labels,
@@ -191,7 +192,7 @@ def execute_runner_async(runner, workunit_factory=None, workunit_name=None, work
   else:
     workunit_labels = [
                         WorkUnitLabel.TOOL,
-                        WorkUnitLabel.NAILGUN if isinstance(runner.executor, NailgunExecutor) else WorkUnitLabel.JVM
+                        WorkUnitLabel.NAILGUN if isinstance(runner.executor, (NailgunExecutor, NailgunPool)) else WorkUnitLabel.JVM
                       ] + (workunit_labels or [])
 
     workunit_generator = workunit_factory(name=workunit_name, labels=workunit_labels,
@@ -307,6 +307,14 @@ class GlobalOptionsRegistrar(SubsystemClientMixin, Optionable):
     register('--pantsd-pailgun-quit-timeout', advanced=True, type=float, default=5.0,
              help='The length of time (in seconds) to wait for further output after sending a '
                   'signal to the remote pantsd process before killing it.')
+    register('--pantsd-concurrent-goals', advanced=True, type=list,
+             default=['dependees', 'filedeps', 'list', 'path', 'paths'],
+             help='Runs of only these (read-only) goals are forked by pantsd, and so may run '
+                  'concurrently with one another. All other runs wait for exclusive access.')
+    register('--pantsd-timeout-when-multiple-invocations', advanced=True, type=float, default=60.0,
+             daemon=False,
+             help='The length of time (in seconds) to wait for another pantsd run to complete '
+                  'before giving up. A negative value waits for as long as it takes.')
     register('--pantsd-log-dir', advanced=True, default=None,
              help='The directory to log pantsd output to.')
     register('--pantsd-invalidation-globs', advanced=True, type=list, default=[],
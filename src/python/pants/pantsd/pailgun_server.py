@@ -4,10 +4,14 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import errno
 import logging
+import os
 import socket
 import threading
+import time
 import traceback
+from contextlib import contextmanager
 
 from six.moves.socketserver import BaseRequestHandler, BaseServer, TCPServer, ThreadingMixIn
 
@@ -58,6 +62,37 @@ class PailgunHandler(PailgunHandlerBase):
     """Execute a given run with a pants runner."""
     self.server.runner_factory(sock, arguments, environment).run()
 
+  def _run_pants_in_fork(self, sock, arguments, environment):
+    """Execute a given run with a pants runner in a forked process, and wait for it to complete.
+
+    The fork isolates the stdio, environment and subsystems of the run from those of any other
+    runs executing at the same time.
+    """
+    pid = self.server.fork_context(os.fork)
+    if pid == 0:
+      exit_code = 0
+      try:
+        # The client signals the process group of the run, which must not be that of the daemon.
+        os.setpgrp()
+        self.server.socket.close()
+        self._run_pants(sock, arguments, environment)
+      except BaseException as e:
+        exit_code = 1
+        try:
+          self.handle_error(e)
+        except Exception:
+          self.logger.exception('failed to report an error to the client of a forked run')
+      finally:
+        os._exit(exit_code)
+
+    while True:
+      try:
+        os.waitpid(pid, 0)
+        break
+      except OSError as e:
+        if e.errno != errno.EINTR:
+          raise
+
   def handle(self):
     """Request handler for a single Pailgun request."""
     # Parse the Nailgun request portion.
@@ -74,9 +109,23 @@ class PailgunHandler(PailgunHandlerBase):
     self.logger.info('handling pailgun request: `{}`'.format(' '.join(arguments)))
     self.logger.debug('pailgun request environment: %s', environment)
 
-    # Execute the requested command with optional daemon-side profiling.
-    with maybe_profiled(environment.get('PANTSD_PROFILE')):
-      self._run_pants(self.request, arguments, environment)
+    # Runs in the daemon's own process share its stdio, environment and subsystems, and so take
+    # turns. Runs of read-only goals that would otherwise wait are forked instead, and may share
+    # their turn with one another.
+    concurrent = self.server.runs_concurrently(arguments[1:])
+    timeout = float(environment.pop('PANTSD_REQUEST_TIMEOUT_LIMIT', -1))
+    try:
+      with self.server.admitted_run(self.request, concurrent, timeout) as (queue_time, forked):
+        environment['PANTSD_RUNTRACKER_QUEUE_TIME'] = str(queue_time)
+        # Execute the requested command with optional daemon-side profiling.
+        with maybe_profiled(environment.get('PANTSD_PROFILE')):
+          if forked:
+            self._run_pants_in_fork(self.request, arguments, environment)
+          else:
+            self._run_pants(self.request, arguments, environment)
+    except PailgunServer.RunNotAdmitted as e:
+      self.logger.warning('pailgun request not run: `{}`: {}'.format(' '.join(arguments), e))
+      return
 
     # NB: This represents the end of pantsd's involvement in the request, but the request will
     # continue to run post-fork.
@@ -97,12 +146,18 @@ class PailgunServer(ThreadingMixIn, TCPServer):
   `process_request_thread`, which we override.
   """
 
+  class RunNotAdmitted(Exception):
+    """Indicates that a run did not start before its client disconnected or its timeout elapsed."""
+
   timeout = 0.05
+  # The interval (in seconds) at which a waiting run checks whether its client has disconnected.
+  admission_poll_interval = 0.1
   # Override the ThreadingMixIn default, to minimize the chances of zombie pailgun processes.
   daemon_threads = True
 
   def __init__(self, server_address, runner_factory, lifecycle_lock, request_complete_callback,
-               handler_class=None, bind_and_activate=True):
+               handler_class=None, bind_and_activate=True, fork_context=None,
+               concurrent_goals=()):
     """Override of TCPServer.__init__().
 
     N.B. the majority of this function is copied verbatim from TCPServer.__init__().
@@ -117,6 +172,11 @@ class PailgunServer(ThreadingMixIn, TCPServer):
     :param class handler_class: The request handler class to use for each request. (Optional)
     :param bool bind_and_activate: If True, binds and activates networking at __init__ time.
                                    (Optional)
+    :param function fork_context: A function which accepts and calls a function that will call
+                                  fork. Runs are only forked (and so only run concurrently) if
+                                  this is passed. (Optional)
+    :param iterable concurrent_goals: The goals whose runs may be forked to run concurrently with
+                                      one another. (Optional)
     """
     # Old-style class, so we must invoke __init__() this way.
     BaseServer.__init__(self, server_address, handler_class or PailgunHandler)
@@ -126,6 +186,9 @@ class PailgunServer(ThreadingMixIn, TCPServer):
     self.allow_reuse_address = True           # Allow quick reuse of TCP_WAIT sockets.
     self.server_port = None                   # Set during server_bind() once the port is bound.
     self.request_complete_callback = request_complete_callback
+    self.fork_context = fork_context
+    self.concurrent_goals = frozenset(concurrent_goals)
+    self._run_lock = _RunLock()
 
     if bind_and_activate:
       try:
@@ -178,6 +241,78 @@ class PailgunServer(ThreadingMixIn, TCPServer):
     with self.lifecycle_lock():
       self._handle_request_noblock()
 
+  def runs_concurrently(self, arguments):
+    """Returns True if a run of the given arguments may be forked to run concurrently.
+
+    Runs are classified conservatively by their raw arguments: any word that might be a goal must
+    be one of the `concurrent_goals`, and passthrough arguments or `--loop` make a run exclusive.
+
+    :param list arguments: The arguments of the run, without the leading command.
+    """
+    if not self.fork_context or not self.concurrent_goals:
+      return False
+    if '--' in arguments or any(arg.startswith('--loop') for arg in arguments):
+      return False
+    goals = [arg for arg in arguments
+             if not arg.startswith('-') and not any(c in arg for c in '/:.')]
+    return bool(goals) and all(goal in self.concurrent_goals for goal in goals)
+
+  @staticmethod
+  def _client_disconnected(request):
+    """Returns True if the client of the given request socket has closed its end of it."""
+    readable, _, errored = safe_select([request], [], [request], 0)
+    if errored:
+      return True
+    if not readable:
+      return False
+    try:
+      return not request.recv(1, socket.MSG_PEEK)
+    except socket.error:
+      return True
+
+  @contextmanager
+  def admitted_run(self, request, concurrent, timeout):
+    """Waits for a turn to run, telling the client when it has to wait.
+
+    Any run that finds no other run executing takes a turn of its own, so that it may execute in
+    the daemon process (where its graph work outlives it). A concurrent run that finds others
+    executing instead shares a turn with any other concurrent runs, and should be forked. N.B.
+    This is distinct from the lifecycle lock, which guards only the accepting of requests.
+
+    :param socket request: The inbound request socket of the run.
+    :param bool concurrent: True if the run may share its turn with other concurrent runs.
+    :param float timeout: The number of seconds to wait for a turn, or a negative number to wait
+                          for as long as the client remains connected.
+    :raises: `PailgunServer.RunNotAdmitted` if the client disconnected or the timeout elapsed first.
+    :returns: A context in which the run executes, yielding a tuple of the seconds it waited for
+              and whether it shares its turn (and so should be forked).
+    """
+    def check_connected():
+      if self._client_disconnected(request):
+        raise self.RunNotAdmitted('the client disconnected while waiting to run')
+
+    start = time.time()
+    shared = False
+    if not self._run_lock.acquire(False, timeout=0):
+      shared = concurrent
+      if not (shared and self._run_lock.acquire(True, timeout=0)):
+        NailgunProtocol.send_stderr(
+          request, 'Another pants invocation is running: waiting for it to complete.\n')
+        if not self._run_lock.acquire(shared,
+                                      timeout=None if timeout < 0 else timeout,
+                                      check=check_connected,
+                                      check_interval=self.admission_poll_interval):
+          NailgunProtocol.send_stderr(
+            request,
+            'Timed out after {} seconds waiting for another pants invocation to complete.\n'
+            .format(timeout))
+          NailgunProtocol.send_exit_with_code(request, 1)
+          raise self.RunNotAdmitted('timed out after {} seconds waiting to run'.format(timeout))
+    try:
+      yield time.time() - start, shared
+    finally:
+      self._run_lock.release(shared)
+
   def process_request_thread(self, request, client_address):
     """Override of ThreadingMixIn.process_request_thread() that delegates to the request handler."""
     # Instantiate the request handler.
@@ -201,3 +336,66 @@ class PailgunServer(ThreadingMixIn, TCPServer):
       # child half of this will perform an os._exit() before it gets to this point and is also
       # responsible for shutdown and closing of the socket when its execution is complete.
       self.close_request(request)
+
+
+class _RunLock(object):
+  """A lock held either by any number of shared holders, or by a single exclusive holder.
+
+  Waiting exclusive holders take precedence over new shared holders, so that a stream of shared
+  holders cannot starve them.
+  """
+
+  def __init__(self):
+    self._condition = threading.Condition(threading.Lock())
+    self._shared_holders = 0
+    self._exclusive_held = False
+    self._exclusive_waiters = 0
+
+  def _available(self, shared):
+    if self._exclusive_held:
+      return False
+    return self._exclusive_waiters == 0 if shared else self._shared_holders == 0
+
+  def acquire(self, shared, timeout=None, check=None, check_interval=None):
+    """Acquires the lock, and returns True if it did so before the given timeout elapsed.
+
+    :param bool shared: True to acquire a shared hold, or False to acquire an exclusive one.
+    :param float timeout: The number of seconds to wait for, or None to wait indefinitely.
+    :param function check: A function called at least every `check_interval` seconds while
+                           waiting, which may raise to abandon the wait. (Optional)
+    :param float check_interval: The maximum number of seconds between calls to `check`.
+    """
+    deadline = None if timeout is None else time.time() + timeout
+    with self._condition:
+      if not shared:
+        self._exclusive_waiters += 1
+      try:
+        while not self._available(shared):
+          wait = check_interval if check else None
+          if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+              return False
+            wait = remaining if wait is None else min(wait, remaining)
+          self._condition.wait(wait)
+          if check and not self._available(shared):
+            check()
+        if shared:
+          self._shared_holders += 1
+        else:
+          self._exclusive_held = True
+        return True
+      finally:
+        if not shared:
+          self._exclusive_waiters -= 1
+          # Shared waiters held back by this waiter may now proceed.
+          self._condition.notify_all()
+
+  def release(self, shared):
+    """Releases a hold on the lock acquired with the same value of `shared`."""
+    with self._condition:
+      if shared:
+        self._shared_holders -= 1
+      else:
+        self._exclusive_held = False
+      self._condition.notify_all()
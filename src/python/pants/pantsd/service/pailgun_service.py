@@ -15,7 +15,8 @@ from pants.pantsd.service.pants_service import PantsService
 class PailgunService(PantsService):
   """A service that runs the Pailgun server."""
 
-  def __init__(self, bind_addr, runner_class, scheduler_service, shutdown_after_run):
+  def __init__(self, bind_addr, runner_class, scheduler_service, shutdown_after_run,
+               concurrent_goals=()):
     """
     :param tuple bind_addr: The (hostname, port) tuple to bind the Pailgun server to.
     :param class runner_class: The `PantsRunner` class to be used for Pailgun runs. Generally this
@@ -24,6 +25,8 @@ class PailgunService(PantsService):
     :param SchedulerService scheduler_service: The SchedulerService instance for access to the
                                                resident scheduler.
     :param bool shutdown_after_run: PailgunService should shut down after running the first request.
+    :param iterable concurrent_goals: The goals whose runs are forked to run concurrently with one
+                                      another.
     """
     super(PailgunService, self).__init__()
     self._bind_addr = bind_addr
@@ -33,6 +36,7 @@ class PailgunService(PantsService):
     self._logger = logging.getLogger(__name__)
     self._pailgun = None
     self._shutdown_after_run = shutdown_after_run if shutdown_after_run else False
+    self._concurrent_goals = concurrent_goals
 
   @property
   def pailgun(self):
@@ -68,7 +72,31 @@ class PailgunService(PantsService):
       with self.services.lifecycle_lock:
         yield
 
-    return PailgunServer(self._bind_addr, runner_factory, lifecycle_lock, self._request_complete_callback)
+    # Forks a run from the daemon: the other services are paused around the fork so that none of
+    # their threads hold locks that the child would need. This service is not paused, because its
+    # request loop may be waiting for the lifecycle lock that is held here.
+    def fork_context(fork):
+      self._scheduler_service.maybe_await_initial_watchman_event()
+      with self.services.lifecycle_lock:
+        services = [service for service in self.services.services if service is not self]
+        for service in services:
+          service.mark_pausing()
+        for service in services:
+          service.await_paused()
+        pid = None
+        try:
+          pid = self._scheduler_service.with_fork_context(fork)
+          return pid
+        finally:
+          for service in services:
+            if pid == 0:
+              service.terminate()
+            else:
+              service.resume()
+
+    return PailgunServer(self._bind_addr, runner_factory, lifecycle_lock,
+                         self._request_complete_callback, fork_context=fork_context,
+                         concurrent_goals=self._concurrent_goals)
 
   def run(self):
     """Main service entrypoint. Called via Thread.start() via PantsDaemon.run()."""
@@ -168,17 +168,29 @@ class SchedulerService(PantsService):
     """
     return self._scheduler.graph_len()
 
-  def prefork(self, options, options_bootstrapper):
-    """Runs all pre-fork logic in the process context of the daemon.
+  def maybe_await_initial_watchman_event(self):
+    """Waits for the initial watchman event if any nodes exist in the product graph.
 
-    :returns: `(LegacyGraphSession, TargetRoots, exit_code)`
+    This avoids racing watchman startup vs invalidation events.
     """
-    # If any nodes exist in the product graph, wait for the initial watchman event to avoid
-    # racing watchman startup vs invalidation events.
     graph_len = self._scheduler.graph_len()
     if graph_len > 0:
       self._logger.debug('graph len was {}, waiting for initial watchman event'.format(graph_len))
       self._watchman_is_running.wait()
+
+  def with_fork_context(self, func):
+    """Calls the given function, which forks, in the fork context of the captive scheduler.
+
+    The caller is responsible for pausing this service (and any others) around the call.
+    """
+    return self._scheduler.with_fork_context(func)
+
+  def prefork(self, options, options_bootstrapper):
+    """Runs all pre-fork logic in the process context of the daemon.
+
+    :returns: `(LegacyGraphSession, TargetRoots, exit_code)`
+    """
+    self.maybe_await_initial_watchman_event()
     v2_ui = options.for_global_scope().v2_ui
     session = self._graph_helper.new_session(v2_ui)
 
@@ -122,6 +122,10 @@ class ZipkinReporter(Reporter):
     """Implementation of Reporter callback."""
     if workunit in self._workunits_to_spans:
       span = self._workunits_to_spans.pop(workunit)
+      if workunit.parent is None:
+        # Summarize the artifact cache activity of the run on its root spans.
+        telemetry = self.run_tracker.artifact_cache_stats.telemetry
+        span.update_binary_annotations(telemetry.get_annotations())
       span.stop()
 
   def close(self):
@@ -0,0 +1,114 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import heapq
+import logging
+import os
+import re
+import xml.etree.ElementTree as ET
+from builtins import object, range
+from collections import defaultdict
+
+from pants.util.json_store import MovingAverages
+
+
+logger = logging.getLogger(__name__)
+
+
+def balance(items, nbins, weight, capacity=None):
+  """Distributes the given items across bins so that the total weights of the bins are even.
+
+  Items are placed heaviest first, each in the bin with the least total weight so far (the longest
+  processing time first rule), which is deterministic for a given sequence of items and weights.
+
+  :param list items: The items to distribute.
+  :param int nbins: The number of bins to distribute them across.
+  :param weight: A function returning the (non-negative) weight of an item.
+  :param int capacity: The maximum number of items per bin, or None for no limit. There must be room
+                       for all the items.
+  :returns: A list of `nbins` lists of items, each in the order the items were given in.
+  :rtype: list
+  """
+  if capacity == 1:
+    # Each item is alone in its bin: there is nothing to balance.
+    return [[item] for item in items] + [[] for _ in range(nbins - len(items))]
+
+  weights = [weight(item) for item in items]
+  bins = [[] for _ in range(nbins)]
+  # A heap of the (total weight, index) of each bin with room for more items.
+  open_bins = [(0.0, b) for b in range(nbins)]
+  for index in sorted(range(len(items)), key=lambda i: (-weights[i], i)):
+    load, chosen = heapq.heappop(open_bins)
+    bins[chosen].append(index)
+    if capacity is None or len(bins[chosen]) < capacity:
+      heapq.heappush(open_bins, (load + weights[index], chosen))
+  return [[items[index] for index in sorted(indexes)] for indexes in bins]
+
+
+class DurationHistory(object):
+  """The recorded durations of tests, persisted across runs to balance shards and batches by.
+
+  Durations are parsed from the junit xml reports of test runs, and each is recorded as a moving
+  average of its measurements. Unrecorded tests are estimated to take the mean recorded duration,
+  so that new tests are spread out evenly.
+  """
+
+  _XML_MATCHER = re.compile(r'^TEST-.+\.xml$')
+
+  def __init__(self, path):
+    """
+    :param str path: The file the history is stored in.
+    """
+    self._durations = MovingAverages(path)
+
+  @property
+  def durations(self):
+    """Returns a copy of the recorded durations in seconds by key.
+
+    :rtype: dict
+    """
+    return self._durations.averages()
+
+  def record(self, key, secs):
+    """Records a measured duration of the given test."""
+    self._durations.record(key, secs)
+
+  def record_junit_xml(self, xml_path, key):
+    """Records the durations of the testcases in the given junit xml report(s).
+
+    The durations of all the testcases with the same key are summed.
+
+    :param str xml_path: A junit xml file, or a directory of `TEST-*.xml` junit xml files.
+    :param key: A function from the attributes of a testcase element to its key, or None to skip it.
+    """
+    if os.path.isdir(xml_path):
+      xml_paths = [os.path.join(xml_path, name) for name in sorted(os.listdir(xml_path))
+                   if self._XML_MATCHER.match(name)]
+    else:
+      xml_paths = [xml_path]
+
+    durations = defaultdict(float)
+    for path in xml_paths:
+      try:
+        for testcase in ET.parse(path).getroot().iter('testcase'):
+          testcase_key = key(testcase.attrib)
+          if testcase_key is not None:
+            durations[testcase_key] += float(testcase.attrib.get('time') or 0)
+      except (ET.ParseError, ValueError, IOError, OSError) as e:
+        # Durations are only used to balance later runs: the error is reported by the test runner.
+        logger.debug('Not recording the durations in {}: {}'.format(path, e))
+    for testcase_key, secs in durations.items():
+      self.record(testcase_key, secs)
+
+  def estimate(self, key):
+    """Returns the estimated duration of the given test in seconds."""
+    secs = self._durations.get(key)
+    if secs is not None:
+      return secs
+    return self._durations.ratio(default=1.0)
+
+  def save(self):
+    self._durations.save()
@@ -515,14 +515,17 @@ class TaskBase(SubsystemClientMixin, Optionable, AbstractClass):
                                              invalidation_report=self.context.invalidation_report,
                                              task_name=self._task_name,
                                              task_version_slug=self.implementation_version_slug(),
-                                             artifact_write_callback=self.maybe_write_artifact)
+                                             artifact_write_callback=self.maybe_write_artifact,
+                                             workunit_factory=self.context.new_workunit)
 
     # If this Task's execution has been forced, invalidate all our target fingerprints.
     if self._cache_factory.ignore and not self._force_invalidated:
       self.invalidate()
       self._force_invalidated = True
 
-    return cache_manager.check(targets, topological_order=topological_order)
+    # Under its own workunit, so that the time spent fingerprinting is reported for each task.
+    with self.context.new_workunit('fingerprint'):
+      return cache_manager.check(targets, topological_order=topological_order)
 
   def maybe_write_artifact(self, vt):
     if self._should_cache_target_dir(vt):
@@ -588,9 +591,13 @@ class TaskBase(SubsystemClientMixin, Optionable, AbstractClass):
       return [], [], []
 
     read_cache = self._cache_factory.get_read_cache()
+    # Check for all of the keys in one batch first, so that misses (which dominate cold builds)
+    # don't each cost a serial round trip to the cache.
+    present = read_cache.has_many([vt.cache_key for vt in vts])
     items = [(read_cache, vt.cache_key, vt.current_results_dir if self.cache_target_dirs else None)
-             for vt in vts]
-    res = self.context.subproc_map(call_use_cached_files, items)
+             for vt, is_present in zip(vts, present) if is_present]
+    present_res = iter(self.context.subproc_map(call_use_cached_files, items))
+    res = [next(present_res) if is_present else False for is_present in present]
 
     cached_vts = []
     uncached_vts = []
@@ -624,8 +631,17 @@ class TaskBase(SubsystemClientMixin, Optionable, AbstractClass):
     """
     update_artifact_cache_work = self._get_update_artifact_cache_work(vts_artifactfiles_pairs)
     if update_artifact_cache_work:
-      self.context.submit_background_work_chain([update_artifact_cache_work],
+      # Once the artifacts are in, bring the cache back within its bounds, if it has any.
+      evict_work = Work(lambda cache: cache.evict(),
+                        [(self._cache_factory.get_write_cache(),)],
+                        'evict')
+      self.context.submit_background_work_chain([update_artifact_cache_work, evict_work],
                                                 parent_workunit_name='cache')
+      # Upload any artifacts that the write cache queued, once the run's background work is done.
+      run_tracker = self.context.run_tracker
+      self._cache_factory.register_upload_queue_drainer(run_tracker.background_worker_pool(),
+                                                        run_tracker.artifact_cache_stats,
+                                                        self._task_name)
 
   def _get_update_artifact_cache_work(self, vts_artifactfiles_pairs):
     """Create a Work instance to update an artifact cache, if we're configured to.
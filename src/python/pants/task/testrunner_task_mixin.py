@@ -8,15 +8,20 @@ import functools
 import os
 import re
 import shutil
+import threading
 import xml.etree.ElementTree as ET
 from abc import abstractmethod
 from builtins import filter, next, object, str
+from collections import OrderedDict
 from contextlib import contextmanager
 
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import ErrorWhileTesting, TaskError
+from pants.base.worker_pool import Work, WorkerPool
 from pants.build_graph.files import Files
 from pants.invalidation.cache_manager import VersionedTargetSet
+from pants.option.custom_types import file_option
+from pants.task.duration_history import DurationHistory, balance
 from pants.task.task import Task
 from pants.util.contextutil import temporary_dir
 from pants.util.dirutil import safe_mkdir, safe_mkdir_for
@@ -415,6 +420,16 @@ class PartitionedTestRunnerTaskMixin(TestRunnerTaskMixin, Task):
              help='Run tests in a chroot. Any loose files tests depend on via `{}` dependencies '
                   'will be copied to the chroot.'
              .format(Files.alias()))
+    register('--parallelism', advanced=True, type=int, default=1,
+             help='The number of partitions to run tests for concurrently. With `--no-fast`, each '
+                  'test target is a partition. If a partition fails under `--fail-fast`, partitions '
+                  'that have not started yet are not run.')
+    register('--duration-history', advanced=True, type=file_option, default=None,
+             fingerprint=True,
+             help='A json file of test durations, as recorded to durations.json under the workdir '
+                  'of this task by earlier runs. If set, shards of `--test-shard` (and batches, '
+                  'where supported) are balanced by these durations, so that they take about the '
+                  'same time. Otherwise tests are assigned to shards by their position.')
 
   @staticmethod
   def _vts_for_partition(invalidation_check):
@@ -437,6 +452,50 @@ class PartitionedTestRunnerTaskMixin(TestRunnerTaskMixin, Task):
     """
     return self.get_options().chroot
 
+  @property
+  def partition_parallelism(self):
+    """Return the number of partitions to run tests for concurrently.
+
+    Mixees whose partitions share process-wide state while they run, such as the working directory
+    or the environment of pants itself, should return 1 when they do.
+
+    :rtype: int
+    """
+    return max(1, self.get_options().parallelism)
+
+  @memoized_property
+  def duration_history(self):
+    """Return the test durations to balance shards and batches by, if any.
+
+    :rtype: :class:`pants.task.duration_history.DurationHistory`
+    """
+    path = self.get_options().duration_history
+    return DurationHistory(path) if path else None
+
+  @memoized_property
+  def _recorded_durations(self):
+    return DurationHistory(os.path.join(self.workdir, 'durations.json'))
+
+  def record_test_durations(self, xml_path, key):
+    """Record the durations of the tests in the given junit xml report(s) for later runs.
+
+    See :meth:`pants.task.duration_history.DurationHistory.record_junit_xml`.
+    """
+    self._recorded_durations.record_junit_xml(xml_path, key)
+
+  def balance_by_duration(self, items, nbins, key, capacity=None):
+    """Distribute the given items across bins whose total recorded durations are even.
+
+    :param list items: The items to distribute.
+    :param int nbins: The number of bins to distribute them across.
+    :param key: A function from an item to its key in the `duration_history`.
+    :param int capacity: The maximum number of items per bin, or None for no limit.
+    :returns: A list of `nbins` lists of items.
+    :rtype: list
+    """
+    history = self.duration_history
+    return balance(items, nbins, lambda item: history.estimate(key(item)), capacity=capacity)
+
   @staticmethod
   def _copy_files(dest_dir, target):
     if isinstance(target, Files):
@@ -470,20 +529,14 @@ class PartitionedTestRunnerTaskMixin(TestRunnerTaskMixin, Task):
     per_target = not self.get_options().fast
     fail_fast = self.get_options().fail_fast
 
-    results = {}
-    failure = False
     with self.partitions(per_target, all_targets, test_targets) as partitions:
-      for (partition, args) in partitions():
-        try:
-          rv = self._run_partition(fail_fast, partition, *args)
-        except ErrorWhileTesting as e:
-          rv = self.result_class.from_error(e)
-
-        results[partition] = rv
-        if not rv.success:
-          failure = True
-          if fail_fast:
-            break
+      # Partitions may run concurrently: they all record to the same history.
+      recorded_durations = self._recorded_durations
+      try:
+        results = self._run_partitions(fail_fast, list(partitions()))
+      finally:
+        recorded_durations.save()
+      failure = any(not rv.success for rv in results.values())
 
       for partition in sorted(results):
         rv = results[partition]
@@ -511,6 +564,49 @@ class PartitionedTestRunnerTaskMixin(TestRunnerTaskMixin, Task):
         # A low-level test execution failure occurred before tests were run.
         raise TaskError()
 
+  def _run_partitions(self, fail_fast, partitions_and_args):
+    """Runs the given partitions, up to `partition_parallelism` of them at once.
+
+    :param bool fail_fast: Whether to stop running partitions once one fails: partitions that are
+                           already running still complete.
+    :param list partitions_and_args: The (partition, args) pair of each partition.
+    :returns: The result of each partition that ran, in the given order.
+    :rtype: :class:`collections.OrderedDict`
+    """
+    results = {}
+    failed = threading.Event()
+    errored = threading.Event()
+
+    def run_partition(partition, args):
+      if errored.is_set() or (fail_fast and failed.is_set()):
+        return
+      try:
+        rv = self._run_partition(fail_fast, partition, *args)
+      except ErrorWhileTesting as e:
+        rv = self.result_class.from_error(e)
+      except Exception:
+        # Don't start any more partitions: the error fails the run.
+        errored.set()
+        raise
+      results[partition] = rv
+      if not rv.success:
+        failed.set()
+
+    parallelism = min(self.partition_parallelism, len(partitions_and_args))
+    if parallelism <= 1:
+      for partition, args in partitions_and_args:
+        run_partition(partition, args)
+    else:
+      with self.context.new_workunit('partitions') as workunit:
+        worker_pool = WorkerPool(workunit, self.context.run_tracker, parallelism)
+        try:
+          worker_pool.submit_work_and_wait(Work(run_partition, partitions_and_args))
+        finally:
+          worker_pool.shutdown()
+
+    return OrderedDict((partition, results[partition])
+                       for partition, _ in partitions_and_args if partition in results)
+
   # Some notes on invalidation vs caching as used in `run_partition` below. Here invalidation
   # refers to executing task work in `Task.invalidated` blocks against invalid targets. Caching
   # refers to storing the results of that work in the artifact cache using
@@ -0,0 +1,122 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import logging
+import numbers
+import os
+import threading
+import uuid
+from builtins import object, open
+
+from future.utils import PY3
+
+from pants.util.dirutil import safe_mkdir_for
+
+
+logger = logging.getLogger(__name__)
+
+
+def load_json(path):
+  """Returns the json value stored in the given file, or None if it is missing or corrupt."""
+  try:
+    with open(path, 'r') as fp:
+      return json.load(fp)
+  except (IOError, OSError):
+    return None
+  except ValueError as e:
+    logger.debug('Ignoring corrupt json file {}: {}'.format(path, e))
+    return None
+
+
+def dump_json(value, path):
+  """Stores the given json value in the given file.
+
+  Concurrent processes may each store to the same file: the last one wins, but never leaves a
+  partial file.
+  """
+  safe_mkdir_for(path)
+  tmp = '{}.tmp-{}'.format(path, uuid.uuid4().hex)
+  with open(tmp, 'w' if PY3 else 'wb') as fp:
+    json.dump(value, fp, sort_keys=True)
+  os.rename(tmp, path)
+
+
+class MovingAverages(object):
+  """Exponentially weighted moving averages of measurements by key, persisted in a json file.
+
+  Each key also has a weight: the latest recorded size of whatever was measured. The totals of the
+  averages and of the weights are maintained as measurements are recorded, so that their ratio (eg:
+  the mean, for unit weights) is available in constant time.
+  """
+
+  # The weight of the latest measurement in the moving average of a key's measurements.
+  DECAY = 0.5
+
+  def __init__(self, path):
+    """
+    :param str path: The file the averages are stored in.
+    """
+    self._path = path
+    self._lock = threading.Lock()
+    self._entries = self._load(path)
+    self._total_value = sum(value for value, _ in self._entries.values())
+    self._total_weight = sum(weight for _, weight in self._entries.values())
+
+  @staticmethod
+  def _load(path):
+    entries = load_json(path)
+    if entries is None:
+      return {}
+    if not (isinstance(entries, dict) and
+            all(isinstance(entry, list) and len(entry) == 2 and
+                all(isinstance(n, numbers.Number) for n in entry)
+                for entry in entries.values())):
+      logger.debug('Ignoring moving averages in an unrecognized format in {}'.format(path))
+      return {}
+    return {key: tuple(entry) for key, entry in entries.items()}
+
+  def get(self, key):
+    """Returns the moving average of the given key, or None if it has no measurements."""
+    with self._lock:
+      entry = self._entries.get(key)
+      return None if entry is None else entry[0]
+
+  def averages(self):
+    """Returns a copy of the moving averages by key.
+
+    :rtype: dict
+    """
+    with self._lock:
+      return {key: value for key, (value, _) in self._entries.items()}
+
+  def ratio(self, default):
+    """Returns the total of the averages divided by the total of the weights.
+
+    :param default: The value to return if there are no measurements of a non-zero weight.
+    """
+    with self._lock:
+      if self._total_weight <= 0:
+        return default
+      return self._total_value / self._total_weight
+
+  def record(self, key, value, weight=1):
+    """Records a measurement of the given key, whose size is now the given weight."""
+    with self._lock:
+      previous = self._entries.get(key)
+      if previous is not None:
+        previous_value, previous_weight = previous
+        value = self.DECAY * value + (1 - self.DECAY) * previous_value
+        self._total_value -= previous_value
+        self._total_weight -= previous_weight
+      self._entries[key] = (value, weight)
+      self._total_value += value
+      self._total_weight += weight
+
+  def save(self):
+    with self._lock:
+      entries = {key: list(entry) for key, entry in self._entries.items()}
+    dump_json(entries, self._path)
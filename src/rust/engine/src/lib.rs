@@ -490,7 +490,7 @@ pub extern "C" fn decompress_tarball(
       .into_owned(),
   );
 
-  tar_api::decompress_tgz(tar_path_str.as_path(), output_dir_str.as_path())
+  tar_api::decompress_tarball(tar_path_str.as_path(), output_dir_str.as_path())
     .map_err(|e| {
       format!(
         "Failed to untar {:?} to {:?}:\n{:?}",
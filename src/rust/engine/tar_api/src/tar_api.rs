@@ -28,20 +28,36 @@
 
 use flate2::read::GzDecoder;
 use std::fs::File;
+use std::io::{Read, Seek, SeekFrom};
 use std::path::Path;
 use tar::Archive;
 
-pub fn decompress_tgz(tar_path: &Path, output_dir: &Path) -> Result<(), std::io::Error> {
-  let tar_gz = File::open(tar_path)?;
-  let tar = GzDecoder::new(tar_gz);
-  let mut archive = Archive::new(tar);
-  archive.unpack(output_dir)?;
-  Ok(())
+const GZIP_MAGIC: [u8; 2] = [0x1f, 0x8b];
+
+///
+/// Unpacks the tarball at `tar_path` into `output_dir`.
+///
+/// The tarball may either be gzipped or uncompressed: which one is detected from its leading bytes.
+///
+pub fn decompress_tarball(tar_path: &Path, output_dir: &Path) -> Result<(), std::io::Error> {
+  let mut tarball = File::open(tar_path)?;
+  let mut magic = [0; 2];
+  let is_gzipped = match tarball.read_exact(&mut magic) {
+    Ok(()) => magic == GZIP_MAGIC,
+    Err(ref e) if e.kind() == std::io::ErrorKind::UnexpectedEof => false,
+    Err(e) => return Err(e),
+  };
+  tarball.seek(SeekFrom::Start(0))?;
+  if is_gzipped {
+    Archive::new(GzDecoder::new(tarball)).unpack(output_dir)
+  } else {
+    Archive::new(tarball).unpack(output_dir)
+  }
 }
 
 #[cfg(test)]
 pub mod tar_tests {
-  use super::decompress_tgz;
+  use super::decompress_tarball;
   use flate2::write::GzEncoder;
   use flate2::Compression;
   use std::fs::File;
@@ -69,7 +85,35 @@ pub mod tar_tests {
 
     // uncompress the tgz then make sure the content is good.
     let tmp_dest_dir = tempfile::TempDir::new().unwrap();
-    decompress_tgz(&tgz_path.as_path(), &tmp_dest_dir.path()).expect("Error decompressing.");
+    decompress_tarball(&tgz_path.as_path(), &tmp_dest_dir.path()).expect("Error decompressing.");
+    let expected_txt_path = std::fs::canonicalize(tmp_dest_dir.path())
+      .unwrap()
+      .join(&path_in_tar);
+    assert!(expected_txt_path.exists());
+    assert_eq!(content, contents(&expected_txt_path))
+  }
+
+  #[test]
+  fn decompress_uncompressed_tar_file() {
+    let tmp_dir = TempDir::new().unwrap();
+    let content = "hello world".as_bytes().to_vec();
+    let txt_full_path = std::fs::canonicalize(tmp_dir.path())
+      .unwrap()
+      .join(&"hello.txt");
+    make_file(&txt_full_path, &content, 0o600);
+
+    let path_in_tar = "a/b/c/d.txt";
+    let tar_path = std::fs::canonicalize(tmp_dir.path())
+      .unwrap()
+      .join(&"simple.tar");
+    let mut tar = tar::Builder::new(File::create(&tar_path).unwrap());
+    tar
+      .append_file(path_in_tar, &mut File::open(&txt_full_path).unwrap())
+      .expect("Error archiving.");
+    tar.into_inner().expect("Error archiving.");
+
+    let tmp_dest_dir = tempfile::TempDir::new().unwrap();
+    decompress_tarball(&tar_path.as_path(), &tmp_dest_dir.path()).expect("Error decompressing.");
     let expected_txt_path = std::fs::canonicalize(tmp_dest_dir.path())
       .unwrap()
       .join(&path_in_tar);
@@ -79,7 +123,7 @@ pub mod tar_tests {
 
   #[test]
   fn decompress_invalid_tar_file_path() {
-    let result = decompress_tgz(&PathBuf::from("invalid_tar_path"), &PathBuf::from("a_dir"));
+    let result = decompress_tarball(&PathBuf::from("invalid_tar_path"), &PathBuf::from("a_dir"));
     assert!(result.is_err())
   }
 
@@ -92,7 +136,7 @@ pub mod tar_tests {
       .unwrap()
       .join(&tar_filename);
     make_file(&tar_path, &content, 0o600);
-    let result = decompress_tgz(&tar_path, &PathBuf::from("a_dir"));
+    let result = decompress_tarball(&tar_path, &PathBuf::from("a_dir"));
     assert!(result.is_err())
   }
 
@@ -0,0 +1,56 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import unittest
+
+from pants.backend.jvm.tasks.jvm_compile.compile_history import CompileHistory
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump
+
+
+class CompileHistoryTest(unittest.TestCase):
+
+  def test_estimates_without_history_are_sizes(self):
+    with temporary_dir() as tmpdir:
+      history = CompileHistory(os.path.join(tmpdir, 'history.json'))
+      self.assertEqual(100, history.estimate('compile(a:a)', 100))
+
+  def test_estimates_unmeasured_compiles_from_measured_ones(self):
+    with temporary_dir() as tmpdir:
+      history = CompileHistory(os.path.join(tmpdir, 'history.json'))
+      history.record('compile(a:a)', 10, 100)
+      history.record('compile(b:b)', 30, 100)
+      self.assertEqual(10, history.estimate('compile(a:a)', 1000))
+      self.assertEqual(0.2 * 50, history.estimate('compile(c:c)', 50))
+
+  def test_estimates_unmeasured_compiles_from_latest_measurements(self):
+    with temporary_dir() as tmpdir:
+      history = CompileHistory(os.path.join(tmpdir, 'history.json'))
+      history.record('compile(a:a)', 10, 100)
+      history.record('compile(b:b)', 30, 100)
+      # The moving average of a is now 20, and its size is now 200.
+      history.record('compile(a:a)', 30, 200)
+      self.assertEqual(50 / 300 * 60, history.estimate('compile(c:c)', 60))
+
+  def test_moving_average(self):
+    with temporary_dir() as tmpdir:
+      history = CompileHistory(os.path.join(tmpdir, 'history.json'))
+      history.record('compile(a:a)', 10, 100)
+      history.record('compile(a:a)', 20, 100)
+      self.assertEqual(15, history.estimate('compile(a:a)', 100))
+
+  def test_save_and_load(self):
+    with temporary_dir() as tmpdir:
+      path = os.path.join(tmpdir, 'history', 'history.json')
+      history = CompileHistory(path)
+      history.record('compile(a:a)', 10, 100)
+      history.save()
+      self.assertEqual(['history.json'], os.listdir(os.path.dirname(path)))
+      self.assertEqual(10, CompileHistory(path).estimate('compile(a:a)', 1))
+
+      safe_file_dump(path, 'not json')
+      self.assertEqual(1, CompileHistory(path).estimate('compile(a:a)', 1))
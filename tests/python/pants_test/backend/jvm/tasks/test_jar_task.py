@@ -126,6 +126,29 @@ class JarTaskTest(BaseJarTaskTest):
         self.assert_listing(jar, 'README')
         self.assertEqual(b'42', jar.read('README'))
 
+  def test_overwrite_previous_jar(self):
+    with temporary_dir() as chroot:
+      def write_classes(contents_by_name):
+        for name, contents in contents_by_name.items():
+          with safe_open(os.path.join(chroot, 'a', name), 'w') as fd:
+            fd.write(contents)
+
+      with self.jarfile() as existing_jarfile:
+        write_classes({'B.class': 'b', 'C.class': 'c'})
+        with self.jar_task.open_jar(existing_jarfile, overwrite=True) as jar:
+          jar.write(chroot)
+
+        os.unlink(os.path.join(chroot, 'a', 'C.class'))
+        write_classes({'B.class': 'bb', 'D.class': 'd'})
+        with self.jar_task.open_jar(existing_jarfile, overwrite=True,
+                                    previous_jar=existing_jarfile) as jar:
+          jar.write(chroot)
+
+        with open_zip(existing_jarfile) as jar:
+          self.assert_listing(jar, 'a/', 'a/B.class', 'a/D.class')
+          self.assertEqual(b'bb', jar.read('a/B.class'))
+          self.assertEqual(b'd', jar.read('a/D.class'))
+
   @contextmanager
   def _test_custom_manifest(self):
     manifest_contents = b'Manifest-Version: 1.0\r\nCreated-By: test\r\n\r\n'
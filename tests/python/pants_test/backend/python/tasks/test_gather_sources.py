@@ -105,6 +105,23 @@ class GatherSourcesTest(TaskTestBase):
     self._assert_content_not_in_pex(pex, self.sources1)
     self._assert_content_not_in_pex(pex, self.resources)
 
+  def test_reuse_unchanged_sources(self):
+    pex1 = self._gather_sources([self.sources1])
+    pex2 = self._gather_sources([self.sources1, self.sources3])
+    self.assertNotEqual(pex1.path(), pex2.path())
+    self._assert_content_in_pex(pex2, self.sources1)
+    self._assert_content_in_pex(pex2, self.sources3)
+
+    def inode(pex, path):
+      return os.stat(os.path.join(pex.path(), path)).st_ino
+
+    # The sources of the unchanged targets are shared with the earlier pex rather than copied.
+    self.assertEqual(inode(pex1, 'one/foo.py'), inode(pex2, 'one/foo.py'))
+    self.assertEqual(inode(pex1, 'qux/quux.txt'), inode(pex2, 'qux/quux.txt'))
+    # While those of new targets are copied from the buildroot.
+    corge = os.path.join(self.build_root, 'more/src/python/three/corge.py')
+    self.assertNotEqual(os.stat(corge).st_ino, inode(pex2, 'three/corge.py'))
+
   def _gather_sources(self, target_roots):
     with temporary_dir() as cache_dir:
       interpreter = PythonInterpreter.get()
@@ -0,0 +1,92 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import sys
+import unittest
+from builtins import open
+from textwrap import dedent
+
+import pkg_resources
+
+from pants.backend.python.tasks.pytest_worker_manager import PytestWorkerManager
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump, safe_mkdir
+from pants.util.process_handler import subprocess
+
+
+class PytestWorkerManagerTest(unittest.TestCase):
+
+  def setUp(self):
+    self._tmpdir_context = temporary_dir()
+    self.tmpdir = self._tmpdir_context.__enter__()
+    self.addCleanup(self._tmpdir_context.__exit__, None, None, None)
+
+    # Start the worker server directly with this interpreter, as it would be started from a PEX.
+    self.manager = PytestWorkerManager('pytest_worker',
+                                       os.path.join(self.tmpdir, 'worker'),
+                                       metadata_base_dir=os.path.join(self.tmpdir, 'pids'))
+    safe_mkdir(os.path.dirname(self.manager._socket_file()))
+    server = pkg_resources.resource_filename('pants.backend.python.tasks',
+                                             'pytest_worker/server.py')
+    self.server = subprocess.Popen([sys.executable, server,
+                                    self.manager._metadata_file_path('pytest_worker', 'pid'),
+                                    self.manager._socket_file(),
+                                    '60'])
+    self.addCleanup(self._stop_server)
+    self.manager.await_socket(30)
+
+  def _stop_server(self):
+    self.server.terminate()
+    self.server.wait()
+
+  def _run(self, content, stdout):
+    test_file = os.path.join(self.tmpdir, 'test_worker.py')
+    safe_file_dump(test_file, dedent(content))
+    return self.manager.run(['-p', 'no:cacheprovider', test_file],
+                            cwd=self.tmpdir,
+                            env=dict(os.environ),
+                            stdout=stdout,
+                            stderr=os.path.join(self.tmpdir, 'stderr'))
+
+  def test_run(self):
+    stdout = os.path.join(self.tmpdir, 'stdout')
+    run = self._run("""
+      def test_pass():
+        pass
+      """, stdout)
+    self.assertEqual(0, run.wait(timeout=60))
+    with open(stdout, 'r') as fp:
+      self.assertIn('1 passed', fp.read())
+
+    run = self._run("""
+      def test_fail():
+        assert False
+      """, stdout)
+    self.assertEqual(1, run.wait(timeout=60))
+    with open(stdout, 'r') as fp:
+      self.assertIn('1 failed', fp.read())
+
+  def test_terminate(self):
+    run = self._run("""
+      import time
+
+      def test_sleep():
+        time.sleep(60)
+      """, os.path.join(self.tmpdir, 'stdout'))
+    with self.assertRaises(subprocess.TimeoutExpired):
+      run.wait(timeout=0.1)
+    self.assertIsNone(run.poll())
+
+    run.terminate()
+    self.assertLess(run.wait(timeout=60), 0)
+
+    # The worker itself keeps serving runs.
+    run = self._run("""
+      def test_pass():
+        pass
+      """, os.path.join(self.tmpdir, 'stdout'))
+    self.assertEqual(0, run.wait(timeout=60))
@@ -13,7 +13,9 @@ from twitter.common.collections import maybe_list
 
 from pants.base.workunit import WorkUnit
 from pants.build_graph.target import Target
+from pants.cache.cache_telemetry import CacheTelemetry
 from pants.goal.context import Context
+from pants.goal.nailgun_pool_stats import NailgunPoolStats
 from pants.goal.run_tracker import RunTrackerLogger
 
 
@@ -57,8 +59,17 @@ class TestContext(Context):
 
       def add_misses(self, cache_name, targets, causes): pass
 
+      def add_queued_uploads(self, cache_name, num_artifacts, num_bytes): pass
+
+      telemetry = CacheTelemetry()
+
+      def set_upload_queue_stats(self, queue_root, backlog_artifacts, backlog_bytes,
+                                 last_drain=None): pass
+
     artifact_cache_stats = DummyArtifactCacheStats()
 
+    nailgun_pool_stats = NailgunPoolStats()
+
     def report_target_info(self, scope, target, keys, val): pass
 
 
@@ -172,3 +172,23 @@ class JsonHashingTest(unittest.TestCase):
     self.assertEqual(stable_json_sha1({'b': 4, 'a': 3}), '6348df9579e7a72f6ec3fb37751db73b2c97a135')
     self.assertEqual(stable_json_sha1([('b', 4), ('a', 3)]), '8e72bb976e71ea81887eb94730655fe49c454d0c')
     self.assertEqual(stable_json_sha1([{'b': 4, 'a': 3}]), '4735d702f51fb8a98edb9f6f3eb3df1d6d38a77f')
+
+  def test_matches_coercing_encoder_json(self):
+    # stable_json_sha1 renders common inputs without json.dumps: the hashes must not change.
+    inputs = [
+      None, True, 0, -7, 1.5, 'a', 'é\n"', [], (), {},
+      ['a', ('b', 1), [None, False]],
+      ({10: 'a', 2: 'b'}, [{10: 'a', 2: 'b'}]),
+      [{'b': {'d': set(['y', 'x'])}, 'a': frozenset([2, 1.5])}],
+      {3: 'int', 1.5: 'float'},
+      {(1, 'x'): {'nested': ({'k': []},)}, (0, 'y'): None},
+      {'org': 'org.example', 'name': 'lib', 'rev': '1.0', 'excludes': [('a', 'b')]},
+    ]
+    for obj in inputs:
+      expected = hashlib.sha1(json.dumps(obj, ensure_ascii=True, allow_nan=False, sort_keys=True,
+                                         cls=CoercingEncoder).encode('utf-8')).hexdigest()
+      self.assertEqual(expected, stable_json_sha1(obj))
+
+  def test_falls_back_for_iterators(self):
+    self.assertEqual(stable_json_sha1(['a', 'b']), stable_json_sha1(x for x in ['a', 'b']))
+    self.assertEqual(stable_json_sha1(('a', ['b'])), stable_json_sha1(('a', iter(['b']))))
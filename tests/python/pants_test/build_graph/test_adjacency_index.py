@@ -0,0 +1,40 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+
+from pants.build_graph.address import Address
+from pants.build_graph.adjacency_index import AdjacencyIndex
+
+
+class AdjacencyIndexTest(unittest.TestCase):
+
+  def test_index(self):
+    index = AdjacencyIndex()
+    a, b, c = (Address('src', name) for name in 'abc')
+    index.set_target(a, 'A')
+    index.add_dependency(a, b)
+    index.add_dependency(a, c)
+    index.add_dependency(c, b)
+
+    self.assertEqual(3, len(index))
+    self.assertEqual([0, 1, 2], [index.id_of(address) for address in (a, b, c)])
+    self.assertEqual([[1, 2], [], [1]], index.dependencies)
+    self.assertEqual([[], [0, 2], [0]], index.dependees)
+    self.assertEqual('A', index.target(index.id_of(a)))
+
+  def test_missing_targets(self):
+    index = AdjacencyIndex()
+    a, b = Address('src', 'a'), Address('src', 'b')
+    index.add_dependency(a, b)
+    with self.assertRaises(KeyError):
+      index.target(index.id_of(b))
+    with self.assertRaises(KeyError):
+      index.id_of(Address('src', 'c'))
+
+    # A target injected after its dependees keeps its id.
+    index.set_target(b, 'B')
+    self.assertEqual('B', index.target(1))
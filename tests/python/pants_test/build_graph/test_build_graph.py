@@ -4,6 +4,7 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import sys
 import unittest
 from builtins import chr, range
 from collections import defaultdict
@@ -145,6 +146,18 @@ class BuildGraphTest(TestBase):
     assertDependencyWalk(a, [a, b, c, d, e])
     assertDependencyWalk(a, [c, d, b, e, a], postorder=True)
 
+  def test_walk_deep_graph(self):
+    # Walks are iterative, so the depth of a graph is not limited by the python stack.
+    depth = sys.getrecursionlimit() + 1
+    chain = [self.make_target('deep:t0')]
+    for i in range(1, depth):
+      chain.append(self.make_target('deep:t{}'.format(i), dependencies=[chain[-1]]))
+
+    self.assertEqual(chain, list(self.build_graph.transitive_subgraph_of_addresses(
+      [chain[-1].address], postorder=True)))
+    self.assertEqual(chain, list(self.build_graph.transitive_dependees_of_addresses(
+      [chain[0].address])))
+
   def test_dependency_walk_prelude_epilogue(self):
     def assertDependencyWalkPreludeEpilogue(target, results, postorder=False):
       names = []
@@ -215,6 +215,21 @@ class TargetTest(TestBase):
     hash_value = '{}.{}'.format(target_hash, dep_hash)
     self.assertEqual(hash_value, target_c.transitive_invalidation_hash(fingerprint_strategy=fingerprint_strategy))
 
+  def test_compute_transitive_invalidation_hashes(self):
+    target_a = self.make_target('a', Target)
+    target_b = self.make_target('b', Target, dependencies=[target_a])
+    target_c = self.make_target('c', Target, dependencies=[target_a])
+    target_d = self.make_target('d', Target, dependencies=[target_b, target_c])
+    targets = [target_a, target_b, target_c, target_d]
+
+    Target.compute_transitive_invalidation_hashes([target_d])
+    batched = [target.transitive_invalidation_hash() for target in targets]
+
+    for target in targets:
+      target.mark_transitive_invalidation_hash_dirty()
+    self.assertEqual(batched, [target.transitive_invalidation_hash() for target in targets])
+    self.assertEqual(len(set(batched)), len(batched))
+
   def test_has_sources(self):
     def sources(rel_path, *args):
       return Globs.create_fileset_with_spec(rel_path, *args)
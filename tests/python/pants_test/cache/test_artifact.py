@@ -5,7 +5,9 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import os
+import time
 import unittest
+from builtins import open, range
 
 from pants.cache.artifact import ArtifactError, DirectoryArtifact, TarballArtifact
 from pants.util.contextutil import temporary_dir
@@ -56,6 +58,26 @@ class TarballArtifactTest(TestBase):
 
       self.assertTrue(artifact.exists())
 
+  def test_unknown_codec(self):
+    with self.assertRaises(ValueError):
+      TarballArtifact('artifacts', 'some.tar', codec='rar')
+
+  def test_uncompressed_extraction(self):
+    with temporary_dir() as tmpdir:
+      artifact_root = os.path.join(tmpdir, 'artifacts')
+      cache_root = os.path.join(tmpdir, 'cache')
+      safe_mkdir(cache_root)
+
+      path = self.touch_file_in(artifact_root, content='uncompressed')
+      artifact = TarballArtifact(artifact_root, os.path.join(cache_root, 'some.tar'),
+                                 codec=TarballArtifact.UNCOMPRESSED)
+      artifact.collect([path])
+      os.unlink(path)
+
+      artifact.extract()
+      with open(path, 'r') as fp:
+        self.assertEqual('uncompressed', fp.read())
+
   def test_non_existent_tarball_extraction(self):
     with temporary_dir() as tmpdir:
       artifact = TarballArtifact(artifact_root=tmpdir, tarfile_='vapor.tar')
@@ -76,6 +98,106 @@ class TarballArtifactTest(TestBase):
     return path
 
 
+class TarballArtifactStreamTest(unittest.TestCase):
+  codec = TarballArtifact.GZIP
+
+  def setUp(self):
+    self.tmpdir = self.enter(temporary_dir())
+    self.src_root = os.path.join(self.tmpdir, 'src')
+    self.dst_root = os.path.join(self.tmpdir, 'dst')
+    safe_mkdir(self.dst_root)
+
+    paths = []
+    for i in range(10):
+      path = os.path.join(self.src_root, 'results', 'dir{}'.format(i % 3), 'file{}'.format(i))
+      with safe_open(path, 'w') as fp:
+        fp.write('content{}\n'.format(i) * 1000 * i)
+      paths.append(path)
+    tarball = os.path.join(self.tmpdir, 'src.tgz')
+    TarballArtifact(self.src_root, tarball, compression=1, codec=self.codec).collect(paths)
+    with open(tarball, 'rb') as fp:
+      self.tarball_bytes = fp.read()
+
+  def enter(self, context):
+    value = context.__enter__()
+    self.addCleanup(context.__exit__, None, None, None)
+    return value
+
+  def chunks(self, data, chunk_size):
+    return (data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+
+  def extracted_files(self):
+    files = {}
+    for dir_name, _, filenames in os.walk(self.dst_root):
+      for filename in filenames:
+        path = os.path.join(dir_name, filename)
+        with open(path, 'r') as fp:
+          files[os.path.relpath(path, self.dst_root)] = fp.read()
+    return files
+
+  def expected_files(self):
+    files = {}
+    for i in range(10):
+      relpath = os.path.join('results', 'dir{}'.format(i % 3), 'file{}'.format(i))
+      files[relpath] = 'content{}\n'.format(i) * 1000 * i
+    return files
+
+  def test_extract_stream(self):
+    for chunk_size in (1, 7, 4096, len(self.tarball_bytes)):
+      tarball = os.path.join(self.tmpdir, 'dst{}.tgz'.format(chunk_size))
+      artifact = TarballArtifact(self.dst_root, tarball, codec=self.codec)
+      artifact.extract_stream(self.chunks(self.tarball_bytes, chunk_size))
+
+      self.assertEqual(self.expected_files(), self.extracted_files())
+      with open(tarball, 'rb') as fp:
+        self.assertEqual(self.tarball_bytes, fp.read())
+
+  def test_extract_large_stream(self):
+    # Reading must be linear in the size of the stream, even when a single chunk decodes to many
+    # of the records that tarfile reads.
+    path = os.path.join(self.tmpdir, 'large', 'results', 'large_file')
+    content = 'content\n' * 4 * 1024 * 1024
+    with safe_open(path, 'w') as fp:
+      fp.write(content)
+    tarball = os.path.join(self.tmpdir, 'large.tgz')
+    TarballArtifact(os.path.dirname(os.path.dirname(path)), tarball, codec=self.codec).collect([path])
+    with open(tarball, 'rb') as fp:
+      tarball_bytes = fp.read()
+
+    artifact = TarballArtifact(self.dst_root, os.path.join(self.tmpdir, 'dst.tgz'), codec=self.codec)
+    start = time.time()
+    artifact.extract_stream([tarball_bytes])
+    self.assertLess(time.time() - start, 3)
+    self.assertEqual({os.path.join('results', 'large_file'): content}, self.extracted_files())
+
+  def test_extract_stream_replaces_existing_files(self):
+    with safe_open(os.path.join(self.dst_root, 'results', 'dir0', 'file0'), 'w') as fp:
+      fp.write('stale')
+    artifact = TarballArtifact(self.dst_root, os.path.join(self.tmpdir, 'dst.tgz'), codec=self.codec)
+    artifact.extract_stream(self.chunks(self.tarball_bytes, 4096))
+    self.assertEqual(self.expected_files(), self.extracted_files())
+
+  def test_extract_truncated_stream(self):
+    for length in (0, 5, len(self.tarball_bytes) // 2, len(self.tarball_bytes) - 1):
+      artifact = TarballArtifact(self.dst_root, os.path.join(self.tmpdir, 'dst.tgz'), codec=self.codec)
+      with self.assertRaises(ArtifactError):
+        artifact.extract_stream(self.chunks(self.tarball_bytes[:length], 4096))
+      self.assertEqual({}, self.extracted_files())
+      self.assertEqual([], os.listdir(self.dst_root))
+
+  def test_extract_corrupt_stream(self):
+    corrupt = bytearray(self.tarball_bytes)
+    corrupt[-8] ^= 0xff
+    artifact = TarballArtifact(self.dst_root, os.path.join(self.tmpdir, 'dst.tgz'), codec=self.codec)
+    with self.assertRaises(ArtifactError):
+      artifact.extract_stream(self.chunks(bytes(corrupt), 4096))
+    self.assertEqual({}, self.extracted_files())
+
+
+class UncompressedTarballArtifactStreamTest(TarballArtifactStreamTest):
+  codec = TarballArtifact.UNCOMPRESSED
+
+
 class DirectoryArtifactTest(unittest.TestCase):
   def test_exists_when_dir_exists(self):
     with temporary_dir() as tmpdir:
@@ -11,7 +11,9 @@ from contextlib import contextmanager
 from pants.cache.artifact import TarballArtifact
 from pants.cache.artifact_cache import (NonfatalArtifactCacheError, call_insert,
                                         call_use_cached_files)
+from pants.cache.content_addressed_artifact_cache import ContentAddressedLocalArtifactCache
 from pants.cache.local_artifact_cache import LocalArtifactCache, TempLocalArtifactCache
+from pants.cache.local_cache_eviction import LRUEvictionPolicy
 from pants.cache.pinger import BestUrlSelector, InvalidRESTfulCacheProtoError
 from pants.cache.restful_artifact_cache import RESTfulArtifactCache
 from pants.invalidation.build_invalidator import CacheKey
@@ -27,10 +29,10 @@ TEST_CONTENT2 = b'kermit'
 
 class TestArtifactCache(TestBase):
   @contextmanager
-  def setup_local_cache(self):
+  def setup_local_cache(self, codec=TarballArtifact.GZIP):
     with temporary_dir() as artifact_root:
       with temporary_dir() as cache_root:
-        yield LocalArtifactCache(artifact_root, cache_root, compression=1)
+        yield LocalArtifactCache(artifact_root, cache_root, compression=1, codec=codec)
 
   @contextmanager
   def setup_server(self, return_failed=False, cache_root=None):
@@ -63,6 +65,49 @@ class TestArtifactCache(TestBase):
     with self.setup_local_cache() as artifact_cache:
       self.do_test_artifact_cache(artifact_cache)
 
+  def test_local_cache_uncompressed(self):
+    with self.setup_local_cache(codec=TarballArtifact.UNCOMPRESSED) as artifact_cache:
+      self.do_test_artifact_cache(artifact_cache)
+
+  def test_local_cache_codecs_coexist(self):
+    key = CacheKey('muppet_key', 'fake_hash')
+    with self.setup_local_cache() as gzip_cache:
+      uncompressed_cache = LocalArtifactCache(gzip_cache.artifact_root, gzip_cache._cache_root,
+                                              compression=1, codec=TarballArtifact.UNCOMPRESSED)
+      with self.setup_test_file(gzip_cache.artifact_root) as path:
+        gzip_cache.insert(key, [path])
+        self.assertTrue(gzip_cache.has(key))
+        self.assertFalse(uncompressed_cache.has(key))
+
+        uncompressed_cache.insert(key, [path])
+        self.assertTrue(uncompressed_cache.has(key))
+        self.assertNotEqual(gzip_cache._cache_file_for_key(key),
+                            uncompressed_cache._cache_file_for_key(key))
+
+  def test_local_cache_hit_records_use(self):
+    key = CacheKey('muppet_key', 'fake_hash')
+    with temporary_dir() as artifact_root, temporary_dir() as root:
+      artifact_cache = LocalArtifactCache(artifact_root, os.path.join(root, 'task'), compression=1,
+                                          eviction_policy=LRUEvictionPolicy(root, max_bytes=1))
+      with self.setup_test_file(artifact_root) as path:
+        artifact_cache.insert(key, [path])
+        tarball = artifact_cache._cache_file_for_key(key)
+        os.utime(tarball, (0, 0))
+
+        self.assertTrue(artifact_cache.use_cached_files(key))
+        self.assertGreater(os.path.getmtime(tarball), 0)
+
+        # The only artifact exceeds the budget of the shared root.
+        artifact_cache.evict()
+        self.assertFalse(artifact_cache.has(key))
+
+  def test_restful_cache_uncompressed(self):
+    with temporary_dir() as artifact_root:
+      local = TempLocalArtifactCache(artifact_root, 0, codec=TarballArtifact.UNCOMPRESSED)
+      with self.setup_server() as server:
+        artifact_cache = RESTfulArtifactCache(artifact_root, BestUrlSelector([server.url]), local)
+        self.do_test_artifact_cache(artifact_cache)
+
   def test_restful_cache(self):
     with self.assertRaises(InvalidRESTfulCacheProtoError):
       RESTfulArtifactCache('foo', BestUrlSelector(['ftp://localhost/bar']), 'foo')
@@ -186,6 +231,110 @@ class TestArtifactCache(TestBase):
             self.assertTrue(os.path.exists(results_dir))
             self.assertTrue(len(os.listdir(results_dir)) == 0)
 
+  def test_has_many(self):
+    with self.setup_local_cache() as artifact_cache:
+      self.do_test_has_many(artifact_cache)
+
+    with self.setup_rest_cache() as artifact_cache:
+      self.do_test_has_many(artifact_cache)
+
+  def test_has_many_local_backed_remote_cache(self):
+    with self.setup_server() as server:
+      with self.setup_local_cache() as local:
+        tmp = TempLocalArtifactCache(local.artifact_root, 0)
+        remote = RESTfulArtifactCache(local.artifact_root, BestUrlSelector([server.url]), tmp)
+        combined = RESTfulArtifactCache(local.artifact_root, BestUrlSelector([server.url]), local)
+
+        local_key = CacheKey('local_key', 'fake_hash')
+        remote_key = CacheKey('remote_key', 'fake_hash')
+        missing_key = CacheKey('missing_key', 'fake_hash')
+        with self.setup_test_file(local.artifact_root) as path:
+          local.insert(local_key, [path])
+          remote.insert(remote_key, [path])
+
+        self.assertEqual([True, True, False],
+                         combined.has_many([local_key, remote_key, missing_key]))
+
+  def test_has_many_failed_request(self):
+    key = CacheKey('muppet_key', 'fake_hash')
+    # Errors are reported as possible hits, so that reading the artifact reports the failure.
+    with self.setup_rest_cache(return_failed=True) as artifact_cache:
+      self.assertEqual([True], artifact_cache.has_many([key]))
+      self.assertFalse(call_use_cached_files((artifact_cache, key, None)))
+
+  def do_test_has_many(self, artifact_cache):
+    key1 = CacheKey('muppet_key', 'fake_hash')
+    key2 = CacheKey('muppet_key', 'other_fake_hash')
+    key3 = CacheKey('kermit_key', 'fake_hash')
+    self.assertEqual([], artifact_cache.has_many([]))
+    self.assertEqual([False, False, False], artifact_cache.has_many([key1, key2, key3]))
+    with self.setup_test_file(artifact_cache.artifact_root) as path:
+      artifact_cache.insert(key1, [path])
+      artifact_cache.insert(key3, [path])
+    self.assertEqual([True, False, True], artifact_cache.has_many([key1, key2, key3]))
+
+  def test_streaming_local_backed_remote_cache(self):
+    with self.setup_server() as server:
+      with self.setup_local_cache() as local:
+        tmp = TempLocalArtifactCache(local.artifact_root, 0)
+        remote = RESTfulArtifactCache(local.artifact_root, BestUrlSelector([server.url]), tmp)
+        combined = RESTfulArtifactCache(local.artifact_root, BestUrlSelector([server.url]), local,
+                                        stream_artifacts=True)
+
+        key = CacheKey('muppet_key', 'fake_hash')
+        with self.setup_test_file(local.artifact_root) as path:
+          remote.insert(key, [path])
+          with open(path, 'wb') as outfile:
+            outfile.write(TEST_CONTENT2)
+
+          # Streaming via combined should both restore the file and backfill local.
+          self.assertTrue(bool(combined.use_cached_files(key)))
+          with open(path, 'rb') as infile:
+            self.assertEqual(TEST_CONTENT1, infile.read())
+          self.assertTrue(local.has(key))
+
+  def test_content_addressed_local_backed_remote_cache(self):
+    with self.setup_server() as server:
+      with temporary_dir() as artifact_root, temporary_dir() as cache_root:
+        local = ContentAddressedLocalArtifactCache(artifact_root, cache_root, compression=1)
+        artifact_cache = RESTfulArtifactCache(artifact_root, BestUrlSelector([server.url]), local)
+        self.do_test_artifact_cache(artifact_cache)
+
+        # Inserts upload a tarball, which is fetched into the local cache on a local miss.
+        key = CacheKey('muppet_key', 'fake_hash')
+        with self.setup_test_file(artifact_root) as path:
+          artifact_cache.insert(key, [path])
+          local.delete(key)
+          with open(path, 'wb') as outfile:
+            outfile.write(TEST_CONTENT2)
+
+          self.assertTrue(bool(artifact_cache.use_cached_files(key)))
+          with open(path, 'rb') as infile:
+            self.assertEqual(TEST_CONTENT1, infile.read())
+          self.assertTrue(local.has(key))
+
+  def test_streaming_corrupt_artifact(self):
+    with temporary_dir() as remote_cache_dir:
+      with self.setup_server(cache_root=remote_cache_dir) as server:
+        with self.setup_local_cache() as local:
+          tmp = TempLocalArtifactCache(local.artifact_root, compression=1)
+          remote = RESTfulArtifactCache(local.artifact_root, BestUrlSelector([server.url]), tmp)
+          combined = RESTfulArtifactCache(local.artifact_root, BestUrlSelector([server.url]),
+                                          local, stream_artifacts=True)
+
+          key = CacheKey('muppet_key', 'fake_hash')
+          results_dir = os.path.join(local.artifact_root, 'a/sub/dir')
+          safe_mkdir(results_dir)
+
+          with self.setup_test_file(results_dir) as path:
+            remote.insert(key, [path])
+            self.assertTrue(server.corrupt_artifacts(r'.*muppet_key.*') == 1)
+
+            self.assertFalse(combined.use_cached_files(key, results_dir=results_dir))
+            self.assertFalse(local.has(key))
+            self.assertTrue(os.path.exists(results_dir))
+            self.assertTrue(len(os.listdir(results_dir)) == 0)
+
   def test_multiproc(self):
     key = CacheKey('muppet_key', 'fake_hash')
 
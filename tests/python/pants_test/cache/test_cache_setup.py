@@ -13,6 +13,7 @@ from pants.cache.cache_setup import (CacheFactory, CacheSetup, CacheSpec, CacheS
                                      EmptyCacheSpecError, InvalidCacheSpecError,
                                      LocalCacheSpecRequiredError, RemoteCacheSpecRequiredError,
                                      TooManyCacheSpecsError)
+from pants.cache.content_addressed_artifact_cache import ContentAddressedLocalArtifactCache
 from pants.cache.local_artifact_cache import LocalArtifactCache
 from pants.cache.resolver import Resolver
 from pants.cache.restful_artifact_cache import RESTfulArtifactCache
@@ -162,10 +163,10 @@ class TestCacheSetup(TestBase):
                       cache_factory._resolve(self.CACHE_SPEC_LOCAL_RESOLVE))
 
   def test_cache_spec_parsing(self):
-    def mk_cache(spec, resolver=None):
+    def mk_cache(spec, resolver=None, **options):
       Subsystem.reset()
       self.set_options_for_scope(CacheSetup.subscope(DummyTask.options_scope),
-                                 read_from=spec, compression=1)
+                                 read_from=spec, compression=1, **options)
       self.context(for_task_types=[DummyTask])  # Force option initialization.
       cache_factory = CacheSetup.create_cache_factory_for_task(
         self.create_task(),
@@ -173,14 +174,16 @@ class TestCacheSetup(TestBase):
         resolver=resolver)
       return cache_factory.get_read_cache()
 
-    def check(expected_type, spec, resolver=None):
-      cache = mk_cache(spec, resolver=resolver)
+    def check(expected_type, spec, resolver=None, **options):
+      cache = mk_cache(spec, resolver=resolver, **options)
       self.assertIsInstance(cache, expected_type)
       self.assertEqual(cache.artifact_root, self.pants_workdir)
 
     with temporary_dir() as tmpdir:
       cachedir = os.path.join(tmpdir, 'cachedir')  # Must be a real path, so we can safe_mkdir it.
       check(LocalArtifactCache, [cachedir])
+      check(ContentAddressedLocalArtifactCache, [cachedir],
+            local_cache_format=CacheSetup.CONTENT_ADDRESSED)
       check(RESTfulArtifactCache, ['http://localhost/bar'])
       check(RESTfulArtifactCache, ['https://localhost/bar'])
       check(RESTfulArtifactCache, [cachedir, 'http://localhost/bar'])
@@ -0,0 +1,102 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import unittest
+
+from future.moves.urllib.parse import urlparse
+
+from pants.cache.cache_telemetry import CacheTelemetry, LatencyHistogram
+from pants.cache.local_artifact_cache import LocalArtifactCache, TempLocalArtifactCache
+from pants.cache.pinger import BestUrlSelector
+from pants.cache.restful_artifact_cache import RESTfulArtifactCache
+from pants.invalidation.build_invalidator import CacheKey
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump
+from pants_test.cache.cache_server import cache_server
+
+
+class LatencyHistogramTest(unittest.TestCase):
+
+  def test_percentiles(self):
+    histogram = LatencyHistogram()
+    self.assertIsNone(histogram.percentile_ms(50))
+    for secs in (0.0005, 0.003, 0.003, 0.1, 1000):
+      histogram.add(secs)
+
+    self.assertEqual(4, histogram.percentile_ms(50))
+    self.assertEqual(128, histogram.percentile_ms(80))
+    self.assertIsNone(histogram.percentile_ms(99))
+    self.assertEqual({'<=1ms': 1, '<=4ms': 2, '<=128ms': 1, '>65536ms': 1},
+                     histogram.as_dict()['buckets'])
+
+
+class CacheTelemetryTest(unittest.TestCase):
+
+  def test_hit_ratio(self):
+    telemetry = CacheTelemetry()
+    self.assertIsNone(telemetry.get_all()['hit_ratio'])
+    telemetry.record_lookup(CacheTelemetry.LOCAL, CacheTelemetry.HIT)
+    telemetry.record_lookup(CacheTelemetry.REMOTE, CacheTelemetry.HIT)
+    telemetry.record_lookup(CacheTelemetry.REMOTE, CacheTelemetry.MISS)
+    telemetry.record_lookup(CacheTelemetry.REMOTE, CacheTelemetry.ERROR)
+
+    self.assertEqual(0.5, telemetry.get_all()['hit_ratio'])
+    self.assertEqual('1', telemetry.get_annotations()['artifact_cache.local.hit'])
+
+  def test_cache_telemetry(self):
+    with cache_server() as server, temporary_dir() as artifact_root, temporary_dir() as root:
+      telemetry = CacheTelemetry()
+      local = LocalArtifactCache(artifact_root, os.path.join(root, 'task'), compression=1)
+      remote = RESTfulArtifactCache(artifact_root, BestUrlSelector([server.url]),
+                                    TempLocalArtifactCache(artifact_root, compression=1))
+      for cache in (local, remote, remote._localcache):
+        cache.telemetry = telemetry
+      key = CacheKey('target', 'hash')
+      path = os.path.join(artifact_root, 'results')
+      safe_file_dump(path, 'results')
+
+      self.assertFalse(remote.use_cached_files(key))
+      self.assertFalse(local.use_cached_files(key))
+      remote.insert(key, [path])
+
+      stats = telemetry.get_all()
+      self.assertEqual({CacheTelemetry.LOCAL: {CacheTelemetry.MISS: 1},
+                        CacheTelemetry.REMOTE: {CacheTelemetry.MISS: 1}},
+                       stats['lookups'])
+      # An insert checks for the artifact before uploading it.
+      self.assertEqual({'GET', 'HEAD', 'PUT'}, set(stats['requests']))
+      self.assertEqual(1, stats['requests']['GET']['count'])
+      server_stats = stats['servers'][urlparse(server.url).netloc]
+      self.assertEqual((3, 2, 1, 0.0), (server_stats['requests'], server_stats[CacheTelemetry.MISS],
+                                        server_stats[CacheTelemetry.HIT],
+                                        server_stats['error_rate']))
+      self.assertGreater(stats['bytes']['uploaded'], 0)
+
+  def test_has_many_records_misses(self):
+    # Callers only use the cached files of the keys that `has_many` reports present.
+    with cache_server() as server, temporary_dir() as artifact_root, temporary_dir() as root:
+      telemetry = CacheTelemetry()
+      local = LocalArtifactCache(artifact_root, os.path.join(root, 'task'), compression=1)
+      remote = RESTfulArtifactCache(artifact_root, BestUrlSelector([server.url]), local)
+      for cache in (local, remote):
+        cache.telemetry = telemetry
+      uploaded_key = CacheKey('uploaded', 'hash')
+      path = os.path.join(artifact_root, 'results')
+      safe_file_dump(path, 'results')
+      uploader = RESTfulArtifactCache(artifact_root, BestUrlSelector([server.url]),
+                                      TempLocalArtifactCache(artifact_root, compression=1))
+      uploader.insert(uploaded_key, [path])
+
+      missing_keys = [CacheKey('missing', 'hash{}'.format(i)) for i in range(3)]
+      self.assertEqual([False] * 3, local.has_many(missing_keys))
+      self.assertEqual([True, False, False, False], remote.has_many([uploaded_key] + missing_keys))
+
+      # A key missing from both layers is recorded once, as a remote miss.
+      self.assertEqual({CacheTelemetry.LOCAL: {CacheTelemetry.MISS: 3},
+                        CacheTelemetry.REMOTE: {CacheTelemetry.MISS: 3}},
+                       telemetry.get_all()['lookups'])
+      self.assertEqual(0.0, telemetry.get_all()['hit_ratio'])
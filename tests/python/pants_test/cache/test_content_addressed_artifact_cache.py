@@ -0,0 +1,186 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import stat
+import tarfile
+import time
+import unittest
+from builtins import open
+from contextlib import contextmanager
+
+from pants.cache.artifact import ArtifactError, TarballArtifact
+from pants.cache.artifact_cache import UnreadableArtifact
+from pants.cache.content_addressed_artifact_cache import (BLOB_DIR,
+                                                          ContentAddressedLocalArtifactCache,
+                                                          read_manifest)
+from pants.invalidation.build_invalidator import CacheKey
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump, safe_mkdir, safe_mkdir_for
+
+
+class ContentAddressedLocalArtifactCacheTest(unittest.TestCase):
+
+  @contextmanager
+  def setup_cache(self, **kwargs):
+    with temporary_dir() as artifact_root, temporary_dir() as root:
+      yield ContentAddressedLocalArtifactCache(artifact_root, os.path.join(root, 'task'),
+                                               compression=1, **kwargs)
+
+  def _write(self, cache, relpath, content, mode=0o644):
+    path = os.path.join(cache.artifact_root, relpath)
+    safe_file_dump(path, content, makedirs=True)
+    os.chmod(path, mode)
+    return path
+
+  def _read(self, cache, relpath):
+    with open(os.path.join(cache.artifact_root, relpath), 'r') as fp:
+      return fp.read()
+
+  def _blobs(self, cache):
+    blob_root = os.path.join(os.path.dirname(cache._cache_root), BLOB_DIR)
+    return sorted(os.path.join(dirpath, name)
+                  for dirpath, _, names in os.walk(blob_root) for name in names)
+
+  def test_roundtrip(self):
+    with self.setup_cache(dereference=False) as cache:
+      key = CacheKey('target', 'hash')
+      results = os.path.join(cache.artifact_root, 'results')
+      self._write(cache, 'results/a.txt', 'a')
+      self._write(cache, 'results/bin/run', 'run', mode=0o755)
+      safe_mkdir(os.path.join(results, 'empty'))
+      os.symlink('a.txt', os.path.join(results, 'link'))
+
+      cache.insert(key, [results])
+      self.assertTrue(cache.has(key))
+      self.assertEqual([True], cache.has_many([key]))
+
+      safe_mkdir(results, clean=True)
+      self.assertTrue(cache.use_cached_files(key, results_dir=results))
+      self.assertEqual('a', self._read(cache, 'results/a.txt'))
+      self.assertEqual('run', self._read(cache, 'results/bin/run'))
+      self.assertTrue(os.stat(os.path.join(results, 'bin/run')).st_mode & stat.S_IXUSR)
+      self.assertFalse(os.stat(os.path.join(results, 'a.txt')).st_mode & stat.S_IXUSR)
+      self.assertTrue(os.path.isdir(os.path.join(results, 'empty')))
+      self.assertEqual('a.txt', os.readlink(os.path.join(results, 'link')))
+
+      cache.delete(key)
+      self.assertFalse(cache.has(key))
+      self.assertFalse(cache.use_cached_files(key))
+
+  def test_identical_files_are_stored_once(self):
+    with self.setup_cache() as cache:
+      one = self._write(cache, 'one/resource.txt', 'shared')
+      two = self._write(cache, 'two/resource.txt', 'shared')
+      cache.insert(CacheKey('one', 'hash'), [one])
+      cache.insert(CacheKey('two', 'hash'), [two])
+      self.assertEqual(1, len(self._blobs(cache)))
+
+      manifest = read_manifest(cache._cache_file_for_key(CacheKey('one', 'hash')))
+      self.assertEqual(len('shared'), manifest['size'])
+
+  def test_copied_restore_is_writable(self):
+    with self.setup_cache() as cache:
+      key = CacheKey('target', 'hash')
+      path = self._write(cache, 'file.txt', 'contents')
+      cache.insert(key, [path])
+      os.unlink(path)
+
+      self.assertTrue(cache.use_cached_files(key))
+      blob, = self._blobs(cache)
+      self.assertNotEqual(os.stat(blob).st_ino, os.stat(path).st_ino)
+      with open(path, 'a') as fp:
+        fp.write('more')
+      with open(blob, 'r') as fp:
+        self.assertEqual('contents', fp.read())
+
+  def test_hardlinked_restore(self):
+    with self.setup_cache(hardlink=True) as cache:
+      key = CacheKey('target', 'hash')
+      path = self._write(cache, 'file.txt', 'contents')
+      cache.insert(key, [path])
+      os.unlink(path)
+
+      self.assertTrue(cache.use_cached_files(key))
+      blob, = self._blobs(cache)
+      self.assertEqual(os.stat(blob).st_ino, os.stat(path).st_ino)
+      self.assertFalse(os.stat(path).st_mode & stat.S_IWUSR)
+
+  def test_missing_blob_is_unreadable(self):
+    with self.setup_cache() as cache:
+      key = CacheKey('target', 'hash')
+      cache.insert(key, [self._write(cache, 'file.txt', 'contents')])
+      blob, = self._blobs(cache)
+      os.unlink(blob)
+
+      self.assertIsInstance(cache.use_cached_files(key), UnreadableArtifact)
+      self.assertFalse(cache.has(key))
+
+  def _tarball_chunks(self, cache, codec, members):
+    with temporary_dir() as src_root:
+      paths = []
+      for relpath, content in members:
+        path = os.path.join(src_root, relpath)
+        safe_file_dump(path, content, makedirs=True)
+        paths.append(path)
+      tarball = os.path.join(src_root, 'artifact.tar')
+      TarballArtifact(src_root, tarball, compression=1, codec=codec).collect(paths)
+      with open(tarball, 'rb') as fp:
+        data = fp.read()
+    return [data[i:i + 100] for i in range(0, len(data), 100)]
+
+  def test_stream_and_use_artifact(self):
+    for codec in (TarballArtifact.GZIP, TarballArtifact.UNCOMPRESSED):
+      with self.setup_cache(codec=codec) as cache:
+        key = CacheKey('target', 'hash')
+        chunks = self._tarball_chunks(cache, codec, [('results/a.txt', 'a'), ('results/b', 'b')])
+        results = os.path.join(cache.artifact_root, 'results')
+
+        self.assertTrue(cache.store_and_use_artifact(key, iter(chunks), results_dir=results))
+        self.assertEqual('a', self._read(cache, 'results/a.txt'))
+        self.assertEqual('b', self._read(cache, 'results/b'))
+        self.assertTrue(cache.has(key))
+        self.assertEqual(2, len(self._blobs(cache)))
+
+  def test_stream_large_artifact(self):
+    # Streaming must stay linear in the size of the artifact, even when a single chunk of the
+    # response decodes to many of the records that the member files are read in.
+    with self.setup_cache() as cache:
+      key = CacheKey('target', 'hash')
+      content = 'content\n' * 4 * 1024 * 1024
+      chunks = self._tarball_chunks(cache, TarballArtifact.GZIP, [('results/large', content)])
+      results = os.path.join(cache.artifact_root, 'results')
+
+      start = time.time()
+      self.assertTrue(cache.store_and_use_artifact(key, iter([b''.join(chunks)]),
+                                                   results_dir=results))
+      self.assertLess(time.time() - start, 3)
+      self.assertEqual(content, self._read(cache, 'results/large'))
+
+  def test_stream_truncated_artifact(self):
+    with self.setup_cache() as cache:
+      key = CacheKey('target', 'hash')
+      chunks = self._tarball_chunks(cache, TarballArtifact.GZIP, [('results/a.txt', 'a' * 5000)])
+      results = os.path.join(cache.artifact_root, 'results')
+
+      with self.assertRaises(ArtifactError):
+        cache.stream_and_use_artifact(key, iter(chunks[:-1]), results_dir=results)
+      self.assertEqual([], os.listdir(results))
+      self.assertFalse(cache.has(key))
+
+  def test_stream_rejects_paths_outside_artifact_root(self):
+    with self.setup_cache(codec=TarballArtifact.UNCOMPRESSED) as cache:
+      tarball = os.path.join(cache.artifact_root, 'evil.tar')
+      outside = os.path.join(cache.artifact_root, 'outside')
+      safe_mkdir_for(outside)
+      safe_file_dump(outside, 'evil')
+      with tarfile.open(tarball, 'w') as tar:
+        tar.add(outside, '../outside')
+      with open(tarball, 'rb') as fp:
+        chunks = [fp.read()]
+
+      with self.assertRaises(ArtifactError):
+        cache.stream_and_use_artifact(CacheKey('target', 'hash'), iter(chunks))
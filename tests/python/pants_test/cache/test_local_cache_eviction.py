@@ -0,0 +1,112 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import time
+import unittest
+
+from pants.cache.content_addressed_artifact_cache import (BLOB_DIR, BlobStore,
+                                                          ContentAddressedLocalArtifactCache)
+from pants.cache.local_cache_eviction import (LRUEvictionPolicy, list_local_cache_entries,
+                                              read_task_name, record_task_name)
+from pants.invalidation.build_invalidator import CacheKey
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump, touch
+
+
+class LRUEvictionPolicyTest(unittest.TestCase):
+
+  def setUp(self):
+    self.now = time.time()
+
+  def _artifact(self, root, task, target, size, age):
+    path = os.path.join(root, task, target, 'hash{}.tgz'.format(age))
+    safe_file_dump(path, 'x' * size, makedirs=True)
+    touch(path, (self.now - age, self.now - age))
+    return path
+
+  def _paths(self, root):
+    return sorted(entry.path for entry in list_local_cache_entries(root))
+
+  def test_list_entries_ignores_other_files(self):
+    with temporary_dir() as root:
+      artifact = self._artifact(root, 'task', 'target', 10, 0)
+      safe_file_dump(os.path.join(root, 'task', 'target', 'tmpabc123write'), 'x')
+      safe_file_dump(os.path.join(root, LRUEvictionPolicy.MARKER_FILE), '')
+      record_task_name(os.path.join(root, 'task'), 'compile.zinc')
+
+      entries = list(list_local_cache_entries(root))
+      self.assertEqual([artifact], [entry.path for entry in entries])
+      self.assertEqual('task', entries[0].task_dir)
+      self.assertEqual(10, entries[0].size)
+      self.assertEqual('compile.zinc', read_task_name(os.path.join(root, 'task')))
+
+  def test_evict_least_recently_used_to_low_watermark(self):
+    with temporary_dir() as root:
+      oldest = self._artifact(root, 'task1', 'a', 30, 30)
+      older = self._artifact(root, 'task2', 'b', 30, 20)
+      newer = self._artifact(root, 'task1', 'c', 100, 10)
+      newest = self._artifact(root, 'task2', 'd', 100, 0)
+
+      # Within budget: nothing to do.
+      self.assertEqual([], LRUEvictionPolicy(root, max_bytes=260).evict(now=self.now))
+
+      # Over a budget of 250 bytes, evict down to 225 bytes rather than just under the budget.
+      evicted = LRUEvictionPolicy(root, max_bytes=250).evict(now=self.now)
+      self.assertEqual([oldest, older], [entry.path for entry in evicted])
+      self.assertEqual(sorted([newer, newest]), self._paths(root))
+      self.assertFalse(os.path.exists(os.path.dirname(oldest)))
+
+  def test_evict_by_age(self):
+    with temporary_dir() as root:
+      self._artifact(root, 'task', 'a', 100, 3000)
+      recent = self._artifact(root, 'task', 'b', 100, 10)
+
+      evicted = LRUEvictionPolicy(root, max_age_secs=60).evict(now=self.now)
+      self.assertEqual(1, len(evicted))
+      self.assertEqual([recent], self._paths(root))
+
+  def test_maybe_evict_is_rate_limited(self):
+    with temporary_dir() as root:
+      self._artifact(root, 'task', 'a', 100, 10)
+      policy = LRUEvictionPolicy(root, max_bytes=50, min_interval_secs=3600)
+      self.assertEqual(1, len(policy.maybe_evict()))
+
+      self._artifact(root, 'task', 'b', 100, 10)
+      self.assertIsNone(policy.maybe_evict())
+      self.assertEqual(1, len(self._paths(root)))
+
+  def test_maybe_evict_disabled(self):
+    with temporary_dir() as root:
+      self._artifact(root, 'task', 'a', 100, 10)
+      self.assertIsNone(LRUEvictionPolicy(root).maybe_evict())
+      self.assertFalse(os.path.exists(os.path.join(root, LRUEvictionPolicy.MARKER_FILE)))
+
+  def test_collect_unreferenced_blobs(self):
+    with temporary_dir() as artifact_root, temporary_dir() as root:
+      cache = ContentAddressedLocalArtifactCache(artifact_root, os.path.join(root, 'task'),
+                                                 compression=1)
+      old_key, new_key = CacheKey('old', 'hash'), CacheKey('new', 'hash')
+      for key, content in ((old_key, 'old'), (new_key, 'new')):
+        path = os.path.join(artifact_root, key.id)
+        safe_file_dump(path, content)
+        cache.insert(key, [path])
+      manifest = cache._cache_file_for_key(old_key)
+      touch(manifest, (self.now - 3000, self.now - 3000))
+
+      # Blobs are only collected once they are older than the grace period.
+      policy = LRUEvictionPolicy(root, max_age_secs=60)
+      self.assertTrue(policy.enabled)
+      self.assertEqual([manifest], [entry.path for entry in policy.evict(now=self.now)])
+      blob_root = os.path.join(root, BLOB_DIR)
+      self.assertEqual(2, sum(len(names) for _, _, names in os.walk(blob_root)))
+
+      # Unbounded roots are still swept for unreferenced blobs.
+      policy = LRUEvictionPolicy(root)
+      self.assertTrue(policy.enabled)
+      policy.evict(now=self.now + BlobStore.GRACE_SECS + 1)
+      self.assertEqual(1, sum(len(names) for _, _, names in os.walk(blob_root)))
+      self.assertTrue(cache.has(new_key))
@@ -0,0 +1,78 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import time
+import unittest
+
+from pants.cache.local_artifact_cache import TempLocalArtifactCache
+from pants.cache.negative_lookup_cache import NegativeLookupCache
+from pants.cache.pinger import BestUrlSelector
+from pants.cache.restful_artifact_cache import RESTfulArtifactCache
+from pants.invalidation.build_invalidator import CacheKey
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump
+from pants_test.cache.cache_server import cache_server
+
+
+class NegativeLookupCacheTest(unittest.TestCase):
+
+  def test_misses_expire(self):
+    with temporary_dir() as root:
+      cache = NegativeLookupCache(root, ttl_secs=60)
+      url = 'http://host/task/target/hash.tgz'
+      self.assertFalse(cache.is_known_miss(url))
+
+      cache.record_miss(url)
+      now = time.time()
+      self.assertTrue(cache.is_known_miss(url, now=now))
+      self.assertFalse(cache.is_known_miss('http://other/task/target/hash.tgz', now=now))
+      self.assertFalse(cache.is_known_miss(url, now=now + 61))
+
+      cache.prune(now=now + 30)
+      self.assertTrue(cache.is_known_miss(url, now=now))
+      NegativeLookupCache(root, ttl_secs=60).prune(now=now + 61)
+      self.assertFalse(cache.is_known_miss(url, now=now))
+
+  def test_invalidate(self):
+    with temporary_dir() as root:
+      cache = NegativeLookupCache(root, ttl_secs=60)
+      url = 'http://host/task/target/hash.tgz'
+      cache.record_miss(url)
+      cache.invalidate(url)
+      self.assertFalse(cache.is_known_miss(url))
+      # Invalidating an unknown url is a no-op.
+      cache.invalidate(url)
+
+
+class RESTfulArtifactCacheNegativeLookupTest(unittest.TestCase):
+
+  def _remote_cache(self, artifact_root, url, negative_cache=None):
+    return RESTfulArtifactCache(artifact_root, BestUrlSelector([url]),
+                                TempLocalArtifactCache(artifact_root, compression=1),
+                                negative_cache=negative_cache)
+
+  def test_recent_misses_are_not_requested(self):
+    with cache_server() as server, temporary_dir() as artifact_root, temporary_dir() as root:
+      negative_cache = NegativeLookupCache(root, ttl_secs=60)
+      cache = self._remote_cache(artifact_root, server.url, negative_cache=negative_cache)
+      other_host_cache = self._remote_cache(artifact_root, server.url)
+      key = CacheKey('target', 'hash')
+      path = os.path.join(artifact_root, 'results')
+      safe_file_dump(path, 'results')
+
+      self.assertFalse(cache.has(key))
+      self.assertEqual([False], cache.has_many([key]))
+
+      # Inserted by another host: the miss is remembered until it expires.
+      other_host_cache.insert(key, [path])
+      self.assertTrue(other_host_cache.has(key))
+      self.assertFalse(cache.has(key))
+      self.assertFalse(cache.use_cached_files(key))
+
+      # Inserted by this host: the miss is forgotten.
+      cache.insert(key, [path])
+      self.assertTrue(cache.has(key))
@@ -0,0 +1,84 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import fcntl
+import os
+import unittest
+from builtins import open
+
+from pants.cache.local_artifact_cache import TempLocalArtifactCache
+from pants.cache.pinger import BestUrlSelector
+from pants.cache.restful_artifact_cache import RESTfulArtifactCache
+from pants.cache.upload_queue import ArtifactUploadQueue
+from pants.invalidation.build_invalidator import CacheKey
+from pants.util.contextutil import temporary_dir, temporary_file_path
+from pants.util.dirutil import safe_file_dump
+from pants_test.cache.cache_server import cache_server
+
+
+class ArtifactUploadQueueTest(unittest.TestCase):
+
+  def _enqueue(self, queue, url, content):
+    with temporary_file_path() as tarball:
+      safe_file_dump(tarball, content)
+      queue.enqueue(url, tarball, timeout=4.0)
+
+  def test_drain_uploads_queued_artifacts(self):
+    with cache_server() as server, temporary_dir() as root:
+      queue = ArtifactUploadQueue(root)
+      self._enqueue(queue, '{}/task/a.tgz'.format(server.url), 'aaa')
+      self._enqueue(queue, '{}/task/b.tgz'.format(server.url), 'bb')
+      self.assertEqual((2, 5), (queue.enqueued_count, queue.enqueued_bytes))
+      self.assertEqual((2, 5), queue.backlog())
+      self.assertIsNone(queue.last_drain())
+
+      stats = queue.drain()
+      self.assertEqual(2, stats['uploaded'])
+      self.assertEqual(5, stats['uploaded_bytes'])
+      self.assertEqual((0, 0), queue.backlog())
+      self.assertEqual(2, queue.last_drain()['uploaded'])
+      self.assertIn('bytes_per_second', queue.last_drain())
+
+  def test_failed_uploads_are_retried_then_dropped(self):
+    with cache_server(return_failed=True) as server, temporary_dir() as root:
+      queue = ArtifactUploadQueue(root)
+      self._enqueue(queue, '{}/task/a.tgz'.format(server.url), 'aaa')
+
+      stats = queue.drain(max_attempts=2)
+      self.assertEqual((0, 1, 0), (stats['uploaded'], stats['failed'], stats['dropped']))
+      self.assertEqual((1, 3), queue.backlog())
+
+      stats = queue.drain(max_attempts=2)
+      self.assertEqual((0, 0, 1), (stats['uploaded'], stats['failed'], stats['dropped']))
+      self.assertEqual((0, 0), queue.backlog())
+      self.assertEqual(sorted([ArtifactUploadQueue._STATS_FILE, ArtifactUploadQueue._LOCK_FILE]),
+                       sorted(os.listdir(root)))
+
+  def test_drain_skips_queue_being_drained(self):
+    with temporary_dir() as root:
+      queue = ArtifactUploadQueue(root)
+      self._enqueue(queue, 'http://localhost:1/task/a.tgz', 'aaa')
+      with open(os.path.join(root, ArtifactUploadQueue._LOCK_FILE), 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self.assertIsNone(queue.drain())
+      self.assertEqual((1, 3), queue.backlog())
+
+  def test_restful_cache_queues_inserts(self):
+    with cache_server() as server, temporary_dir() as artifact_root, temporary_dir() as root:
+      queue = ArtifactUploadQueue(root)
+      local = TempLocalArtifactCache(artifact_root, compression=1)
+      remote = RESTfulArtifactCache(artifact_root, BestUrlSelector([server.url]), local,
+                                    upload_queue=queue)
+      key = CacheKey('target', 'hash')
+      path = os.path.join(artifact_root, 'results')
+      safe_file_dump(path, 'results')
+
+      remote.insert(key, [path])
+      self.assertFalse(remote.has(key))
+      self.assertEqual(1, queue.backlog()[0])
+
+      queue.drain()
+      self.assertTrue(remote.has(key))
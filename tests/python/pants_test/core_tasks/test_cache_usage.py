@@ -0,0 +1,49 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import time
+
+from pants.cache.local_cache_eviction import record_task_name
+from pants.core_tasks.cache_usage import CacheUsage
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump, touch
+from pants_test.task_test_base import ConsoleTaskTestBase
+
+
+class CacheUsageTest(ConsoleTaskTestBase):
+  @classmethod
+  def task_type(cls):
+    return CacheUsage
+
+  def _artifact(self, root, task_dir, target, size, age):
+    path = os.path.join(root, task_dir, target, 'hash.tgz')
+    safe_file_dump(path, 'x' * size, makedirs=True)
+    last_used = time.time() - age
+    touch(path, (last_used, last_used))
+
+  def test_empty_cache(self):
+    with temporary_dir() as root:
+      self.set_options_for_scope('cache.{}'.format(self.options_scope), read_from=[root],
+                                 write_to=[])
+      self.assert_console_output('{}: 0 bytes in 0 artifacts'.format(os.path.realpath(root)))
+
+  def test_usage_per_task(self):
+    with temporary_dir() as root:
+      self._artifact(root, 'fingerprint1', 'a', 10, 0)
+      self._artifact(root, 'fingerprint1', 'b', 10, 2 * 24 * 60 * 60)
+      self._artifact(root, 'fingerprint2', 'a', 30, 30 * 24 * 60 * 60)
+      record_task_name(os.path.join(root, 'fingerprint1'), 'compile.zinc')
+
+      self.set_options_for_scope('cache.{}'.format(self.options_scope), read_from=[root],
+                                 write_to=[root, 'http://remote.cache'])
+      self.assert_console_output_ordered(
+        '{}: 50 bytes in 3 artifacts'.format(os.path.realpath(root)),
+        '  <unknown task> (fingerprint2): 30 bytes in 1 artifact; '
+        'last used <1h: 0, <1d: 0, <1w: 0, older: 1',
+        '  compile.zinc (fingerprint1): 20 bytes in 2 artifacts; '
+        'last used <1h: 1, <1d: 0, <1w: 1, older: 0',
+      )
@@ -6,11 +6,16 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import functools
 import os
+import unittest
 from builtins import str
+from textwrap import dedent
 
+from pants.base.specs import DescendantAddresses, Specs
+from pants.build_graph.address import Address
 from pants.build_graph.address_lookup_error import AddressLookupError
 from pants.build_graph.build_file_aliases import BuildFileAliases, TargetMacro
 from pants.build_graph.files import Files
+from pants.engine.legacy.graph import DependentGraph, _DirectoryDependencies
 from pants_test.test_base import TestBase
 
 
@@ -60,6 +65,23 @@ class GraphTest(TestBase):
     invalidated_count = self.invalidate_for('src/example/BUILD')
     self.assertGreater(invalidated_count, 0)
 
+  def test_dependent_graph_invalidation(self):
+    def transitive_dependents(spec):
+      graph = self.scheduler.product_request(DependentGraph,
+                                             [Specs((DescendantAddresses(''),))])[0]
+      return sorted(a.spec for a in graph.transitive_dependents_of_addresses([Address.parse(spec)]))
+
+    self.add_to_build_file('src/a', 'target(name="a")')
+    self.add_to_build_file('src/b', 'target(name="b", dependencies=["src/a"])')
+    self.add_to_build_file('src/c', 'target(name="c", dependencies=["src/b"])')
+    self.assertEqual(['src/a:a', 'src/b:b', 'src/c:c'], transitive_dependents('src/a'))
+
+    self.create_file('src/c/BUILD', dedent("""
+      target(name="c")
+    """))
+    self.invalidate_for('src/c/BUILD')
+    self.assertEqual(['src/a:a', 'src/b:b'], transitive_dependents('src/a'))
+
   def test_sources_ordering(self):
     input_sources = ['p', 'a', 'n', 't', 's', 'b', 'u', 'i', 'l', 'd']
     expected_sources = sorted(input_sources)
@@ -78,3 +100,22 @@ class GraphTest(TestBase):
     files = self.create_library('src/example', 'tagged_files', 'things')
     self.assertIn(self._TAG, files.tags)
     self.assertEqual(type(files), Files)
+
+
+class DependentGraphTest(unittest.TestCase):
+
+  def test_dependents(self):
+    a, b, c, d = (Address('src', name) for name in 'abcd')
+    graph = DependentGraph.from_directory_dependencies([
+      _DirectoryDependencies(((a, (), ()), (b, (a,), ()))),
+      _DirectoryDependencies(((c, (b,), (d,)), (d, (), ()))),
+    ])
+
+    self.assertEqual([a, b], list(graph.dependents_of_addresses([a])))
+    self.assertEqual([a, b, c], graph.transitive_dependents_of_addresses([a]))
+    self.assertEqual([d, c], graph.transitive_dependents_of_addresses([d]))
+
+  def test_missing_dependency(self):
+    a, b = Address('src', 'a'), Address('src', 'b')
+    with self.assertRaises(AddressLookupError):
+      DependentGraph.from_directory_dependencies([_DirectoryDependencies(((a, (b,), ()),))])
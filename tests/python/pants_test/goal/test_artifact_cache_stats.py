@@ -72,6 +72,19 @@ class ArtifactCacheStatsTest(TestBase):
       artifact_cache_stats.add_misses(self.TEST_CACHE_NAME_2, [self.target_a],
                                       [self.TEST_LOCAL_ERROR])
 
+  def test_upload_stats(self):
+    with temporary_dir() as tmp_dir:
+      artifact_cache_stats = ArtifactCacheStats(tmp_dir)
+      artifact_cache_stats.add_queued_uploads(self.TEST_CACHE_NAME_1, 2, 100)
+      artifact_cache_stats.add_queued_uploads(self.TEST_CACHE_NAME_1, 1, 50)
+      artifact_cache_stats.set_upload_queue_stats('/queue', 3, 150, last_drain={'uploaded': 4})
+
+      self.assertEqual({
+        'queued': [{'cache_name': self.TEST_CACHE_NAME_1, 'num_artifacts': 3, 'num_bytes': 150}],
+        'queues': [{'queue': '/queue', 'backlog_artifacts': 3, 'backlog_bytes': 150,
+                    'last_drain': {'uploaded': 4}}],
+      }, artifact_cache_stats.get_upload_stats())
+
   @contextmanager
   def mock_artifact_cache_stats(self,
                                 expected_stats,
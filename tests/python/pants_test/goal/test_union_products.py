@@ -6,7 +6,7 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 from twitter.common.collections import OrderedSet
 
-from pants.goal.products import UnionProducts
+from pants.goal.products import InternedUnionProducts, UnionProducts
 from pants_test.test_base import TestBase
 
 
@@ -103,3 +103,34 @@ class UnionProductsTest(TestBase):
     found_target = self.products.target_for_product(1000)
 
     self.assertIsNone(found_target)
+
+
+class InternedUnionProductsTest(UnionProductsTest):
+  def setUp(self):
+    super(InternedUnionProductsTest, self).setUp()
+    self.products = InternedUnionProducts()
+
+  def test_union_for_targets(self):
+    b = self.make_target('b')
+    a = self.make_target('a', dependencies=[b])
+    self.products.add_for_target(a, [(1, 'x'), (3, 'x')])
+    self.products.add_for_target(b, [(2, 'x'), (3, 'x')])
+
+    self.assertEqual([(1, 'x'), (3, 'x'), (2, 'x')],
+                     self.products.union_for_targets(a.closure(bfs=True)))
+    self.assertEqual([(2, 'x'), (3, 'x'), (1, 'x')],
+                     self.products.union_for_targets(iter([b, a])))
+    self.assertEqual([], self.products.union_for_targets([]))
+
+  def test_equality(self):
+    b = self.make_target('b')
+    a = self.make_target('a', dependencies=[b])
+    self.products.add_for_target(a, [1, 2])
+    copied = self.products.copy()
+    self.assertEqual(self.products, copied)
+
+    copied.add_for_target(b, [2])
+    self.assertNotEqual(self.products, copied)
+    copied.remove_for_target(b, [2])
+    self.assertEqual(self.products, copied)
+    self.assertEqual([a], copied.targets())
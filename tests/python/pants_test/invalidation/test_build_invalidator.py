@@ -4,11 +4,15 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import os
 import tempfile
 import unittest
+from builtins import open, range, str
 from contextlib import contextmanager
 
-from pants.invalidation.build_invalidator import BuildInvalidator, CacheKey
+from pants.invalidation.build_invalidator import (GLOBAL_CACHE_KEY_GEN_VERSION, BuildInvalidator,
+                                                  CacheKey, IndexedBuildInvalidator)
+from pants.subsystem.subsystem import Subsystem
 from pants.util.contextutil import temporary_dir
 from pants.util.dirutil import safe_rmtree
 from pants_test.subsystem.subsystem_util import init_subsystem
@@ -135,12 +139,86 @@ class BuildInvalidatorTest(BaseBuildInvalidatorTest):
       self.assertTrue(invalidator.needs_update(key2))
 
 
+class IndexedBuildInvalidatorTest(BuildInvalidatorTest):
+  @contextmanager
+  def invalidator(self):
+    with temporary_dir() as root:
+      yield IndexedBuildInvalidator(root)
+
+  def test_persists_across_instances(self):
+    with temporary_dir() as root:
+      key1 = self.cache_key(key_id='1', key_hash='1')
+      key2 = self.cache_key(key_id='2', key_hash='2')
+      invalidator = IndexedBuildInvalidator(root)
+      invalidator.update(key1)
+      invalidator.update(key2)
+      invalidator.force_invalidate(key2)
+
+      reloaded = IndexedBuildInvalidator(root)
+      self.assertFalse(reloaded.needs_update(key1))
+      self.assertTrue(reloaded.needs_update(key2))
+
+  def test_ignores_truncated_record(self):
+    with temporary_dir() as root:
+      key1 = self.cache_key(key_id='1', key_hash='1')
+      key2 = self.cache_key(key_id='2', key_hash='2')
+      IndexedBuildInvalidator(root).update(key1)
+      log_path = os.path.join(root, GLOBAL_CACHE_KEY_GEN_VERSION, 'fingerprints.log')
+      with open(log_path, 'a') as fd:
+        fd.write('2\t')
+
+      reloaded = IndexedBuildInvalidator(root)
+      self.assertFalse(reloaded.needs_update(key1))
+      self.assertTrue(reloaded.needs_update(key2))
+      reloaded.update(key2)
+      self.assertFalse(IndexedBuildInvalidator(root).needs_update(key2))
+
+  def test_imports_per_file_fingerprints(self):
+    with temporary_dir() as root:
+      key1 = self.cache_key(key_id='1', key_hash='1')
+      key2 = self.cache_key(key_id='2', key_hash='2')
+      BuildInvalidator(root).update(key1)
+
+      invalidator = IndexedBuildInvalidator(root)
+      self.assertFalse(invalidator.needs_update(key1))
+      self.assertTrue(invalidator.needs_update(key2))
+      scope_root = os.path.join(root, GLOBAL_CACHE_KEY_GEN_VERSION)
+      self.assertEqual(['fingerprints.log'], os.listdir(scope_root))
+
+  def test_per_file_store_discards_log(self):
+    with temporary_dir() as root:
+      key = self.cache_key()
+      IndexedBuildInvalidator(root).update(key)
+      BuildInvalidator(root)
+      self.assertTrue(IndexedBuildInvalidator(root).needs_update(key))
+
+  def test_compaction(self):
+    with temporary_dir() as root:
+      key = self.cache_key()
+      invalidator = IndexedBuildInvalidator(root)
+      for i in range(IndexedBuildInvalidator._MIN_COMPACTION_RECORDS + 1):
+        invalidator.update(self.update_hash(key, new_hash=str(i)))
+
+      reloaded = IndexedBuildInvalidator(root)
+      self.assertFalse(reloaded.needs_update(
+        self.update_hash(key, new_hash=str(IndexedBuildInvalidator._MIN_COMPACTION_RECORDS))))
+      log_path = os.path.join(root, GLOBAL_CACHE_KEY_GEN_VERSION, 'fingerprints.log')
+      with open(log_path, 'r') as fd:
+        self.assertEqual(1, len(fd.readlines()))
+
+
 class BuildInvalidatorFactoryTest(BaseBuildInvalidatorTest):
+  store = 'files'
+
   def setUp(self):
     pants_workdir = tempfile.mkdtemp()
     self.addCleanup(safe_rmtree, pants_workdir)
+    self.addCleanup(Subsystem.reset)
 
-    init_subsystem(BuildInvalidator.Factory, options={'': {'pants_workdir': pants_workdir}})
+    init_subsystem(BuildInvalidator.Factory, options={
+      '': {'pants_workdir': pants_workdir},
+      'build-invalidator': {'store': self.store},
+    })
     self.root_invalidator = BuildInvalidator.Factory.create()
     self.scoped_invalidator1 = BuildInvalidator.Factory.create(build_task='gen')
     self.scoped_invalidator2 = BuildInvalidator.Factory.create(build_task='resolve')
@@ -168,3 +246,10 @@ class BuildInvalidatorFactoryTest(BaseBuildInvalidatorTest):
 
     self.assertTrue(self.scoped_invalidator1.needs_update(self.key))
     self.assertFalse(self.scoped_invalidator2.needs_update(self.key))
+
+
+class IndexedBuildInvalidatorFactoryTest(BuildInvalidatorFactoryTest):
+  store = 'log'
+
+  def test_store(self):
+    self.assertIsInstance(self.root_invalidator, IndexedBuildInvalidator)
@@ -7,9 +7,17 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import os
 import shutil
 import tempfile
+import threading
+import unittest
+from builtins import object
 
+from pants.base.fingerprint_strategy import DefaultFingerprintStrategy
+from pants.base.payload import Payload
 from pants.invalidation.build_invalidator import BuildInvalidator, CacheKeyGenerator
-from pants.invalidation.cache_manager import InvalidationCacheManager, VersionedTargetSet
+from pants.invalidation.cache_manager import (InvalidationCacheManager, VersionedTargetSet,
+                                              compute_invalidation_hashes)
+from pants.source.payload_fields import SourcesField
+from pants.source.wrapped_globs import LazyFilesetWithSpec
 from pants.util.dirutil import safe_mkdir, safe_rmtree
 from pants_test.test_base import TestBase
 
@@ -200,3 +208,42 @@ class InvalidationCacheManagerTest(TestBase):
     vts = VersionedTargetSet.from_versioned_targets([vt])
     with self.assertRaises(VersionedTargetSet.IllegalResultsDir):
       vts.update()
+
+
+class ComputeInvalidationHashesTest(unittest.TestCase):
+
+  class CountingFileset(LazyFilesetWithSpec):
+    def __init__(self, rel_root, calls):
+      super(ComputeInvalidationHashesTest.CountingFileset, self).__init__(
+        rel_root, {'globs': []}, lambda: [])
+      self._calls = calls
+
+    @property
+    def files_hash(self):
+      self._calls.append(threading.current_thread().name)
+      return self.rel_root.encode('utf-8')
+
+  class FakeTarget(object):
+    def __init__(self, payload):
+      self.payload = payload
+
+    def invalidation_hash(self, fingerprint_strategy=None):
+      fingerprint_strategy = fingerprint_strategy or DefaultFingerprintStrategy()
+      return fingerprint_strategy.fingerprint_target(self)
+
+  def make_target(self, rel_root, calls):
+    payload = Payload()
+    payload.add_field('sources', SourcesField(self.CountingFileset(rel_root, calls)))
+    return self.FakeTarget(payload)
+
+  def test_sources_are_hashed_once(self):
+    calls = []
+    targets = [self.make_target('src/{}'.format(i), calls) for i in range(4)]
+    compute_invalidation_hashes(targets, max_workers=2)
+    self.assertEqual(4, len(calls))
+    self.assertNotIn(threading.current_thread().name, calls)
+
+    fingerprints = [t.invalidation_hash() for t in targets]
+    self.assertEqual(4, len(set(fingerprints)))
+    compute_invalidation_hashes(targets, max_workers=2)
+    self.assertEqual(4, len(calls))
@@ -0,0 +1,67 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import unittest
+import zipfile
+
+from pants.java.jar.incremental_jar import IncrementalJar
+from pants.util.contextutil import open_zip, temporary_dir
+from pants.util.dirutil import safe_file_dump
+
+
+class IncrementalJarTest(unittest.TestCase):
+
+  def write_files(self, root, files):
+    for dest, contents in files.items():
+      safe_file_dump(os.path.join(root, dest), contents, mode='wb', makedirs=True)
+    return [(dest, os.path.join(root, dest)) for dest in sorted(files)]
+
+  def assert_jar(self, path, files, compress_type):
+    with open_zip(path) as jar:
+      self.assertIsNone(jar.testzip())
+      self.assertEqual({'META-INF/', 'com/', 'com/example/'} | set(files), set(jar.namelist()))
+      for dest, contents in files.items():
+        self.assertEqual(contents, jar.read(dest))
+        self.assertEqual(compress_type, jar.getinfo(dest).compress_type)
+
+  def test_reuses_unchanged_entries(self):
+    files = {
+      'META-INF/MANIFEST.MF': b'Manifest-Version: 1.0\r\n\r\n',
+      'com/example/A.class': b'a' * 1000,
+      'com/example/B.class': b'b' * 1000,
+      'com/example/é.txt': b'',
+    }
+    with temporary_dir() as root:
+      path = os.path.join(root, 'out', 'a.jar')
+      os.mkdir(os.path.dirname(path))
+      entries = self.write_files(os.path.join(root, 'v1'), files)
+      self.assertEqual(0, IncrementalJar(path).write(entries))
+      self.assert_jar(path, files, zipfile.ZIP_DEFLATED)
+
+      files['com/example/B.class'] = b'c' * 1000
+      files['com/example/C.class'] = b'c'
+      entries = self.write_files(os.path.join(root, 'v2'), files)
+      self.assertEqual(3, IncrementalJar(path, previous_path=path).write(entries))
+      self.assert_jar(path, files, zipfile.ZIP_DEFLATED)
+      self.assertEqual(['a.jar'], os.listdir(os.path.dirname(path)))
+
+      # Entries are only reused when written with the same compression.
+      self.assertEqual(0, IncrementalJar(path, previous_path=path, compressed=False).write(entries))
+      self.assert_jar(path, files, zipfile.ZIP_STORED)
+      self.assertEqual(5, IncrementalJar(path, previous_path=path, compressed=False).write(entries))
+      self.assert_jar(path, files, zipfile.ZIP_STORED)
+
+  def test_invalid_previous_jar(self):
+    files = {'com/example/A.class': b'a'}
+    with temporary_dir() as root:
+      path = os.path.join(root, 'a.jar')
+      previous_path = os.path.join(root, 'previous.jar')
+      safe_file_dump(previous_path, b'not a jar', mode='wb')
+      entries = self.write_files(os.path.join(root, 'src'), files)
+      self.assertEqual(0, IncrementalJar(path, previous_path=previous_path).write(entries))
+      with open_zip(path) as jar:
+        self.assertEqual(b'a', jar.read('com/example/A.class'))
@@ -0,0 +1,164 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import threading
+import unittest
+from builtins import object, range
+
+import mock
+
+from pants.goal.nailgun_pool_stats import NailgunPoolStats
+from pants.java.nailgun_pool import NailgunPool
+
+
+class FakeExecutor(object):
+  """Stands in for a NailgunExecutor, whose server is "started" by running in it."""
+
+  def __init__(self, name, fingerprint=None, memory=100):
+    self.name = name
+    self.distribution = mock.Mock()
+    self.fingerprint = fingerprint
+    self.memory = memory
+    self.last_spawn_time = None
+    self.runs = []
+    self.metadata = {}
+    self.on_run = None
+
+  def fingerprint_for(self, jvm_options, classpath):
+    return ','.join(jvm_options + classpath)
+
+  def is_alive(self):
+    return self.fingerprint is not None
+
+  def memory_usage(self):
+    return self.memory if self.is_alive() else 0
+
+  def terminate(self):
+    self.fingerprint = None
+
+  def read_metadata_by_name(self, name, key, caster=None):
+    return self.metadata.get(key)
+
+  def write_metadata_by_name(self, name, key, value):
+    self.metadata[key] = float(value)
+
+  def runner(self, classpath, main, jvm_options=None, args=None):
+    executor = self
+
+    class Runner(object):
+      def run(self, stdout=None, stderr=None, stdin=None, cwd=None):
+        fingerprint = executor.fingerprint_for(jvm_options, classpath)
+        if executor.fingerprint != fingerprint:
+          executor.fingerprint = fingerprint
+          executor.last_spawn_time = 1.0
+        executor.runs.append(main)
+        if executor.on_run:
+          executor.on_run()
+        return 0
+
+    return Runner()
+
+
+class NailgunPoolTest(unittest.TestCase):
+
+  def setUp(self):
+    self.stats = NailgunPoolStats()
+
+  def pool(self, executors, **kwargs):
+    return NailgunPool('pool', executors, stats=self.stats, **kwargs)
+
+  def run_in(self, pool, fingerprint):
+    runner = pool._runner(classpath=[fingerprint], main=fingerprint, jvm_options=[], args=[])
+    self.assertIs(pool, runner.executor)
+    self.assertEqual(0, runner.run())
+
+  def test_servers_are_kept_per_fingerprint(self):
+    executors = [FakeExecutor('a', fingerprint='warm'), FakeExecutor('b')]
+    pool = self.pool(executors)
+
+    self.run_in(pool, 'warm')
+    self.run_in(pool, 'cold')
+    self.run_in(pool, 'warm')
+    self.run_in(pool, 'cold')
+    self.assertEqual((['warm', 'warm'], ['cold', 'cold']), (executors[0].runs, executors[1].runs))
+
+    # A third fingerprint replaces the least recently used server.
+    self.run_in(pool, 'other')
+    self.assertEqual('other', executors[0].fingerprint)
+    self.assertEqual({'leases': 5, 'hits': 3, 'misses': 2, 'shared': 0, 'spawn_time': 2.0,
+                      'wait_time': 0.0, 'evictions': 0},
+                     dict(self.stats.get_all()['pool'], wait_time=0.0))
+
+  def test_concurrent_runs_lease_distinct_servers(self):
+    if not hasattr(threading, 'Barrier'):
+      self.skipTest('Requires threading.Barrier.')
+    executors = [FakeExecutor(str(slot)) for slot in range(2)]
+    pool = self.pool(executors, max_servers_per_fingerprint=2)
+    both_running = threading.Barrier(2, timeout=10)
+    for executor in executors:
+      executor.on_run = both_running.wait
+
+    threads = [threading.Thread(target=self.run_in, args=(pool, 'same')) for _ in range(2)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    self.assertEqual([['same'], ['same']], [executor.runs for executor in executors])
+
+  def test_concurrent_runs_share_a_server(self):
+    if not hasattr(threading, 'Barrier'):
+      self.skipTest('Requires threading.Barrier.')
+    executors = [FakeExecutor(str(slot)) for slot in range(2)]
+    pool = self.pool(executors, max_runs_per_server=2)
+    all_running = threading.Barrier(2, timeout=10)
+    executors[0].on_run = all_running.wait
+
+    threads = [threading.Thread(target=self.run_in, args=(pool, 'same')) for _ in range(2)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    self.assertEqual([['same', 'same'], []], [executor.runs for executor in executors])
+    self.assertEqual(1, self.stats.get_all()['pool']['shared'])
+
+  def test_runs_wait_for_a_server_with_their_fingerprint(self):
+    executors = [FakeExecutor(str(slot)) for slot in range(2)]
+    pool = self.pool(executors)
+    released = threading.Event()
+    executors[0].on_run = lambda: released.wait(10)
+
+    first = threading.Thread(target=self.run_in, args=(pool, 'same'))
+    first.start()
+    second = threading.Thread(target=self.run_in, args=(pool, 'same'))
+    second.start()
+    second.join(0.1)
+    self.assertTrue(second.is_alive())
+    released.set()
+    first.join()
+    second.join()
+    self.assertEqual([['same', 'same'], []], [executor.runs for executor in executors])
+
+  def test_memory_budget(self):
+    executors = [FakeExecutor('a', fingerprint='old'), FakeExecutor('b', fingerprint='older')]
+    executors[0].metadata['last_used'] = 2.0
+    executors[1].metadata['last_used'] = 1.0
+    pool = self.pool(executors + [FakeExecutor('c')], memory_budget=250)
+
+    self.run_in(pool, 'new')
+    self.assertEqual(['old', None], [executor.fingerprint for executor in executors])
+    self.assertEqual(1, self.stats.get_all()['pool']['evictions'])
+
+  def test_memory_budget_evicts_idle_warm_servers(self):
+    executors = [FakeExecutor(str(slot), fingerprint='warm') for slot in range(2)]
+    for executor in executors:
+      executor.metadata['last_used'] = 1.0
+    pool = self.pool(executors, max_servers_per_fingerprint=2, memory_budget=150)
+
+    # Considering the idle warm server for the run must not mark it as leased.
+    self.run_in(pool, 'warm')
+    self.assertEqual({}, dict(pool._leases))
+    self.assertEqual(['warm', None], [executor.fingerprint for executor in executors])
+    self.assertEqual(1, self.stats.get_all()['pool']['evictions'])
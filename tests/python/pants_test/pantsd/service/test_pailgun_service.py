@@ -10,6 +10,7 @@ from builtins import object
 import mock
 
 from pants.pantsd.service.pailgun_service import PailgunService
+from pants.pantsd.service.pants_service import PantsService, PantsServices
 
 
 PATCH_OPTS = dict(autospec=True, spec_set=True)
@@ -44,3 +45,24 @@ class TestPailgunService(unittest.TestCase):
     self.service._shutdown_after_run = True
     self.service._request_complete_callback()
     self.assertIs(self.service.terminate.called, True)
+
+  @mock.patch('pants.pantsd.service.pailgun_service.PailgunServer', autospec=True)
+  def test_fork_context_pauses_other_services(self, mock_server_class):
+    other_service = mock.create_autospec(PantsService, spec_set=True)
+    self.service.setup(PantsServices(services=(other_service, self.service)))
+    self.service._scheduler_service = mock.Mock()
+    self.service._scheduler_service.with_fork_context.side_effect = lambda fork: fork()
+    self.assertIsNotNone(self.service.pailgun)
+    fork_context = mock_server_class.call_args[1]['fork_context']
+
+    self.assertEqual(42, fork_context(lambda: 42))
+    self.assertIs(other_service.mark_pausing.called, True)
+    self.assertIs(other_service.await_paused.called, True)
+    self.assertIs(other_service.resume.called, True)
+    self.assertIs(other_service.terminate.called, False)
+
+    # In the forked child, the other services are terminated rather than resumed.
+    other_service.reset_mock()
+    self.assertEqual(0, fork_context(lambda: 0))
+    self.assertIs(other_service.resume.called, False)
+    self.assertIs(other_service.terminate.called, True)
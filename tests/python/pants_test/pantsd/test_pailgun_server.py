@@ -4,8 +4,10 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import os
 import socket
 import threading
+import time
 import unittest
 from contextlib import contextmanager
 from socketserver import TCPServer
@@ -78,6 +80,119 @@ class TestPailgunServer(unittest.TestCase):
     self.assertIs(self.mock_handler_inst.handle_error.called, True)
     mock_shutdown_request.assert_called_once_with(self.server, mock_request)
 
+  def _request_socket(self):
+    client_sock, server_sock = socket.socketpair()
+    self.addCleanup(client_sock.close)
+    self.addCleanup(server_sock.close)
+    return client_sock, server_sock
+
+  def test_runs_concurrently(self):
+    self.assertFalse(self.server.runs_concurrently(['list', '::']))
+
+    self.server.fork_context = mock.Mock()
+    self.server.concurrent_goals = frozenset(['list', 'filedeps'])
+    self.assertTrue(self.server.runs_concurrently(['list', '::']))
+    self.assertTrue(self.server.runs_concurrently(['-ldebug', 'list', 'filedeps', 'src/python:a']))
+    self.assertFalse(self.server.runs_concurrently(['list', 'compile', '::']))
+    self.assertFalse(self.server.runs_concurrently(['--loop', 'list', '::']))
+    self.assertFalse(self.server.runs_concurrently(['list', '::', '--', '-v']))
+    self.assertFalse(self.server.runs_concurrently(['src/python::']))
+
+  def test_admitted_run_exclusive(self):
+    client_sock, server_sock = self._request_socket()
+    queue_times = []
+
+    def queued_run():
+      with self.server.admitted_run(server_sock, False, -1) as (queue_time, _):
+        queue_times.append(queue_time)
+
+    with self.server.admitted_run(server_sock, False, -1):
+      thread = threading.Thread(target=queued_run)
+      thread.start()
+      chunk_type, payload = NailgunProtocol.read_chunk(client_sock)
+      self.assertEqual(ChunkType.STDERR, chunk_type)
+      self.assertIn('Another pants invocation is running', payload)
+      time.sleep(0.1)
+      self.assertEqual([], queue_times)
+    thread.join()
+
+    self.assertEqual(1, len(queue_times))
+    self.assertGreaterEqual(queue_times[0], 0.1)
+
+  def test_admitted_run_concurrent(self):
+    client_sock, server_sock = self._request_socket()
+    queue_times = []
+
+    def queued_run():
+      with self.server.admitted_run(server_sock, False, -1) as (queue_time, _):
+        queue_times.append(queue_time)
+
+    # A concurrent run that finds no other run executing takes a turn of its own.
+    with self.server.admitted_run(server_sock, True, -1) as (_, forked):
+      self.assertFalse(forked)
+
+    # Otherwise, it shares a turn with other (forked) concurrent runs.
+    self.assertTrue(self.server._run_lock.acquire(True, timeout=0))
+    try:
+      with self.server.admitted_run(server_sock, True, 0) as (queue_time, forked):
+        self.assertTrue(forked)
+        self.assertLess(queue_time, 0.1)
+
+        # An exclusive run waits for all concurrent runs, and holds back any new ones meanwhile.
+        thread = threading.Thread(target=queued_run)
+        thread.start()
+        chunk_type, _ = NailgunProtocol.read_chunk(client_sock)
+        self.assertEqual(ChunkType.STDERR, chunk_type)
+        # Give the exclusive run time to begin waiting after it sends its message.
+        time.sleep(0.1)
+        with self.assertRaises(PailgunServer.RunNotAdmitted):
+          with self.server.admitted_run(server_sock, True, 0.2):
+            pass
+        self.assertEqual([], queue_times)
+    finally:
+      self.server._run_lock.release(True)
+    thread.join()
+
+    self.assertEqual(1, len(queue_times))
+
+  def test_admitted_run_timeout(self):
+    client_sock, server_sock = self._request_socket()
+
+    with self.server.admitted_run(server_sock, False, -1):
+      with self.assertRaises(PailgunServer.RunNotAdmitted):
+        with self.server.admitted_run(server_sock, False, 0.2):
+          self.fail('the run should not have been admitted')
+
+    chunks = [NailgunProtocol.read_chunk(client_sock) for _ in range(3)]
+    self.assertEqual([ChunkType.STDERR, ChunkType.STDERR, ChunkType.EXIT],
+                     [chunk_type for chunk_type, _ in chunks])
+    self.assertIn('Timed out after 0.2 seconds', chunks[1][1])
+    self.assertEqual('1', chunks[2][1])
+
+    # The lock was not left held by the run that timed out.
+    with self.server.admitted_run(server_sock, False, 0):
+      pass
+
+  def test_admitted_run_client_disconnected(self):
+    client_sock, server_sock = self._request_socket()
+    errors = []
+
+    def queued_run():
+      try:
+        with self.server.admitted_run(server_sock, False, -1):
+          self.fail('the run should not have been admitted')
+      except PailgunServer.RunNotAdmitted as e:
+        errors.append(e)
+
+    with self.server.admitted_run(server_sock, False, -1):
+      thread = threading.Thread(target=queued_run)
+      thread.start()
+      NailgunProtocol.read_chunk(client_sock)
+      client_sock.close()
+      thread.join(5)
+      self.assertFalse(thread.is_alive())
+    self.assertEqual(1, len(errors))
+
 
 class TestPailgunHandler(unittest.TestCase):
   def setUp(self):
@@ -99,6 +214,53 @@ class TestPailgunHandler(unittest.TestCase):
 
   @mock.patch.object(PailgunHandler, '_run_pants', **PATCH_OPTS)
   def test_handle_request(self, mock_run_pants):
+    self.mock_server.runs_concurrently.return_value = False
+    self.mock_server.admitted_run.return_value = mock.MagicMock()
+    self.mock_server.admitted_run.return_value.__enter__.return_value = (0.0, False)
     NailgunProtocol.send_request(self.client_sock, '/test', './pants', 'help-advanced')
     self.handler.handle_request()
     self.assertIs(mock_run_pants.called, True)
+
+  @mock.patch.object(PailgunHandler, '_run_pants', **PATCH_OPTS)
+  def test_handle_request_in_fork(self, mock_run_pants):
+    def run_pants(handler, sock, arguments, environment):
+      NailgunProtocol.send_stdout(sock, str(os.getpid()))
+      NailgunProtocol.send_exit_with_code(sock, 0)
+
+    mock_run_pants.side_effect = run_pants
+    # The server is mocked without a spec, in order to stub its instance attributes.
+    mock_server = mock.MagicMock()
+    mock_server.runs_concurrently.return_value = True
+    mock_server.admitted_run.return_value.__enter__.return_value = (0.0, True)
+    mock_server.fork_context.side_effect = lambda fork: fork()
+    handler = PailgunHandler(self.server_sock, self.client_sock.getsockname()[:2], mock_server)
+    NailgunProtocol.send_request(self.client_sock, '/test', './pants', 'list', '::')
+    handler.handle_request()
+
+    chunks = [NailgunProtocol.read_chunk(self.client_sock) for _ in range(2)]
+    self.assertEqual(ChunkType.STDOUT, chunks[0][0])
+    self.assertNotEqual(str(os.getpid()), chunks[0][1])
+    self.assertEqual((ChunkType.EXIT, '0'), chunks[1])
+    self.assertIs(mock_run_pants.called, False)
+
+  @mock.patch.object(PailgunHandler, '_run_pants', **PATCH_OPTS)
+  def test_handle_uncontended_concurrent_request_in_daemon(self, mock_run_pants):
+    # A run that could be forked still executes in the daemon when no other run is executing, so
+    # that the graph work it does outlives it.
+    with mock.patch.object(PailgunServer, 'server_bind'), \
+         mock.patch.object(PailgunServer, 'server_activate'):
+      server = PailgunServer(
+        server_address=('0.0.0.0', 0),
+        runner_factory=mock.Mock(),
+        lifecycle_lock=mock.Mock(),
+        request_complete_callback=mock.Mock(),
+        fork_context=mock.Mock(side_effect=Exception('this should never be called')),
+        concurrent_goals=['list'],
+      )
+    self.addCleanup(server.server_close)
+    handler = PailgunHandler(self.server_sock, self.client_sock.getsockname()[:2], server)
+    NailgunProtocol.send_request(self.client_sock, '/test', './pants', 'list', '::')
+    handler.handle_request()
+
+    self.assertIs(mock_run_pants.called, True)
+    self.assertIs(server.fork_context.called, False)
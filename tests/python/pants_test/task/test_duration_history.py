@@ -0,0 +1,86 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import unittest
+from textwrap import dedent
+
+from pants.task.duration_history import DurationHistory, balance
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump
+
+
+class BalanceTest(unittest.TestCase):
+
+  def test_balances_by_weight(self):
+    weights = {'a': 8, 'b': 5, 'c': 4, 'd': 3, 'e': 1, 'f': 1}
+    bins = balance(sorted(weights), 2, weights.get)
+    self.assertEqual([['a', 'd'], ['b', 'c', 'e', 'f']], bins)
+    self.assertEqual([11, 11], [sum(weights[item] for item in b) for b in bins])
+
+  def test_capacity(self):
+    weights = {'a': 10, 'b': 1, 'c': 1, 'd': 1}
+    self.assertEqual([['a', 'd'], ['b', 'c']], balance(sorted(weights), 2, weights.get, capacity=2))
+
+  def test_capacity_of_one(self):
+    def weight(item):
+      raise AssertionError('items need not be weighed to fill bins of one')
+    self.assertEqual([['a'], ['b'], []], balance(['a', 'b'], 3, weight, capacity=1))
+
+  def test_many_items(self):
+    items = list(range(5000))
+    bins = balance(items, 2500, lambda item: item % 7, capacity=2)
+    self.assertEqual(2500, len(bins))
+    self.assertEqual(items, sorted(item for b in bins for item in b))
+    self.assertTrue(all(len(b) == 2 for b in bins))
+
+  def test_more_bins_than_items(self):
+    self.assertEqual([['a'], [], []], balance(['a'], 3, lambda item: 1))
+
+
+class DurationHistoryTest(unittest.TestCase):
+
+  def _write_xml(self, path, *testcases):
+    safe_file_dump(path, dedent("""
+      <testsuite>
+        {}
+      </testsuite>
+      """).format('\n'.join('<testcase classname="{}" name="{}" time="{}"/>'.format(*testcase)
+                            for testcase in testcases)))
+
+  def test_record_junit_xml(self):
+    with temporary_dir() as root:
+      self._write_xml(os.path.join(root, 'TEST-a.xml'), ('A', 'test1', '1.5'), ('A', 'test2', '0.5'))
+      self._write_xml(os.path.join(root, 'TEST-b.xml'), ('B', 'test1', '3'), ('B', 'test2', ''))
+      self._write_xml(os.path.join(root, 'other.xml'), ('C', 'test1', '7'))
+      safe_file_dump(os.path.join(root, 'TEST-corrupt.xml'), '<testsuite>')
+
+      history = DurationHistory(os.path.join(root, 'durations.json'))
+      history.record_junit_xml(root, key=lambda attrib: attrib['classname'])
+      self.assertEqual({'A': 2.0, 'B': 3.0}, history.durations)
+
+  def test_estimate(self):
+    with temporary_dir() as root:
+      history = DurationHistory(os.path.join(root, 'durations.json'))
+      self.assertEqual(1.0, history.estimate('a'))
+
+      history.record('a', 2.0)
+      history.record('b', 6.0)
+      history.record('b', 2.0)
+      self.assertEqual(2.0, history.estimate('a'))
+      self.assertEqual(4.0, history.estimate('b'))
+      self.assertEqual(3.0, history.estimate('c'))
+
+  def test_save(self):
+    with temporary_dir() as root:
+      path = os.path.join(root, 'history', 'durations.json')
+      history = DurationHistory(path)
+      history.record('a', 2.0)
+      history.save()
+      self.assertEqual({'a': 2.0}, DurationHistory(path).durations)
+
+      safe_file_dump(path, '{')
+      self.assertEqual({}, DurationHistory(path).durations)
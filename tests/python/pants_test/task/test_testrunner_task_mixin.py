@@ -6,6 +6,7 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import collections
 import os
+import threading
 from builtins import next, object, open
 from contextlib import contextmanager
 from unittest import TestCase
@@ -15,7 +16,8 @@ from mock import Mock, patch
 
 from pants.base.exceptions import ErrorWhileTesting
 from pants.task.task import TaskBase
-from pants.task.testrunner_task_mixin import TestRunnerTaskMixin
+from pants.task.testrunner_task_mixin import (PartitionedTestRunnerTaskMixin, TestResult,
+                                              TestRunnerTaskMixin)
 from pants.util.contextutil import temporary_dir
 from pants.util.dirutil import safe_open
 from pants.util.process_handler import ProcessHandler, subprocess
@@ -379,6 +381,64 @@ class TestRunnerTaskMixinMultipleTargets(TaskTestBase):
     self.assertEqual([targetB, targetC], cm.exception.failed_targets)
 
 
+class PartitionedTestRunnerTaskMixinParallelismTest(TaskTestBase):
+
+  @classmethod
+  def task_type(cls):
+    class PartitionedTask(PartitionedTestRunnerTaskMixin, TaskBase):
+      def __init__(self, *args, **kwargs):
+        super(PartitionedTask, self).__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.ran = []
+        self.all_running = threading.Event()
+
+      def _run_partition(self, fail_fast, partition, rc):
+        with self.lock:
+          self.ran.append(partition)
+          self.running += 1
+          self.max_running = max(self.max_running, self.running)
+          if self.running == self.get_options().parallelism:
+            self.all_running.set()
+        # Hold each partition until as many are running at once as are allowed to.
+        self.all_running.wait(1)
+        with self.lock:
+          self.running -= 1
+        return TestResult.rc(rc)
+
+      def _spawn(self, *args, **kwargs):
+        raise NotImplementedError()
+
+      def _test_target_filter(self):
+        return lambda target: True
+
+      def _validate_target(self, target):
+        pass
+
+    return PartitionedTask
+
+  def test_run_partitions_concurrently(self):
+    self.set_options(parallelism=3)
+    task = self.create_task(self.context())
+    partitions = [((name,), (0,)) for name in 'abcdef']
+
+    results = task._run_partitions(False, partitions)
+
+    self.assertEqual(3, task.max_running)
+    self.assertEqual([partition for partition, _ in partitions], list(results.keys()))
+    self.assertTrue(all(rv.success for rv in results.values()))
+
+  def test_fail_fast_skips_pending_partitions(self):
+    self.set_options(parallelism=1)
+    task = self.create_task(self.context())
+
+    results = task._run_partitions(True, [(('a',), (0,)), (('b',), (1,)), (('c',), (0,))])
+
+    self.assertEqual([('a',), ('b',)], task.ran)
+    self.assertEqual([True, False], [rv.success for rv in results.values()])
+
+
 class TestRunnerTaskMixinXmlParsing(TestRunnerTaskMixin, TestCase):
   @staticmethod
   def _raise_handler(e):
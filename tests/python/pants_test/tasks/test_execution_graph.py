@@ -284,6 +284,23 @@ class ExecutionGraphTest(unittest.TestCase):
     self.execute(exec_graph)
     self.assertEqual(self.jobs_run, ["A", "D", "B", "C", "E"])
 
+  def test_critical_path(self):
+    exec_graph = ExecutionGraph([self.job("A", passing_fn, [], 1),
+                                 self.job("B", passing_fn, ["A"], 2),
+                                 self.job("C", passing_fn, ["B"], 4),
+                                 self.job("D", passing_fn, ["A"], 8),
+                                 self.job("E", passing_fn, ["C", "D"], 16)], False)
+    self.assertEqual((25, ["A", "D", "E"]), exec_graph.critical_path())
+    self.assertEqual((7, ["A", "B", "C", "E"]),
+                     exec_graph.critical_path({"A": 1, "B": 2, "C": 3, "E": 1}))
+
+  def test_job_durations(self):
+    exec_graph = ExecutionGraph([self.job("A", passing_fn, []),
+                                 self.job("B", raising_fn, ["A"])], False)
+    with self.assertRaises(ExecutionFailure):
+      self.execute(exec_graph)
+    self.assertEqual(["A"], list(exec_graph.job_durations))
+
   def test_jobs_not_canceled_multiple_times(self):
     failures = list()
 
@@ -0,0 +1,65 @@
+# coding=utf-8
+# Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import unittest
+
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump
+from pants.util.json_store import MovingAverages, dump_json, load_json
+
+
+class JsonStoreTest(unittest.TestCase):
+
+  def test_dump_and_load(self):
+    with temporary_dir() as root:
+      path = os.path.join(root, 'store', 'value.json')
+      self.assertIsNone(load_json(path))
+
+      dump_json({'a': [1, 2]}, path)
+      self.assertEqual({'a': [1, 2]}, load_json(path))
+      self.assertEqual(['value.json'], os.listdir(os.path.dirname(path)))
+
+      safe_file_dump(path, '{')
+      self.assertIsNone(load_json(path))
+
+
+class MovingAveragesTest(unittest.TestCase):
+
+  def test_record(self):
+    with temporary_dir() as root:
+      averages = MovingAverages(os.path.join(root, 'averages.json'))
+      self.assertIsNone(averages.get('a'))
+      self.assertEqual(7, averages.ratio(default=7))
+
+      averages.record('a', 6.0)
+      averages.record('a', 2.0)
+      averages.record('b', 2.0)
+      self.assertEqual(4.0, averages.get('a'))
+      self.assertEqual({'a': 4.0, 'b': 2.0}, averages.averages())
+      self.assertEqual(3.0, averages.ratio(default=7))
+
+  def test_ratio_of_weights(self):
+    with temporary_dir() as root:
+      averages = MovingAverages(os.path.join(root, 'averages.json'))
+      averages.record('a', 10.0, weight=100)
+      averages.record('b', 30.0, weight=100)
+      averages.record('a', 30.0, weight=200)
+      self.assertEqual(50.0 / 300, averages.ratio(default=1))
+
+  def test_save(self):
+    with temporary_dir() as root:
+      path = os.path.join(root, 'averages.json')
+      averages = MovingAverages(path)
+      averages.record('a', 2.0, weight=3)
+      averages.save()
+      loaded = MovingAverages(path)
+      self.assertEqual({'a': 2.0}, loaded.averages())
+      self.assertEqual(2.0 / 3, loaded.ratio(default=1))
+
+      # Files in any other format are ignored.
+      dump_json({'a': 2.0}, path)
+      self.assertEqual({}, MovingAverages(path).averages())